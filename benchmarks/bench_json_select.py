@@ -0,0 +1,135 @@
+"""
+Måler utvalgt JSON-dekoding mot full dekoding.
+
+Sammenligner json.loads (det response.json() gjør) med select_json på
+svar med samme form og størrelse som locationforecast (compact) og Yahoo
+Finance sin chart-API, med CPU-tid og høyeste minnebruk (tracemalloc).
+
+    python benchmarks/bench_json_select.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from morgenbot.services.json_select import select_json
+
+
+def met_payload(rng: random.Random, steps: int = 90) -> bytes:
+    """Svar som fra locationforecast/2.0/compact."""
+    timeseries = []
+    for i in range(steps):
+        data: dict[str, Any] = {
+            "instant": {
+                "details": {
+                    "air_pressure_at_sea_level": round(rng.uniform(990, 1030), 1),
+                    "air_temperature": round(rng.uniform(-10, 25), 1),
+                    "cloud_area_fraction": round(rng.uniform(0, 100), 1),
+                    "relative_humidity": round(rng.uniform(30, 100), 1),
+                    "wind_from_direction": round(rng.uniform(0, 359), 1),
+                    "wind_speed": round(rng.uniform(0, 15), 1),
+                }
+            },
+            "next_12_hours": {"summary": {"symbol_code": "cloudy"}, "details": {}},
+            "next_6_hours": {
+                "summary": {"symbol_code": "rain"},
+                "details": {"precipitation_amount": round(rng.uniform(0, 5), 1)},
+            },
+        }
+        if i < 60:
+            data["next_1_hours"] = {
+                "summary": {"symbol_code": "lightrain"},
+                "details": {"precipitation_amount": round(rng.uniform(0, 2), 1)},
+            }
+        timeseries.append({"time": f"2024-01-{1 + i // 24:02d}T{i % 24:02d}:00:00Z", "data": data})
+    payload = {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [10.66, 59.43, 20]},
+        "properties": {
+            "meta": {"updated_at": "2024-01-01T00:00:00Z", "units": {"air_temperature": "celsius"}},
+            "timeseries": timeseries,
+        },
+    }
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def yahoo_payload(rng: random.Random, points: int) -> bytes:
+    """Svar som fra Yahoo Finance v8/finance/chart med points tidssteg."""
+    start = 1_700_000_000
+    prices = [round(270 + rng.gauss(0, 2), 4) for _ in range(points)]
+    payload = {
+        "chart": {
+            "result": [
+                {
+                    "meta": {
+                        "currency": "NOK",
+                        "symbol": "EQNR.OL",
+                        "exchangeName": "OSL",
+                        "instrumentType": "EQUITY",
+                        "regularMarketPrice": prices[-1],
+                        "previousClose": prices[0],
+                        "dataGranularity": "1m",
+                        "range": "1d",
+                    },
+                    "timestamp": [start + 60 * i for i in range(points)],
+                    "indicators": {
+                        "quote": [
+                            {
+                                key: [round(p + rng.uniform(-1, 1), 4) for p in prices]
+                                for key in ("open", "high", "low", "close")
+                            }
+                            | {"volume": [rng.randrange(10_000) for _ in prices]}
+                        ]
+                    },
+                }
+            ],
+            "error": None,
+        }
+    }
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def measure(func: Callable[[], Any], repeat: int) -> tuple[float, int]:
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def compare(label: str, body: bytes, select: list[str], repeat: int) -> None:
+    full_time, full_peak = measure(lambda: json.loads(body), repeat)
+    select_time, select_peak = measure(lambda: select_json(body, select), repeat)
+    print(f"{label} ({len(body) / 1024:.0f} KiB), select={select}")
+    print(f"  {'json.loads':<12} {full_time * 1e6:9.0f} µs  {full_peak / 1024:8.0f} KiB")
+    print(f"  {'select_json':<12} {select_time * 1e6:9.0f} µs  {select_peak / 1024:8.0f} KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    met = met_payload(rng)
+    compare("met.no compact", met, ["properties.timeseries"], args.repeat)
+    compare("met.no compact", met, ["properties.timeseries.0"], args.repeat)
+    for points in (8, 390):
+        body = yahoo_payload(rng, points)
+        compare(f"Yahoo chart, {points} punkter", body, ["chart.result.0.meta"], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
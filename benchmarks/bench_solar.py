@@ -0,0 +1,71 @@
+"""
+Måler lokal beregning av soltider for mange steder.
+
+Sammenligner sun_event() (ett sted og én dag om gangen) med SunTable for
+et helt år, i ren Python og med NumPy hvis installert.
+
+    python benchmarks/bench_solar.py --locations 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+from datetime import date, timedelta
+
+from morgenbot.utils.solar import HAS_NUMPY, SunTable, sun_event
+
+TIMEZONE = "Europe/Oslo"
+
+
+def per_day(coordinates: list[tuple[float, float]], year: int) -> None:
+    """Ett kall per sted og dag, slik tjenesten ville gjort uten tabell."""
+    first = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - first).days
+    for lat, lon in coordinates:
+        for i in range(days):
+            sun_event(lat, lon, first + timedelta(days=i), TIMEZONE)
+
+
+def measure(label: str, func, repeat: int) -> None:
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<32} {best * 1000:9.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--locations", type=int, default=200)
+    parser.add_argument("--year", type=int, default=date.today().year)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # Fastlands-Norge og Svalbard, med både midnattssol og mørketid
+    coordinates = [
+        (round(rng.uniform(58.0, 79.0), 4), round(rng.uniform(4.5, 31.0), 4))
+        for _ in range(args.locations)
+    ]
+    print(f"{args.locations} steder x ett år ({args.year})")
+
+    measure("sun_event per dag", lambda: per_day(coordinates, args.year), args.repeat)
+    measure(
+        "SunTable, ren Python",
+        lambda: SunTable.compute(coordinates, args.year, TIMEZONE, False),
+        args.repeat,
+    )
+    if HAS_NUMPY:
+        measure(
+            "SunTable, NumPy",
+            lambda: SunTable.compute(coordinates, args.year, TIMEZONE, True),
+            args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
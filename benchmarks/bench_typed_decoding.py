@@ -0,0 +1,102 @@
+"""
+Måler dekoding av API-svar med og uten msgspec.
+
+Sammenligner json.loads (hele dict-treet), typed_json.decode med
+json-motoren (select_json for Yahoo) og, hvis installert, med msgspec via
+skjemaene i models.upstream. Svarene har samme form og størrelse som
+met.no, hvakosterstrommen.no, CoinGecko og Yahoo Finance.
+
+    python benchmarks/bench_typed_decoding.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from bench_json_select import met_payload, yahoo_payload
+
+from morgenbot.models.upstream import ChartResponse, CoinQuote, MetForecast, PowerPrice
+from morgenbot.services.typed_json import HAS_MSGSPEC, decode
+
+
+def power_payload() -> bytes:
+    """Svar som fra hvakosterstrommen.no (24 timer)."""
+    prices = [
+        {
+            "NOK_per_kWh": round(0.4 + hour / 100, 5),
+            "EUR_per_kWh": round(0.035 + hour / 1000, 5),
+            "EXR": 11.5,
+            "time_start": f"2024-01-01T{hour:02d}:00:00+01:00",
+            "time_end": f"2024-01-01T{hour + 1:02d}:00:00+01:00",
+        }
+        for hour in range(24)
+    ]
+    return json.dumps(prices).encode()
+
+
+def coingecko_payload() -> bytes:
+    """Svar som fra CoinGecko /simple/price."""
+    coins = ("bitcoin", "ethereum", "solana", "cardano", "dogecoin")
+    return json.dumps(
+        {
+            coin: {"nok": 1000.0 * (i + 1), "usd": 90.0 * (i + 1), "nok_24h_change": -1.5 + i}
+            for i, coin in enumerate(coins)
+        }
+    ).encode()
+
+
+def measure(func: Callable[[], Any], repeat: int) -> tuple[float, int]:
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def compare(label: str, body: bytes, target: Any, select: list[str] | None, repeat: int) -> None:
+    print(f"{label} ({len(body) / 1024:.1f} KiB)")
+    paths: list[tuple[str, Callable[[], Any]]] = [
+        ("json.loads (dict)", lambda: json.loads(body)),
+        ("decode, json", lambda: decode(body, target, select, use_msgspec=False)),
+    ]
+    if HAS_MSGSPEC:
+        paths.append(("decode, msgspec", lambda: decode(body, target, use_msgspec=True)))
+    for name, func in paths:
+        elapsed, peak = measure(func, repeat)
+        print(f"  {name:<18} {elapsed * 1e6:9.0f} µs  {peak / 1024:8.0f} KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    compare("met.no compact", met_payload(rng), MetForecast, None, args.repeat)
+    compare("hvakosterstrommen", power_payload(), list[PowerPrice], None, args.repeat)
+    compare("CoinGecko", coingecko_payload(), dict[str, CoinQuote], None, args.repeat)
+    compare(
+        "Yahoo chart, 390 punkter",
+        yahoo_payload(rng, 390),
+        ChartResponse,
+        ["chart.result.0.meta"],
+        args.repeat,
+    )
+    if not HAS_MSGSPEC:
+        print("msgspec er ikke installert (pip install morgenbot[fast])")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Måler avledede værmål for mange steder.
+
+Sammenligner skalarfunksjonene i utils.calculations (ett tidssteg om
+gangen) med batch-motoren i utils.weather_metrics, i ren Python og med
+NumPy hvis installert.
+
+    python benchmarks/bench_weather_metrics.py --locations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+from array import array
+
+from morgenbot.models.forecast import Forecast
+from morgenbot.utils.calculations import calculate_wind_chill, get_clothing_advice
+from morgenbot.utils.weather_metrics import HAS_NUMPY, compute_metrics, summarize_days
+
+SYMBOLS = ["clearsky_day", "fair_day", "cloudy", "rain", "lightsnow", "sleet", "fog"]
+START = 1_790_000_000
+
+
+def make_forecast(rng: random.Random, steps: int = 90) -> Forecast:
+    """Lager en prognose med samme form som locationforecast (48 timer, så 6-timers steg)."""
+    offsets = [3600 * i if i < 48 else 3600 * 48 + 6 * 3600 * (i - 48) for i in range(steps)]
+    return Forecast(
+        array("q", (START + offset for offset in offsets)),
+        array("f", (rng.uniform(-20, 30) for _ in range(steps))),
+        array("f", (rng.uniform(0, 15) for _ in range(steps))),
+        array("f", (rng.uniform(30, 100) for _ in range(steps))),
+        array("f", (rng.choice((0.0, 0.0, 0.2, 1.5)) for _ in range(steps))),
+        array("B", (1 if i < 48 else 6 for i in range(steps))),
+        array("B", (rng.randrange(len(SYMBOLS)) for _ in range(steps))),
+        tuple(SYMBOLS),
+    )
+
+
+def scalar(forecasts: list[Forecast]) -> None:
+    """Dagens tilnærming: skalarfunksjonene for hvert tidssteg."""
+    for forecast in forecasts:
+        for i in range(len(forecast)):
+            calculate_wind_chill(forecast.temperature[i], forecast.wind_speed[i])
+            get_clothing_advice(forecast.temperature[i], forecast.symbol(i) or "")
+
+
+def measure(label: str, func, repeat: int) -> None:
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<32} {best * 1000:9.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--locations", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    forecasts = [make_forecast(rng) for _ in range(args.locations)]
+    windows = [(START + 6 * 3600, START + 20 * 3600)] * len(forecasts)
+    print(f"{args.locations} steder x {len(forecasts[0])} tidssteg")
+
+    measure("skalar (calculations)", lambda: scalar(forecasts), args.repeat)
+    measure("batch, ren Python", lambda: compute_metrics(forecasts, False), args.repeat)
+    measure(
+        "batch + dagsoppsummering, Python",
+        lambda: summarize_days(forecasts, windows, False),
+        args.repeat,
+    )
+    if HAS_NUMPY:
+        measure("batch, NumPy", lambda: compute_metrics(forecasts, True), args.repeat)
+        measure(
+            "batch + dagsoppsummering, NumPy",
+            lambda: summarize_days(forecasts, windows, True),
+            args.repeat,
+        )
+    else:
+        print("NumPy er ikke installert (pip install morgenbot[fast])")
+
+
+if __name__ == "__main__":
+    main()
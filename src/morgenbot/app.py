@@ -6,16 +6,31 @@ Orkestrerer alle tjenester og bygger den endelige Discord-meldingen.
 
 from __future__ import annotations
 
+import argparse
 import asyncio
+import contextlib
 import sys
-from datetime import datetime
-from typing import TYPE_CHECKING
+from collections.abc import Awaitable, Callable
+from datetime import datetime, time
+from typing import TYPE_CHECKING, Any
+from zoneinfo import ZoneInfo
 
 import structlog
 
 from morgenbot.builders.message_builder import MessageBuilder
+from morgenbot.config.constants import (
+    CURRENCY_API_URL,
+    FINANCE_CHART_URL,
+    GROQ_API_URL,
+    NEWS_FEEDS,
+)
 from morgenbot.config.settings import Settings
 from morgenbot.exceptions.errors import MorgenbotError
+from morgenbot.runtime.daemon import MorgenbotDaemon
+from morgenbot.runtime.dag import DagExecutor, DagResult
+from morgenbot.runtime.deadline import Deadline, current_deadline
+from morgenbot.runtime.fanout import FanoutPlan, load_subscriptions, plan_fanout
+from morgenbot.runtime.prefetch import Prefetcher
 from morgenbot.services import (
     AIService,
     CryptoService,
@@ -26,9 +41,14 @@ from morgenbot.services import (
     SunService,
     WeatherService,
 )
+from morgenbot.services.http_client import get_http_registry
+from morgenbot.utils.weather_metrics import daylight_window, summarize_days
 
 if TYPE_CHECKING:
     from morgenbot.models.discord import DiscordMessage
+    from morgenbot.models.subscription import Subscription
+    from morgenbot.services.base import CachedService
+    from morgenbot.utils.weather_metrics import DaySummary
 
 
 logger = structlog.get_logger(__name__)
@@ -51,6 +71,12 @@ class Morgenbot:
         ai_service: Tjeneste for AI-generert innhold
         discord_service: Tjeneste for Discord-kommunikasjon
         message_builder: Bygger Discord-meldinger
+        http: Delt HTTP-klient for alle tjenester
+    
+    Brukes som async context manager for å åpne og lukke tilkoblinger:
+    
+        async with Morgenbot(settings) as bot:
+            await bot.run()
     """
 
     def __init__(self, settings: Settings) -> None:
@@ -61,8 +87,10 @@ class Morgenbot:
             settings: Applikasjonskonfigurasjon
         """
         self.settings = settings
+        self.http = get_http_registry(settings)
         self._init_services()
         self.message_builder = MessageBuilder(settings)
+        self._sweeper: asyncio.Task[None] | None = None
         
         logger.info(
             "morgenbot_initialized",
@@ -81,69 +109,317 @@ class Morgenbot:
         self.ai_service = AIService(self.settings) if self.settings.groq_api_key else None
         self.discord_service = DiscordService(self.settings)
 
+    def cached_services(self) -> list[CachedService[Any]]:
+        """Alle tjenester med cache."""
+        return [
+            self.weather_service,
+            self.sun_service,
+            self.news_service,
+            self.finance_service,
+            self.crypto_service,
+            self.electricity_service,
+        ]
+
+    async def __aenter__(self) -> Morgenbot:
+        """Forhåndskobler til kjente verter og starter cache-opprydding."""
+        self._sweeper = asyncio.create_task(self._sweep_caches())
+        if self.settings.preconnect:
+            await self.http.preconnect(self.upstream_urls())
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stopper cache-opprydding og lukker den delte HTTP-klienten."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            # Vent til oppryddingen har stoppet før klienten lukkes
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+        for service in self.cached_services():
+            logger.info("cache_stats", service=type(service).__name__, **service.cache_stats)
+        await self.http.aclose()
+
+    async def _sweep_caches(self) -> None:
+        """Fjerner utløpte cache-oppføringer med jevne mellomrom."""
+        while True:
+            await asyncio.sleep(self.settings.cache_sweep_interval)
+            removed = sum(service.sweep_cache() for service in self.cached_services())
+            if removed:
+                logger.debug("cache_swept", removed=removed)
+
+    def upstream_urls(self) -> list[str]:
+        """URL-er til vertene boten henter data fra eller sender til."""
+        urls = [
+            str(self.settings.met_api_base_url),
+            str(self.settings.electricity_api_base_url),
+            str(self.settings.coingecko_api_base_url),
+            FINANCE_CHART_URL,
+            CURRENCY_API_URL,
+            str(self.settings.discord_webhook),
+            *(url for feeds in NEWS_FEEDS.values() for url in feeds),
+        ]
+        if self.ai_service:
+            urls.append(GROQ_API_URL)
+        return urls
+
     async def gather_data(self) -> dict:
         """
         Samler inn all data fra tjenester asynkront.
         
+        Kildene kjøres som en avhengighetsgraf, slik at AI-hilsningen starter
+        så snart vær og nyheter er klare. Respekterer settings.gather_deadline:
+        det som er klart når fristen går ut brukes, resten avbrytes og listes
+        under "dropped". Seksjoner som bruker utdaterte cache-verdier listes
+        under "stale".
+        
         Returns:
             Dict med all innsamlet data
         """
-        logger.info("gathering_data_started")
+        logger.info("gathering_data_started", deadline=self.settings.gather_deadline)
         
-        # Kjør alle API-kall parallelt
-        results = await asyncio.gather(
-            self.weather_service.get_weather(self.settings.city),
-            self.sun_service.get_sun_times(self.settings.city),
-            self.news_service.get_news(),
-            self.finance_service.get_stocks_and_currency(),
-            self.crypto_service.get_prices(),
-            self.electricity_service.get_prices(self.settings.city),
-            return_exceptions=True,
+        city = self.settings.city
+        budgets = self.settings.service_budgets
+        
+        dag = DagExecutor()
+        dag.add(
+            "weather",
+            lambda _: self.weather_service.get_weather(city),
+            budget=budgets.get("weather"),
+        )
+        dag.add("sun", lambda _: self.sun_service.get_sun_times(city), budget=budgets.get("sun"))
+        dag.add("news", lambda _: self.news_service.get_news(), budget=budgets.get("news"))
+        dag.add(
+            "finance",
+            lambda _: self.finance_service.get_stocks_and_currency(),
+            budget=budgets.get("finance"),
+        )
+        dag.add("crypto", lambda _: self.crypto_service.get_prices(), budget=budgets.get("crypto"))
+        dag.add(
+            "electricity",
+            lambda _: self.electricity_service.get_prices(city),
+            budget=budgets.get("electricity"),
+        )
+        # AI-hilsning (avhenger bare av vær og nyheter)
+        dag.add(
+            "ai_greeting",
+            self._generate_greeting,
+            deps=("weather", "news"),
+            budget=budgets.get("ai_greeting"),
         )
         
-        # Prosesser resultater og logg eventuelle feil
-        keys = ["weather", "sun", "news", "finance", "crypto", "electricity"]
-        data = {}
+        result = await self.run_graph(dag, self.settings.gather_deadline)
         
-        for key, result in zip(keys, results, strict=True):
-            if isinstance(result, Exception):
-                logger.warning(f"service_failed", service=key, error=str(result))
-                data[key] = None
-            else:
-                data[key] = result
-        
-        # AI-hilsning (avhenger av annen data)
-        if self.ai_service and data.get("weather"):
-            try:
-                data["ai_greeting"] = await self.ai_service.generate_greeting(data)
-            except Exception as e:
-                logger.warning("ai_greeting_failed", error=str(e))
-                data["ai_greeting"] = None
-        else:
-            data["ai_greeting"] = None
-        
-        logger.info("gathering_data_completed")
+        data = dict(result.results)
+        data["dropped"] = [key for key in data if key in result.dropped]
+        data["stale"] = [key for key in data if key in result.stale]
+        data["day_summary"] = self.summarize_days([data["weather"]], [data["sun"]])[0]
+        
+        logger.info("gathering_data_completed", dropped=data["dropped"], stale=data["stale"])
         return data
 
-    async def build_message(self) -> DiscordMessage:
+    async def gather_fanout_data(self, plan: FanoutPlan) -> list[dict]:
+        """
+        Samler inn data for alle abonnementer i en fan-out-plan.
+        
+        Vær og sol hentes én gang per lokasjon, strøm én gang per sone,
+        og nyheter, finans og krypto én gang totalt. Alt kjøres i én
+        avhengighetsgraf som deler settings.gather_deadline.
+        
+        Args:
+            plan: Fan-out-plan
+            
+        Returns:
+            Liste med data-dict, i samme rekkefølge som plan.subscriptions
+        """
+        logger.info("gathering_fanout_data_started", locations=len(plan.locations))
+        
+        budgets = self.settings.service_budgets
+        
+        dag = DagExecutor()
+        dag.add("news", lambda _: self.news_service.get_news(), budget=budgets.get("news"))
+        dag.add(
+            "finance",
+            lambda _: self.finance_service.get_stocks_and_currency(),
+            budget=budgets.get("finance"),
+        )
+        dag.add("crypto", lambda _: self.crypto_service.get_prices(), budget=budgets.get("crypto"))
+        
+        for location, city in plan.locations.items():
+            dag.add(
+                ("weather", location),
+                lambda _, city=city: self.weather_service.get_weather(city),
+                budget=budgets.get("weather"),
+            )
+            dag.add(
+                ("sun", location),
+                lambda _, city=city: self.sun_service.get_sun_times(city),
+                budget=budgets.get("sun"),
+            )
+            # AI-hilsning per lokasjon, siden den bare avhenger av vær og nyheter
+            dag.add(
+                ("ai_greeting", location),
+                lambda inputs, location=location: self._generate_greeting(
+                    {"weather": inputs[("weather", location)], "news": inputs["news"]}
+                ),
+                deps=(("weather", location), "news"),
+                budget=budgets.get("ai_greeting"),
+            )
+        
+        for zone in plan.zones:
+            dag.add(
+                ("electricity", zone),
+                lambda _, zone=zone: self.electricity_service.get_zone_prices(zone),
+                budget=budgets.get("electricity"),
+            )
+        
+        result = await self.run_graph(dag, self.settings.gather_deadline)
+        results = result.results
+        
+        # Dagsoppsummering for alle lokasjoner i én beregning
+        locations = list(plan.locations)
+        summaries = dict(
+            zip(
+                locations,
+                self.summarize_days(
+                    [results[("weather", location)] for location in locations],
+                    [results[("sun", location)] for location in locations],
+                ),
+            )
+        )
+        
+        tenant_data = []
+        for index, subscription in enumerate(plan.subscriptions):
+            location = plan.subscription_locations[index]
+            nodes = {
+                "news": "news",
+                "finance": "finance",
+                "crypto": "crypto",
+                "weather": ("weather", location),
+                "sun": ("sun", location),
+                "electricity": ("electricity", plan.subscription_zones[index]),
+                "ai_greeting": ("ai_greeting", location),
+            }
+            
+            data = {section: results[node] for section, node in nodes.items()}
+            data["dropped"] = [
+                section for section, node in nodes.items() if node in result.dropped
+            ]
+            data["stale"] = [section for section, node in nodes.items() if node in result.stale]
+            data["day_summary"] = summaries[location]
+            
+            city_weather = data["weather"]
+            if city_weather is not None and city_weather.city != subscription.city:
+                data["weather"] = city_weather.model_copy(update={"city": subscription.city})
+            
+            tenant_data.append(data)
+        
+        logger.info("gathering_fanout_data_completed")
+        return tenant_data
+
+    def summarize_days(self, weather: list[Any], sun: list[Any]) -> list[DaySummary | None]:
+        """
+        Oppsummerer dagens vær i dagslys for mange steder samtidig.
+        
+        Args:
+            weather: WeatherData (eller None) per sted
+            sun: SunTimes (eller None) per sted
+            
+        Returns:
+            DaySummary (eller None) per sted
+        """
+        timezone = self.settings.timezone
+        today = datetime.now(ZoneInfo(timezone)).date()
+        forecasts = [w.forecast if w is not None else None for w in weather]
+        windows = [daylight_window(today, timezone, s) for s in sun]
+        return summarize_days(forecasts, windows)
+
+    async def run_graph(self, dag: DagExecutor, timeout: float | None) -> DagResult:
+        """
+        Kjører en avhengighetsgraf under en frist.
+        
+        Args:
+            dag: Graf som skal kjøres
+            timeout: Frist i sekunder, eller None for ingen frist
+            
+        Returns:
+            Resultat av kjøringen
+        """
+        deadline = Deadline.after(timeout)
+        token = current_deadline.set(deadline)
+        try:
+            return await dag.run(deadline)
+        finally:
+            current_deadline.reset(token)
+
+    async def _generate_greeting(self, data: dict) -> str | None:
+        """Genererer AI-hilsning hvis AI er aktivert og værdata finnes."""
+        if not (self.ai_service and data.get("weather")):
+            return None
+        
+        try:
+            return await self.ai_service.generate_greeting(data)
+        except Exception as e:
+            logger.warning("ai_greeting_failed", error=str(e))
+            return None
+
+    def global_sources(
+        self,
+    ) -> dict[str, tuple[CachedService[Any], Callable[[], Awaitable[Any]]]]:
+        """
+        Seksjoner som ikke avhenger av by eller sone.
+        
+        Returns:
+            Seksjon -> (tjeneste, kall som henter seksjonen)
+        """
+        return {
+            "news": (self.news_service, self.news_service.get_news),
+            "finance": (self.finance_service, self.finance_service.get_stocks_and_currency),
+            "crypto": (self.crypto_service, self.crypto_service.get_prices),
+        }
+
+    def plan(self, subscriptions: list[Subscription]) -> FanoutPlan:
+        """
+        Lager fan-out-plan for abonnementene.
+        
+        Args:
+            subscriptions: Abonnementer som skal betjenes
+            
+        Returns:
+            Plan med én henting per distinkte lokasjon og sone
+        """
+        return plan_fanout(
+            subscriptions,
+            locate=self.weather_service.get_coordinates,
+            zone_for=self.electricity_service.get_power_zone,
+            grid=self.settings.location_grid,
+        )
+
+    async def build_message(self, data: dict | None = None) -> DiscordMessage:
         """
         Bygger komplett Discord-melding.
         
+        Args:
+            data: Ferdig innsamlet data, eller None for å samle inn nå
+            
         Returns:
             Ferdig formatert Discord-melding
         """
-        data = await self.gather_data()
+        if data is None:
+            data = await self.gather_data()
         return self.message_builder.build(data)
 
-    async def send_message(self) -> bool:
+    async def send_message(self, data: dict | None = None) -> bool:
         """
         Sender morgenmeldingen til Discord.
         
+        Args:
+            data: Ferdig innsamlet data, eller None for å samle inn nå
+            
         Returns:
             True hvis meldingen ble sendt, False ellers
         """
         try:
-            message = await self.build_message()
+            message = await self.build_message(data)
             success = await self.discord_service.send(message)
             
             if success:
@@ -157,10 +433,13 @@ class Morgenbot:
             logger.error("morgenbot_error", error=str(e))
             return False
 
-    async def run(self) -> int:
+    async def run(self, data: dict | None = None) -> int:
         """
         Kjører Morgenbot.
         
+        Args:
+            data: Ferdig innsamlet data, eller None for å samle inn nå
+            
         Returns:
             Exit-kode (0 for suksess, 1 for feil)
         """
@@ -171,7 +450,7 @@ class Morgenbot:
             timestamp=datetime.now().isoformat(),
         )
         
-        success = await self.send_message()
+        success = await self.send_message(data)
         
         logger.info(
             "morgenbot_completed",
@@ -181,6 +460,71 @@ class Morgenbot:
         
         return 0 if success else 1
 
+    async def run_fanout(
+        self,
+        subscriptions: list[Subscription],
+        tenant_data: list[dict] | None = None,
+    ) -> int:
+        """
+        Kjører Morgenbot for mange abonnementer med delte oppstrømskall.
+        
+        Args:
+            subscriptions: Abonnementer som skal få melding
+            tenant_data: Ferdig innsamlet data per abonnement, eller None
+                for å samle inn nå
+            
+        Returns:
+            Exit-kode (0 hvis alle meldinger ble sendt, 1 ellers)
+        """
+        logger.info(
+            "morgenbot_fanout_started",
+            version=self.settings.version,
+            subscriptions=len(subscriptions),
+            timestamp=datetime.now().isoformat(),
+        )
+        
+        plan = self.plan(subscriptions)
+        if tenant_data is None:
+            tenant_data = await self.gather_fanout_data(plan)
+        
+        semaphore = asyncio.Semaphore(self.settings.fanout_concurrency)
+        
+        async def deliver(subscription: Subscription, data: dict) -> bool:
+            async with semaphore:
+                return await self._send_to_subscription(subscription, data)
+        
+        results = await asyncio.gather(
+            *(
+                deliver(subscription, data)
+                for subscription, data in zip(plan.subscriptions, tenant_data, strict=True)
+            )
+        )
+        failed = results.count(False)
+        
+        logger.info(
+            "morgenbot_fanout_completed",
+            sent=len(results) - failed,
+            failed=failed,
+            timestamp=datetime.now().isoformat(),
+        )
+        
+        return 0 if failed == 0 else 1
+
+    async def _send_to_subscription(self, subscription: Subscription, data: dict) -> bool:
+        """Bygger og sender melding for ett abonnement."""
+        try:
+            message = self.message_builder.build(data, city=subscription.city)
+            return await self.discord_service.send(
+                message, webhook_url=str(subscription.discord_webhook)
+            )
+        except MorgenbotError as e:
+            logger.error(
+                "subscription_send_failed",
+                subscription=subscription.label,
+                error=str(e),
+            )
+            return False
+
 
 def configure_logging(debug: bool = False) -> None:
     """
@@ -218,14 +562,85 @@ def configure_logging(debug: bool = False) -> None:
     )
 
 
-def main() -> None:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    Tolker kommandolinjeargumenter.
+    
+    Args:
+        argv: Argumenter, standard er sys.argv
+        
+    Returns:
+        Tolkede argumenter
+    """
+    parser = argparse.ArgumentParser(
+        prog="morgenbot",
+        description="Discord-morgenbot med vær, nyheter, økonomi og mer",
+    )
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["run", "serve"],
+        default="run",
+        help="run: send én gang (standard). serve: kjør som daemon etter SCHEDULE",
+    )
+    parser.add_argument(
+        "--send-at",
+        metavar="HH:MM",
+        type=_parse_clock,
+        default=None,
+        help="run: samle inn nå og send ved dette klokkeslettet (lokal tid)",
+    )
+    return parser.parse_args(argv)
+
+
+def _parse_clock(value: str) -> time:
+    """Tolker HH:MM for --send-at."""
+    try:
+        return time.fromisoformat(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Ugyldig klokkeslett: {value}") from e
+
+
+async def run_command(bot: Morgenbot, args: argparse.Namespace) -> int:
+    """
+    Kjører valgt kommando med åpne tilkoblinger.
+    
+    Args:
+        bot: Morgenbot-instans
+        args: Kommandolinjeargumenter
+        
+    Returns:
+        Exit-kode
+    """
+    settings = bot.settings
+    subscriptions = (
+        load_subscriptions(settings.subscriptions_file)
+        if settings.subscriptions_file
+        else None
+    )
+    
+    async with bot:
+        if args.command == "serve":
+            return await MorgenbotDaemon(bot).serve()
+        if args.send_at is not None:
+            tz = ZoneInfo(settings.timezone)
+            send_at = datetime.combine(datetime.now(tz).date(), args.send_at, tzinfo=tz)
+            return await Prefetcher(bot).run_at(send_at, subscriptions)
+        if subscriptions is not None:
+            return await bot.run_fanout(subscriptions)
+        return await bot.run()
+
+
+def main(argv: list[str] | None = None) -> None:
     """Hovedfunksjon - entry point for applikasjonen."""
+    args = parse_args(argv)
+    
     try:
         settings = Settings()
         configure_logging(debug=settings.debug)
         
         bot = Morgenbot(settings)
-        exit_code = asyncio.run(bot.run())
+        exit_code = asyncio.run(run_command(bot, args))
         sys.exit(exit_code)
         
     except KeyboardInterrupt:
@@ -5,6 +5,7 @@ Bygger komplette Discord-meldinger.
 from __future__ import annotations
 
 from datetime import datetime
+from zoneinfo import ZoneInfo
 from typing import TYPE_CHECKING, Any
 
 from morgenbot.builders.field_builders import (
@@ -14,8 +15,10 @@ from morgenbot.builders.field_builders import (
     build_news_fields,
     build_weather_field,
 )
-from morgenbot.config.constants import WEEKDAY_COLORS
+from morgenbot.config.constants import SECTION_NAMES, WEEKDAY_COLORS
+from morgenbot.data.loader import DataLoader
 from morgenbot.models.discord import DiscordMessage, Embed, EmbedField, EmbedFooter
+from morgenbot.models.forecast import day_window
 from morgenbot.utils.date_utils import format_norwegian_date_with_week
 
 if TYPE_CHECKING:
@@ -29,18 +32,21 @@ class MessageBuilder:
 
     def __init__(self, settings: "Settings") -> None:
         self.settings = settings
+        self.data_loader = DataLoader(settings.data_dir)
 
-    def build(self, data: dict[str, Any]) -> DiscordMessage:
+    def build(self, data: dict[str, Any], city: str | None = None) -> DiscordMessage:
         """
         Bygger komplett Discord-melding.
         
         Args:
             data: All innsamlet data
+            city: By meldingen gjelder, standard er settings.city
             
         Returns:
             Ferdig formatert Discord-melding
         """
         now = datetime.now()
+        city = city or self.settings.city
         
         # Bygg embed
         embed = Embed(
@@ -48,7 +54,7 @@ class MessageBuilder:
             color=WEEKDAY_COLORS.get(now.weekday(), 0x5814FF),
             timestamp=now,
             footer=EmbedFooter(
-                text=f"🤖 Morgenbot v{self.settings.version} | {self.settings.city}"
+                text=f"🤖 Morgenbot v{self.settings.version} | {city}"
             ),
         )
         
@@ -62,9 +68,12 @@ class MessageBuilder:
         # Vær
         if weather := data.get("weather"):
             sun = data.get("sun")
-            weather_field = build_weather_field(weather, sun, self.settings.city)
+            weather_field = build_weather_field(weather, sun, city)
             if weather_field:
                 fields.append(weather_field)
+            outlook_field = self._build_outlook_field(weather, data.get("day_summary"))
+            if outlook_field:
+                fields.append(outlook_field)
         
         # Strømpris
         if electricity := data.get("electricity"):
@@ -98,12 +107,76 @@ class MessageBuilder:
         challenge = self._get_daily_challenge()
         fields.append(challenge)
         
+        # Marker seksjoner som ikke rakk fristen
+        if dropped := data.get("dropped"):
+            fields.append(self._build_dropped_field(dropped))
+        
+        # Marker seksjoner som bygger på utdaterte data
+        if stale := data.get("stale"):
+            fields.append(self._build_stale_field(stale))
+        
         # Legg til alle fields i embed
         for field in fields[:25]:  # Max 25 fields
             embed.fields.append(field)
         
         return DiscordMessage(embeds=[embed])
 
+    def _build_outlook_field(self, weather: Any, summary: Any = None) -> EmbedField | None:
+        """
+        Lager field med utsikter for resten av dagen (06-22 lokal tid).
+        
+        Args:
+            weather: Værdata med prognose
+            summary: Dagslysvektet DaySummary, hvis beregnet
+            
+        Returns:
+            Field, eller None hvis prognosen mangler
+        """
+        forecast = getattr(weather, "forecast", None)
+        if forecast is None:
+            return None
+        tz = ZoneInfo(self.settings.timezone)
+        today = datetime.now(tz).date()
+        outlook = forecast.outlook(*day_window(today, self.settings.timezone))
+        if outlook is None:
+            return None
+
+        symbols = self.data_loader.load_weather_symbols()
+        code = outlook.symbol or ""
+        icon = symbols.get(code) or symbols.get(code.split("_")[0])
+        parts = [
+            f"{icon if isinstance(icon, str) else '🌡️'} {outlook.low:.0f}° til {outlook.high:.0f}°",
+            f"💨 opptil {outlook.max_wind:.0f} m/s",
+        ]
+        if outlook.rain_from is not None:
+            start = datetime.fromtimestamp(outlook.rain_from, tz).strftime("%H:%M")
+            parts.append(f"☔ {outlook.precipitation:.1f} mm fra kl. {start}")
+        else:
+            parts.append("☂️ Opphold")
+        if summary is not None:
+            parts.append(f"🧥 Føles som {summary.feels_like:.0f}° i dagslys")
+            if summary.slippery:
+                parts.append("⚠️ Glatt føre")
+        return EmbedField(name="📅 I dag", value=" | ".join(parts), inline=False)
+
+    def _build_dropped_field(self, dropped: list[str]) -> EmbedField:
+        """Lager field som lister seksjoner som ble utelatt pga. tidsfrist."""
+        names = ", ".join(SECTION_NAMES.get(key, key) for key in dropped)
+        return EmbedField(
+            name="⏱️ Utelatt",
+            value=f"Ikke klart i tide: {names}",
+            inline=False,
+        )
+
+    def _build_stale_field(self, stale: list[str]) -> EmbedField:
+        """Lager field som lister seksjoner som viser siste kjente (utdaterte) data."""
+        names = ", ".join(SECTION_NAMES.get(key, key) for key in stale)
+        return EmbedField(
+            name="⚠️ Utdatert",
+            value=f"Viser sist kjente data for: {names}",
+            inline=False,
+        )
+
     def _get_daily_challenge(self) -> EmbedField:
         """Genererer daglig utfordring."""
         import random
@@ -0,0 +1,15 @@
+"""Cache-lag for Morgenbot-tjenestene."""
+
+from morgenbot.cache.backend import MISSING, CacheBackend, Missing, create_backend
+from morgenbot.cache.memory import MemoryCache, estimate_size
+from morgenbot.cache.sqlite import SqliteCache
+
+__all__ = [
+    "MISSING",
+    "Missing",
+    "CacheBackend",
+    "create_backend",
+    "MemoryCache",
+    "SqliteCache",
+    "estimate_size",
+]
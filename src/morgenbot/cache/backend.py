@@ -0,0 +1,141 @@
+"""
+Felles grensesnitt for cache-backends.
+
+CachedService snakker bare med CacheBackend, slik at lagringen kan byttes
+(minne, SQLite eller delt minne) via Settings uten at tjenestene endres.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Generic, Literal, TypeVar
+
+if TYPE_CHECKING:
+    from morgenbot.config.settings import Settings
+
+
+V = TypeVar("V")
+
+
+class Missing(Enum):
+    """Markør for «ikke i cachen», til forskjell fra en lagret None."""
+
+    MISSING = "missing"
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = Missing.MISSING
+
+
+class CacheBackend(ABC, Generic[V]):
+    """
+    Abstrakt cache med TTL.
+
+    None er en gyldig verdi (negativ caching: kilden hadde ingen data), så
+    get() returnerer MISSING når nøkkelen ikke finnes.
+
+    Attributes:
+        stats: Tellere for hits, misses, evictions og expired
+    """
+
+    stats: dict[str, int]
+
+    @abstractmethod
+    def get(self, key: str) -> V | None | Literal[Missing.MISSING]:
+        """Henter en gyldig verdi (som kan være None), eller MISSING."""
+        ...
+
+    @abstractmethod
+    def get_stale(self, key: str) -> tuple[V, float] | None:
+        """
+        Henter en verdi selv om den er utløpt.
+
+        Returns:
+            (verdi, sekunder siden utløp), eller None hvis den ikke er beholdt
+        """
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: V, ttl: float, stale_ttl: float = 0.0) -> None:
+        """
+        Lagrer en verdi.
+
+        Args:
+            key: Cache-nøkkel
+            value: Verdi
+            ttl: Sekunder verdien er fersk
+            stale_ttl: Sekunder verdien beholdes etter utløp, for get_stale
+        """
+        ...
+
+    @abstractmethod
+    def expire(self) -> None:
+        """Markerer alle oppføringer som utløpt, men beholder dem for get_stale."""
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Fjerner en oppføring hvis den finnes."""
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Tømmer cachen."""
+        ...
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Fjerner oppføringer som ikke lenger beholdes og returnerer antallet."""
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @property
+    @abstractmethod
+    def nbytes(self) -> int:
+        """Omtrentlig størrelse på alle oppføringer."""
+        ...
+
+
+def create_backend(settings: "Settings", namespace: str, value_type: Any) -> CacheBackend[Any]:
+    """
+    Lager backend valgt i settings.cache_backend.
+
+    Args:
+        settings: Applikasjonsinnstillinger
+        namespace: Navnerom for nøklene (typisk tjenestenavnet)
+        value_type: Typen som lagres, brukes til (de)serialisering
+
+    Returns:
+        Cache-backend
+    """
+    if settings.cache_backend == "shared":
+        # fcntl finnes bare på Unix, så modulen importeres først her
+        from morgenbot.cache.shared import SharedMemoryCache
+
+        return SharedMemoryCache(
+            settings.cache_shared_path,
+            namespace=namespace,
+            value_type=value_type,
+            size=settings.cache_shared_size,
+        )
+
+    if settings.cache_backend == "sqlite":
+        from morgenbot.cache.sqlite import SqliteCache
+
+        return SqliteCache(
+            settings.cache_path,
+            namespace=namespace,
+            value_type=value_type,
+            max_entries=settings.cache_max_entries,
+            max_bytes=settings.cache_max_bytes,
+        )
+
+    from morgenbot.cache.memory import MemoryCache
+
+    return MemoryCache(max_entries=settings.cache_max_entries, max_bytes=settings.cache_max_bytes)
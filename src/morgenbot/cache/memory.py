@@ -0,0 +1,186 @@
+"""
+Begrenset minnecache med TTL og LRU-utkastelse.
+
+Brukes av CachedService. Cachen holdes under både et maks antall
+oppføringer og en omtrentlig maks størrelse i bytes. Utløpte oppføringer
+beholdes i ``stale_ttl`` sekunder for get_stale(), og fjernes deretter
+av sweep().
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Generic, Literal, TypeVar
+
+from pydantic import BaseModel
+
+from morgenbot.cache.backend import MISSING, CacheBackend, Missing
+
+
+V = TypeVar("V")
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Omtrentlig størrelse på en verdi i bytes.
+
+    Pydantic-modeller måles som JSON, lister og dicts summeres.
+
+    Args:
+        value: Verdi som skal måles
+
+    Returns:
+        Omtrentlig antall bytes
+    """
+    if isinstance(value, BaseModel):
+        return len(value.model_dump_json())
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+@dataclass(slots=True)
+class _Entry(Generic[V]):
+    value: V
+    expires_at: float
+    stale_until: float
+    size: int
+
+
+class MemoryCache(CacheBackend[V], Generic[V]):
+    """
+    TTL-cache med LRU-utkastelse og størrelsesgrenser.
+
+    Attributes:
+        max_entries: Maks antall oppføringer
+        max_bytes: Omtrentlig maks størrelse i bytes
+        stats: Tellere for hits, misses, evictions og expired
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry[V]] = OrderedDict()
+        self._bytes = 0
+        self.stats: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """Omtrentlig størrelse på alle oppføringer."""
+        return self._bytes
+
+    def get(self, key: str) -> V | None | Literal[Missing.MISSING]:
+        """
+        Henter en gyldig verdi.
+
+        Args:
+            key: Cache-nøkkel
+
+        Returns:
+            Verdien (som kan være None), eller MISSING hvis den mangler eller er utløpt
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return MISSING
+        now = time.time()
+        if entry.expires_at <= now:
+            if entry.stale_until <= now:
+                self._remove(key)
+                self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return MISSING
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry.value
+
+    def get_stale(self, key: str) -> tuple[V, float] | None:
+        """
+        Henter en verdi selv om den er utløpt.
+
+        Args:
+            key: Cache-nøkkel
+
+        Returns:
+            (verdi, sekunder siden utløp), eller None
+        """
+        entry = self._entries.get(key)
+        now = time.time()
+        if entry is None or entry.stale_until <= now:
+            return None
+        return entry.value, max(0.0, now - entry.expires_at)
+
+    def set(self, key: str, value: V, ttl: float, stale_ttl: float = 0.0) -> None:
+        """
+        Lagrer en verdi og kaster ut de minst brukte ved behov.
+
+        Args:
+            key: Cache-nøkkel
+            value: Verdi
+            ttl: Levetid i sekunder
+            stale_ttl: Sekunder verdien beholdes etter utløp
+        """
+        if key in self._entries:
+            self._remove(key)
+
+        size = estimate_size(value)
+        expires_at = time.time() + ttl
+        self._entries[key] = _Entry(
+            value=value, expires_at=expires_at, stale_until=expires_at + stale_ttl, size=size
+        )
+        self._bytes += size
+
+        # Den nyeste oppføringen beholdes selv om den alene er over max_bytes
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def delete(self, key: str) -> None:
+        """Fjerner en oppføring hvis den finnes."""
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Tømmer cachen."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def expire(self) -> None:
+        """Markerer alle oppføringer som utløpt."""
+        now = time.time()
+        for entry in self._entries.values():
+            entry.expires_at = min(entry.expires_at, now)
+
+    def sweep(self) -> int:
+        """
+        Fjerner oppføringer som er utløpt og ikke lenger beholdes.
+
+        Returns:
+            Antall fjernede oppføringer
+        """
+        now = time.time()
+        expired = [key for key, entry in self._entries.items() if entry.stale_until <= now]
+        for key in expired:
+            self._remove(key)
+        self.stats["expired"] += len(expired)
+        return len(expired)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
@@ -0,0 +1,321 @@
+"""
+Delt minnecache for flere arbeidsprosesser på samme maskin.
+
+Når tenants fordeles på flere prosesser, deler de én minnemappet fil i
+stedet for at hver prosess henter og holder de samme dataene. Filen består
+av et hode, en hash-indeks med åpen adressering og en append-only arena:
+
+    [hode 64 B][indeks: slots x (hash, offset)][arena: poster ...]
+
+En post er ``expires_at, stale_until, lengde, nøkkellengde, crc32`` fulgt av
+nøkkel og serialisert verdi. Poster endres aldri etter at de er skrevet
+(bortsett fra utløpstiden), så lesing skjer uten lås: leseren følger
+indeksen, og godtar posten bare hvis nøkkelen stemmer og crc32 over nøkkel
+og verdi er riktig. Skrivere holder en fillås (flock) mens de legger til
+poster og oppdaterer indeksen.
+
+Når arenaen eller indeksen er full, tømmes hele filen og fylles på nytt.
+Det er enklere enn kompaktering, og alt kan hentes fra kilden igjen.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Generic, Literal, Optional, TypeVar
+
+import structlog
+from pydantic import TypeAdapter, ValidationError
+
+from morgenbot.cache.backend import MISSING, CacheBackend, Missing
+
+
+logger = structlog.get_logger(__name__)
+
+V = TypeVar("V")
+
+MAGIC = b"MBSC"
+
+# Økes når filformatet endres; en fil med annen versjon initialiseres på nytt
+FORMAT_VERSION = 1
+
+# magic, versjon, slots, brukte slots, tail, generasjon
+_HEADER = struct.Struct("<4sIQQQQ")
+HEADER_SIZE = 64
+
+# hash, offset (0 = slettet)
+_SLOT = struct.Struct("<QQ")
+
+# expires_at, stale_until, lengde på nøkkel+verdi, nøkkellengde, crc32 (+ 4 B fyll)
+_RECORD = struct.Struct("<ddIII4x")
+
+# Én indeksplass per så mange bytes arena
+BYTES_PER_SLOT = 4096
+
+# Indeksen tømmes når så stor andel av plassene er brukt
+MAX_LOAD = 0.7
+
+
+def _hash(key: bytes) -> int:
+    """64-bits hash som aldri er 0 (0 markerer en ledig plass)."""
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class SharedMemoryCache(CacheBackend[V], Generic[V]):
+    """
+    Cache i en minnemappet fil, delt mellom prosesser på samme maskin.
+
+    Verdier serialiseres som JSON via en pydantic TypeAdapter, som i
+    SqliteCache, og ligger bare én gang i minnet uansett hvor mange
+    prosesser som bruker dem. Alle navnerom deler samme fil.
+
+    Attributes:
+        path: Sti til filen
+        namespace: Navnerom for nøklene
+        size: Filstørrelse i bytes
+        stats: Tellere for hits, misses, evictions og expired
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        namespace: str,
+        value_type: Any,
+        size: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.path = path
+        self.namespace = namespace
+        self._prefix = namespace.encode() + b"\0"
+        self._adapter: TypeAdapter[V | None] = TypeAdapter(Optional[value_type])
+        self.stats: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        self.logger = logger.bind(component="SharedMemoryCache", namespace=namespace)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            if not self._valid_header():
+                os.ftruncate(self._fd, size)
+            self.size = os.fstat(self._fd).st_size
+            self._mm = mmap.mmap(self._fd, self.size)
+            if not self._valid_header():
+                self._initialize()
+        self.slots = _HEADER.unpack_from(self._mm, 0)[2]
+        self._arena = HEADER_SIZE + self.slots * _SLOT.size
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._own_records())
+
+    @property
+    def nbytes(self) -> int:
+        """Samlet størrelse på nøkler og verdier i navnerommet."""
+        return sum(_RECORD.unpack_from(self._mm, offset)[2] for _, offset in self._own_records())
+
+    def get(self, key: str) -> V | None | Literal[Missing.MISSING]:
+        """Henter en gyldig verdi uten lås, eller MISSING."""
+        record = self._read(key)
+        now = time.time()
+        if record is None or record[0] <= now:
+            self.stats["misses"] += 1
+            return MISSING
+
+        result = self._decode(key, record[2])
+        self.stats["hits" if result is not MISSING else "misses"] += 1
+        return result
+
+    def get_stale(self, key: str) -> tuple[V, float] | None:
+        """Henter en verdi selv om den er utløpt, med sekunder siden utløp."""
+        record = self._read(key)
+        now = time.time()
+        if record is None or record[1] <= now:
+            return None
+        result = self._decode(key, record[2])
+        return None if result is MISSING else (result, max(0.0, now - record[0]))
+
+    def set(self, key: str, value: V, ttl: float, stale_ttl: float = 0.0) -> None:
+        """Legger verdien til i arenaen og peker indeksen på den."""
+        full_key = self._prefix + key.encode()
+        payload = full_key + self._adapter.dump_json(value)
+        length = _align(_RECORD.size + len(payload))
+        if length > self.size - self._arena:
+            self.logger.warning("shared_cache_value_too_large", key=key, bytes=length)
+            return
+
+        now = time.time()
+        with self._locked():
+            _, _, _, used, tail, _ = _HEADER.unpack_from(self._mm, 0)
+            if tail + length > self.size or used + 1 > self.slots * MAX_LOAD:
+                self._reset()
+                used, tail = 0, self._arena
+
+            _RECORD.pack_into(
+                self._mm, tail, now + ttl, now + ttl + stale_ttl,
+                len(payload), len(full_key), zlib.crc32(payload),
+            )
+            self._mm[tail + _RECORD.size:tail + _RECORD.size + len(payload)] = payload
+
+            slot, new = self._find_slot(full_key, for_write=True)
+            position = HEADER_SIZE + slot * _SLOT.size
+            # Offset skrives før hashen, så en leser aldri ser en hash uten post
+            struct.pack_into("<Q", self._mm, position + 8, tail)
+            struct.pack_into("<Q", self._mm, position, _hash(full_key))
+            self._write_header(used=used + new, tail=tail + length)
+
+    def expire(self) -> None:
+        """Markerer alle oppføringer i navnerommet som utløpt."""
+        now = time.time()
+        with self._locked():
+            for _, offset in self._own_records():
+                if _RECORD.unpack_from(self._mm, offset)[0] > now:
+                    struct.pack_into("<d", self._mm, offset, now)
+
+    def delete(self, key: str) -> None:
+        """Fjerner en oppføring (indeksplassen blir en gravstein)."""
+        with self._locked():
+            slot, _ = self._find_slot(self._prefix + key.encode())
+            if slot is not None:
+                self._tombstone(slot)
+
+    def clear(self) -> None:
+        """Tømmer navnerommet."""
+        with self._locked():
+            for slot, _ in list(self._own_records()):
+                self._tombstone(slot)
+
+    def sweep(self) -> int:
+        """Fjerner oppføringer i navnerommet som ikke lenger beholdes."""
+        now = time.time()
+        removed = 0
+        with self._locked():
+            for slot, offset in list(self._own_records()):
+                if _RECORD.unpack_from(self._mm, offset)[1] <= now:
+                    self._tombstone(slot)
+                    removed += 1
+        self.stats["expired"] += removed
+        return removed
+
+    def close(self) -> None:
+        """Lukker minnemappingen og filen."""
+        self._mm.close()
+        os.close(self._fd)
+
+    def _read(self, key: str) -> tuple[float, float, bytes] | None:
+        """Slår opp en post uten lås: (expires_at, stale_until, verdi), eller None."""
+        full_key = self._prefix + key.encode()
+        slot, _ = self._find_slot(full_key)
+        if slot is None:
+            return None
+        offset = _SLOT.unpack_from(self._mm, HEADER_SIZE + slot * _SLOT.size)[1]
+        return self._record(offset, full_key)
+
+    def _record(self, offset: int, full_key: bytes) -> tuple[float, float, bytes] | None:
+        """Leser og verifiserer en post. None hvis den er overskrevet eller halvskrevet."""
+        if not self._arena <= offset <= self.size - _RECORD.size:
+            return None
+        expires_at, stale_until, length, key_length, crc = _RECORD.unpack_from(self._mm, offset)
+        start = offset + _RECORD.size
+        if key_length != len(full_key) or start + length > self.size:
+            return None
+        payload = self._mm[start:start + length]
+        if payload[:key_length] != full_key or zlib.crc32(payload) != crc:
+            return None
+        return expires_at, stale_until, payload[key_length:]
+
+    def _find_slot(self, full_key: bytes, for_write: bool = False) -> tuple[int | None, bool]:
+        """
+        Finner indeksplassen for en nøkkel med lineær prøving.
+
+        Args:
+            full_key: Nøkkel med navnerom
+            for_write: Returner en ledig plass hvis nøkkelen ikke finnes
+
+        Returns:
+            (plass, om plassen er ny), plass er None hvis nøkkelen mangler
+        """
+        target = _hash(full_key)
+        start = target % self.slots
+        reusable: int | None = None
+        for i in range(self.slots):
+            slot = (start + i) % self.slots
+            slot_hash, offset = _SLOT.unpack_from(self._mm, HEADER_SIZE + slot * _SLOT.size)
+            if slot_hash == 0:
+                if for_write:
+                    return (reusable, False) if reusable is not None else (slot, True)
+                return None, False
+            if slot_hash != target:
+                continue
+            if offset == 0:
+                reusable = slot if reusable is None else reusable
+                continue
+            if self._record(offset, full_key) is not None:
+                return slot, False
+        return (reusable, False) if for_write else (None, False)
+
+    def _own_records(self) -> Iterator[tuple[int, int]]:
+        """Gir (plass, offset) for alle gyldige poster i navnerommet."""
+        for slot in range(self.slots):
+            slot_hash, offset = _SLOT.unpack_from(self._mm, HEADER_SIZE + slot * _SLOT.size)
+            if slot_hash == 0 or offset == 0:
+                continue
+            key_length = _RECORD.unpack_from(self._mm, offset)[3]
+            start = offset + _RECORD.size
+            full_key = bytes(self._mm[start:start + key_length])
+            if full_key.startswith(self._prefix) and self._record(offset, full_key):
+                yield slot, offset
+
+    def _tombstone(self, slot: int) -> None:
+        struct.pack_into("<Q", self._mm, HEADER_SIZE + slot * _SLOT.size + 8, 0)
+
+    def _reset(self) -> None:
+        """Tømmer indeks og arena for alle navnerom (krever lås)."""
+        self.stats["evictions"] += _HEADER.unpack_from(self._mm, 0)[3]
+        self._mm[HEADER_SIZE:self._arena] = bytes(self._arena - HEADER_SIZE)
+        generation = _HEADER.unpack_from(self._mm, 0)[5]
+        self._write_header(used=0, tail=self._arena, generation=generation + 1)
+        self.logger.info("shared_cache_reset", generation=generation + 1)
+
+    def _initialize(self) -> None:
+        """Skriver et nytt hode og en tom indeks (krever lås)."""
+        slots = max(16, self.size // BYTES_PER_SLOT)
+        arena = HEADER_SIZE + slots * _SLOT.size
+        self._mm[:arena] = bytes(arena)
+        _HEADER.pack_into(self._mm, 0, MAGIC, FORMAT_VERSION, slots, 0, arena, 0)
+
+    def _valid_header(self) -> bool:
+        if os.fstat(self._fd).st_size < HEADER_SIZE:
+            return False
+        magic, version = struct.unpack("<4sI", os.pread(self._fd, 8, 0))
+        return magic == MAGIC and version == FORMAT_VERSION
+
+    def _write_header(self, used: int, tail: int, generation: int | None = None) -> None:
+        _, _, slots, _, _, current = _HEADER.unpack_from(self._mm, 0)
+        generation = current if generation is None else generation
+        _HEADER.pack_into(self._mm, 0, MAGIC, FORMAT_VERSION, slots, used, tail, generation)
+
+    def _decode(self, key: str, value: bytes) -> V | None | Literal[Missing.MISSING]:
+        """Deserialiserer en lagret verdi."""
+        try:
+            return self._adapter.validate_json(value)
+        except ValidationError as e:
+            self.logger.warning("cache_decode_failed", key=key, error=str(e))
+            return MISSING
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Eksklusiv fillås for skrivere."""
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
@@ -0,0 +1,262 @@
+"""
+SQLite-backend for cachen.
+
+Lagrer serialiserte modeller (WeatherData, SunTimes, ElectricityPrice,
+NewsData …) med utløpstid i en fil, slik at en ny cron-kjøring, en
+ny sending etter en feilet Discord-post eller en annen tenants jobb kan
+bruke data som ble hentet minutter før. WAL-modus og busy-timeout gjør
+filen trygg å dele mellom flere prosesser.
+
+Kallene går rett på event-loopen, så de venter bare noen millisekunder
+på en lås holdt av en annen prosess. Er filen fortsatt låst, regnes en
+lesing som cache-miss og en skriving hoppes over, i stedet for å holde
+igjen alle korutiner (og tidsfristene) mens låsen holdes.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Generic, Literal, Optional, TypeVar
+
+import structlog
+from pydantic import TypeAdapter, ValidationError
+
+from morgenbot.cache.backend import MISSING, CacheBackend, Missing
+
+
+logger = structlog.get_logger(__name__)
+
+_BUSY_CODES = frozenset({sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED})
+
+V = TypeVar("V")
+
+# Hvor lenge et kall venter på en lås holdt av en annen prosess før det gir opp
+BUSY_TIMEOUT = 0.005
+
+# Ventetid ved åpning, der skjemaet må være på plass før cachen kan brukes
+SETUP_TIMEOUT = 5.0
+
+# Økes når tabellen endres; en cache med annen versjon forkastes
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+class SqliteCache(CacheBackend[V], Generic[V]):
+    """
+    Cache i en SQLite-fil, delt mellom prosesser.
+
+    Verdier serialiseres som JSON via en pydantic TypeAdapter for
+    value_type (eller None, for negative oppføringer). Over max_entries
+    eller max_bytes kastes de eldste oppføringene i navnerommet ut.
+
+    Attributes:
+        path: Sti til databasefilen
+        namespace: Navnerom for nøklene
+        max_entries: Maks antall oppføringer i navnerommet
+        max_bytes: Maks samlet størrelse i navnerommet
+        stats: Tellere for hits, misses, evictions, expired og busy (låst fil)
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        namespace: str,
+        value_type: Any,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+    ) -> None:
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._adapter: TypeAdapter[V | None] = TypeAdapter(Optional[value_type])
+        self.stats: dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+            "busy": 0,
+        }
+        self.logger = logger.bind(component="SqliteCache", namespace=namespace)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=SETUP_TIMEOUT, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction():
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS cache")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.execute(_SCHEMA)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT * 1000)}")
+
+    def __len__(self) -> int:
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        return int(row[0])
+
+    @property
+    def nbytes(self) -> int:
+        """Samlet størrelse på serialiserte verdier i navnerommet."""
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM cache WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()
+        return int(row[0])
+
+    def get(self, key: str) -> V | None | Literal[Missing.MISSING]:
+        """Henter og deserialiserer en gyldig verdi, eller MISSING (også ved låst fil)."""
+        try:
+            row = self._conn.execute(
+                "SELECT value, expires_at, stale_until FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        except sqlite3.OperationalError as e:
+            self._busy(e, "get")
+            row = None
+        if row is None:
+            self.stats["misses"] += 1
+            return MISSING
+
+        value, expires_at, stale_until = row
+        now = time.time()
+        if expires_at <= now:
+            if stale_until <= now:
+                self.delete(key)
+                self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return MISSING
+
+        result = self._decode(key, value)
+        self.stats["hits" if result is not MISSING else "misses"] += 1
+        return result
+
+    def get_stale(self, key: str) -> tuple[V, float] | None:
+        """Henter en verdi selv om den er utløpt, med sekunder siden utløp."""
+        now = time.time()
+        try:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache "
+                "WHERE namespace = ? AND key = ? AND stale_until > ?",
+                (self.namespace, key, now),
+            ).fetchone()
+        except sqlite3.OperationalError as e:
+            self._busy(e, "get_stale")
+            return None
+        if row is None:
+            return None
+        result = self._decode(key, row[0])
+        return None if result is MISSING else (result, max(0.0, now - row[1]))
+
+    def set(self, key: str, value: V, ttl: float, stale_ttl: float = 0.0) -> None:
+        """Serialiserer og lagrer en verdi, og kaster ut de eldste ved behov."""
+        now = time.time()
+        payload = self._adapter.dump_json(value)
+        try:
+            with self._transaction():
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache "
+                    "(namespace, key, value, expires_at, stale_until, stored_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, payload, now + ttl, now + ttl + stale_ttl, now),
+                )
+                self._evict(keep=key)
+        except sqlite3.OperationalError as e:
+            self._busy(e, "set")
+
+    def expire(self) -> None:
+        """Markerer alle oppføringer i navnerommet som utløpt."""
+        now = time.time()
+        try:
+            self._conn.execute(
+                "UPDATE cache SET expires_at = ? WHERE namespace = ? AND expires_at > ?",
+                (now, self.namespace, now),
+            )
+        except sqlite3.OperationalError as e:
+            self._busy(e, "expire")
+
+    def delete(self, key: str) -> None:
+        """Fjerner en oppføring."""
+        try:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+            )
+        except sqlite3.OperationalError as e:
+            self._busy(e, "delete")
+
+    def clear(self) -> None:
+        """Tømmer navnerommet."""
+        self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def sweep(self) -> int:
+        """Fjerner oppføringer i navnerommet som ikke lenger beholdes."""
+        try:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND stale_until <= ?",
+                (self.namespace, time.time()),
+            )
+        except sqlite3.OperationalError as e:
+            # Prøves igjen ved neste opprydding
+            self._busy(e, "sweep")
+            return 0
+        self.stats["expired"] += cursor.rowcount
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Lukker databasetilkoblingen."""
+        self._conn.close()
+
+    def _busy(self, error: sqlite3.OperationalError, operation: str) -> None:
+        """Teller en låst fil; andre databasefeil kastes videre."""
+        if (error.sqlite_errorcode & 0xFF) not in _BUSY_CODES:
+            raise error
+        self.stats["busy"] += 1
+        self.logger.debug("cache_busy", operation=operation)
+
+    def _decode(self, key: str, value: bytes) -> V | None | Literal[Missing.MISSING]:
+        """Deserialiserer en lagret verdi. Verdier med gammelt skjema slettes."""
+        try:
+            return self._adapter.validate_json(value)
+        except ValidationError as e:
+            self.logger.warning("cache_decode_failed", key=key, error=str(e))
+            self.delete(key)
+            return MISSING
+
+    def _transaction(self) -> sqlite3.Connection:
+        """Starter en skrivetransaksjon (BEGIN IMMEDIATE) som avsluttes av with."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def _evict(self, keep: str) -> None:
+        """Kaster ut eldste oppføringer til navnerommet er innenfor grensene."""
+        rows = self._conn.execute(
+            "SELECT key, LENGTH(value) FROM cache WHERE namespace = ? ORDER BY stored_at DESC",
+            (self.namespace,),
+        ).fetchall()
+
+        count = total = 0
+        doomed = []
+        for key, size in rows:
+            count += 1
+            total += size
+            if key != keep and (count > self.max_entries or total > self.max_bytes):
+                doomed.append((self.namespace, key))
+
+        if doomed:
+            self._conn.executemany("DELETE FROM cache WHERE namespace = ? AND key = ?", doomed)
+            self.stats["evictions"] += len(doomed)
@@ -0,0 +1,28 @@
+"""
+Sporing av utdaterte cache-verdier.
+
+Når CachedService svarer med en utdatert verdi (stale-while-revalidate
+eller fordi kilden feilet), registreres nøkkelen i ``stale_reads`` for
+gjeldende kontekst. DagExecutor gir hver node sin egen liste, slik at
+meldingen kan merke akkurat de seksjonene som er utdaterte.
+
+``force_refresh`` ber CachedService hente fra kilden i stedet for å svare
+fra cachen, f.eks. når flyktige seksjoner sjekkes på nytt ved sendetid.
+En utdatert verdi brukes da bare hvis kilden feiler.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+
+
+stale_reads: ContextVar[list[str] | None] = ContextVar("stale_reads", default=None)
+
+force_refresh: ContextVar[bool] = ContextVar("force_refresh", default=False)
+
+
+def mark_stale(key: str) -> None:
+    """Registrerer at en utdatert verdi for ``key`` ble brukt i gjeldende kontekst."""
+    reads = stale_reads.get()
+    if reads is not None:
+        reads.append(key)
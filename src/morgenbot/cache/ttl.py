@@ -0,0 +1,111 @@
+"""
+Levetid (TTL) for cache-oppføringer per tjeneste og nøkkeltype.
+
+En TTL-spesifikasjon er enten et antall sekunder eller en av:
+
+- ``"end_of_day"``: gyldig til midnatt lokal tid (soltider, dagens strømpriser)
+- ``"expires"``: gyldig til kildens ``Expires``/``max-age`` (met.no)
+
+Nøkkeltypen er prefikset før første kolon i cache-nøkkelen, f.eks.
+``sun`` i ``sun:Oslo:2024-06-01``.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+
+END_OF_DAY = "end_of_day"
+UPSTREAM_EXPIRES = "expires"
+
+TtlSpec = float | str
+
+# Utløpstider fra HTTP-svar mottatt mens en verdi lastes
+upstream_expiry: ContextVar[list[float] | None] = ContextVar("upstream_expiry", default=None)
+
+
+def record_upstream_expiry(expires_at: float | None) -> None:
+    """Registrerer kildens utløpstid (Unix-tid) for verdien som lastes nå."""
+    expiries = upstream_expiry.get()
+    if expires_at is not None and expiries is not None:
+        expiries.append(expires_at)
+
+
+def key_kind(key: str) -> str:
+    """Nøkkeltypen, dvs. prefikset før første kolon."""
+    return key.split(":", 1)[0]
+
+
+def parse_ttl_spec(spec: TtlSpec) -> TtlSpec:
+    """
+    Validerer en TTL-spesifikasjon. Tall som tekst gjøres om til float.
+
+    Args:
+        spec: Sekunder, END_OF_DAY eller UPSTREAM_EXPIRES
+
+    Returns:
+        Spesifikasjonen
+
+    Raises:
+        ValueError: Ved ukjent navn eller negativt tall
+    """
+    if isinstance(spec, str) and spec in (END_OF_DAY, UPSTREAM_EXPIRES):
+        return spec
+    try:
+        seconds = float(spec)
+    except ValueError:
+        raise ValueError(
+            f"Ukjent TTL {spec!r}, bruk sekunder, {END_OF_DAY!r} eller {UPSTREAM_EXPIRES!r}"
+        ) from None
+    if seconds < 0:
+        raise ValueError(f"TTL kan ikke være negativ: {spec}")
+    return seconds
+
+
+def seconds_until_end_of_day(timezone: str, now: float | None = None) -> float:
+    """
+    Sekunder til neste midnatt i en tidssone (tar hensyn til sommertid).
+
+    Args:
+        timezone: IANA-tidssone
+        now: Unix-tid, standard er nå
+
+    Returns:
+        Sekunder til midnatt
+    """
+    now = time.time() if now is None else now
+    tz = ZoneInfo(timezone)
+    today = datetime.fromtimestamp(now, tz).date()
+    midnight = datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=tz)
+    return midnight.timestamp() - now
+
+
+def resolve_ttl(
+    spec: TtlSpec,
+    *,
+    timezone: str,
+    fallback: float,
+    upstream_expires: float | None = None,
+) -> float:
+    """
+    Regner ut TTL i sekunder fra en spesifikasjon.
+
+    Args:
+        spec: Sekunder, END_OF_DAY eller UPSTREAM_EXPIRES
+        timezone: Tidssone for END_OF_DAY
+        fallback: TTL når kilden ikke oppga utløpstid
+        upstream_expires: Kildens utløpstid (Unix-tid), hvis kjent
+
+    Returns:
+        TTL i sekunder
+    """
+    if spec == END_OF_DAY:
+        return seconds_until_end_of_day(timezone)
+    if spec == UPSTREAM_EXPIRES:
+        if upstream_expires is None:
+            return fallback
+        return max(0.0, upstream_expires - time.time())
+    return float(spec)
@@ -3,17 +3,21 @@
 from morgenbot.config.constants import (
     ContentType,
     CryptoPrice,
+    CURRENCY_API_URL,
     CURRENCY_PAIRS,
     DEFAULT_CLOTHING_ADVICE,
     DEFAULT_CRYPTOS,
     DEFAULT_STOCKS,
     ElectricityPrice,
     ELECTRICITY_THRESHOLDS,
+    FINANCE_CHART_URL,
+    GROQ_API_URL,
     MONTHS,
     NewsCategory,
     NEWS_FEEDS,
     PowerZone,
     RATE_LIMITS,
+    SECTION_NAMES,
     WEEKDAY_COLORS,
     WEEKDAYS,
 )
@@ -30,6 +34,7 @@ __all__ = [
     "WEEKDAY_COLORS",
     "ELECTRICITY_THRESHOLDS",
     "RATE_LIMITS",
+    "SECTION_NAMES",
     "CRYPTO_SYMBOLS",
     "CLOTHING_THRESHOLDS",
     "DEFAULT_CLOTHING_ADVICE",
@@ -37,4 +42,7 @@ __all__ = [
     "DEFAULT_STOCKS",
     "DEFAULT_CRYPTOS",
     "CURRENCY_PAIRS",
+    "FINANCE_CHART_URL",
+    "CURRENCY_API_URL",
+    "GROQ_API_URL",
 ]
@@ -77,6 +77,17 @@ WEEKDAY_COLORS: Final[dict[int, int]] = {
     6: 0x1ABC9C,  # Søndag - turkis
 }
 
+# Visningsnavn for seksjoner i meldingen
+SECTION_NAMES: Final[dict[str, str]] = {
+    "weather": "Vær",
+    "sun": "Sol",
+    "news": "Nyheter",
+    "finance": "Økonomi",
+    "crypto": "Krypto",
+    "electricity": "Strøm",
+    "ai_greeting": "AI-hilsning",
+}
+
 # Strømpris terskelverider (øre/kWh)
 ELECTRICITY_THRESHOLDS: Final[dict[str, int]] = {
     "low": 50,
@@ -91,6 +102,13 @@ RATE_LIMITS: Final[dict[str, int]] = {
     "yahoo_finance": 100,  # per time
 }
 
+# Standard ratebegrensning per vert (forespørsler per minutt)
+HOST_RATE_LIMITS: Final[dict[str, float]] = {
+    "api.met.no": RATE_LIMITS["met_no"],
+    "api.coingecko.com": RATE_LIMITS["coingecko"],
+    "query1.finance.yahoo.com": RATE_LIMITS["yahoo_finance"] / 60,
+}
+
 # Cryptocurrency symboler
 CRYPTO_SYMBOLS: Final[dict[str, str]] = {
     "bitcoin": "₿",
@@ -137,6 +155,11 @@ NEWS_FEEDS: Final[dict[str, list[str]]] = {
     ],
 }
 
+# Faste API-endepunkter
+FINANCE_CHART_URL: Final[str] = "https://query1.finance.yahoo.com/v8/finance/chart"
+CURRENCY_API_URL: Final[str] = "https://api.exchangerate-api.com/v4/latest/NOK"
+GROQ_API_URL: Final[str] = "https://api.groq.com"
+
 # Standard aksjer å følge
 DEFAULT_STOCKS: Final[list[tuple[str, str]]] = [
     ("^OSEAX", "Oslo Børs"),
@@ -13,6 +13,9 @@ from typing import Literal
 from pydantic import Field, HttpUrl, SecretStr, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from morgenbot.cache.ttl import parse_ttl_spec
+from morgenbot.exceptions.errors import MorgenbotError
+
 
 class Settings(BaseSettings):
     """
@@ -27,12 +30,50 @@ class Settings(BaseSettings):
         debug: Om debug-modus er aktivert
         request_timeout: Timeout for HTTP-forespørsler i sekunder
         cache_ttl: Time-to-live for cache i sekunder
+        cache_ttls: TTL per nøkkeltype (sekunder, "end_of_day" eller "expires")
+        cache_negative_ttl: Sekunder et tomt svar (ingen data) caches
+        cache_error_ttl: Sekunder en feil fra kilden caches før nytt forsøk
+        cache_max_entries: Maks antall oppføringer i cachen per tjeneste
+        cache_max_bytes: Omtrentlig maks størrelse på cachen per tjeneste
+        cache_sweep_interval: Sekunder mellom opprydding av utløpte oppføringer
+        cache_stale_grace: Sekunder etter utløp en verdi brukes mens den hentes på nytt
+        cache_max_stale: Maks sekunder etter utløp en verdi brukes når kilden feiler
+        cache_backend: Hvor cachen lagres ("memory", "sqlite" eller "shared")
+        cache_path: SQLite-fil for cache_backend="sqlite"
+        cache_shared_path: Minnemappet fil for cache_backend="shared"
+        cache_shared_size: Størrelse på den delte cache-filen i bytes
         user_agent: User-Agent header for API-kall
         version: Applikasjonsversjon
         data_dir: Mappe for datafiler
+        geo_index_path: Fil for den minnemappede sted- og soneindeksen
+        location_grid: Rutestørrelse i grader for deling av vær- og soldata
+        sun_api_check: Om de lokalt beregnede soltidene skal kontrolleres mot met.no
         log_level: Logging-nivå
         retry_attempts: Antall forsøk ved feil
         retry_delay: Forsinkelse mellom forsøk i sekunder
+        retry_budget: Maks andel ekstra forespørsler som går til retries
+        subscriptions_file: JSON-fil med abonnementer for fan-out-kjøring
+        fanout_concurrency: Maks antall samtidige Discord-sendinger i fan-out
+        gather_deadline: Global frist for datainnsamling i sekunder
+        service_budgets: Valgfrie tidsbudsjetter per seksjon i sekunder
+        schedule: Cron-uttrykk for sendinger i daemon-modus
+        timezone: Tidssone for schedule
+        prefetch_minutes: Minutter før sendetid innsamlingen starter
+        volatile_sections: Seksjoner som hentes på nytt ved sendetid
+        refresh_budget: Tidsbudsjett for ferskhetssjekken i sekunder
+        http2: Om HTTP/2 skal brukes når h2 er installert
+        http_max_connections: Maks antall tilkoblinger i den delte poolen
+        http_max_connections_per_host: Maks samtidige forespørsler per vert
+        http_keepalive_expiry: Hvor lenge ledige tilkoblinger holdes åpne
+        preconnect: Om kjente verter skal forhåndskobles ved oppstart
+        http_cache: Om HTTP-validatorer og Expires skal respekteres
+        http_cache_max_entries: Maks antall lagrede HTTP-responser
+        rate_limits: Forespørsler per minutt per vert (overstyrer standard)
+        rate_limit_burst: Antall forespørsler som kan sendes samlet før raten gjelder
+        adaptive_concurrency: Om rate og samtidighet skal tilpasses (AIMD)
+        circuit_failure_threshold: Feil på rad før en vert markeres som nede
+        circuit_reset_timeout: Sekunder før en nede vert prøves igjen
+        circuit_state_file: Fil der tilstanden lagres mellom kjøringer
     """
 
     model_config = SettingsConfigDict(
@@ -81,6 +122,81 @@ class Settings(BaseSettings):
         description="Cache TTL i sekunder",
     )
     
+    cache_ttls: dict[str, float | str] = Field(
+        default_factory=dict,
+        description=(
+            "TTL per nøkkeltype, f.eks. {\"weather\": \"expires\", \"sun\": \"end_of_day\", "
+            "\"crypto\": 30}. Overstyrer tjenestenes standard"
+        ),
+    )
+    
+    cache_negative_ttl: float = Field(
+        default=60.0,
+        ge=0,
+        description="Sekunder et tomt svar (ingen data) caches",
+    )
+    
+    cache_error_ttl: float = Field(
+        default=30.0,
+        ge=0,
+        description="Sekunder en feil fra kilden caches, så den ikke spørres på nytt hver gang",
+    )
+    
+    cache_max_entries: int = Field(
+        default=1024,
+        ge=1,
+        le=1_000_000,
+        description="Maks antall oppføringer i cachen per tjeneste",
+    )
+    
+    cache_max_bytes: int = Field(
+        default=16 * 1024 * 1024,
+        ge=1024,
+        description="Omtrentlig maks størrelse på cachen per tjeneste i bytes",
+    )
+    
+    cache_sweep_interval: float = Field(
+        default=60.0,
+        gt=0,
+        description="Sekunder mellom opprydding av utløpte cache-oppføringer",
+    )
+    
+    cache_stale_grace: float = Field(
+        default=60.0,
+        ge=0,
+        description="Sekunder etter utløp en verdi brukes mens den hentes på nytt i bakgrunnen",
+    )
+    
+    cache_max_stale: float = Field(
+        default=6 * 3600.0,
+        ge=0,
+        description="Maks sekunder etter utløp en verdi brukes når kilden feiler",
+    )
+    
+    cache_backend: Literal["memory", "sqlite", "shared"] = Field(
+        default="memory",
+        description=(
+            "Cache i minnet, i en SQLite-fil delt mellom kjøringer, eller i delt minne "
+            "mellom arbeidsprosesser på samme maskin"
+        ),
+    )
+    
+    cache_path: Path = Field(
+        default=Path(".morgenbot/cache.sqlite"),
+        description="SQLite-fil for cache_backend=sqlite",
+    )
+    
+    cache_shared_path: Path = Field(
+        default=Path(".morgenbot/cache.shm"),
+        description="Minnemappet fil for cache_backend=shared, legg den gjerne i /dev/shm",
+    )
+    
+    cache_shared_size: int = Field(
+        default=64 * 1024 * 1024,
+        ge=1024 * 1024,
+        description="Størrelse på den delte cache-filen i bytes",
+    )
+    
     user_agent: str = Field(
         default="Morgenbot/3.0 (https://github.com/username/morgenbot)",
         description="User-Agent for API-kall",
@@ -96,6 +212,29 @@ class Settings(BaseSettings):
         description="Mappe for datafiler",
     )
     
+    location_grid: float = Field(
+        default=0.01,
+        ge=0.0001,
+        le=1.0,
+        description=(
+            "Rutestørrelse i grader: steder i samme rute deler vær- og soldata "
+            "(0.01 er ca. 1 km, 0.0001 er met.no sin maks presisjon)"
+        ),
+    )
+    
+    sun_api_check: bool = Field(
+        default=False,
+        description=(
+            "Hent også soltidene fra met.no Sunrise API og logg avvik fra den lokale "
+            "beregningen (krever nettverk)"
+        ),
+    )
+    
+    geo_index_path: Path | None = Field(
+        default=Path(".morgenbot/geo.idx"),
+        description="Fil for sted- og soneindeksen (bygges fra data_dir), None for kun i minnet",
+    )
+    
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = Field(
         default="INFO",
         description="Logging-nivå",
@@ -114,6 +253,149 @@ class Settings(BaseSettings):
         le=30.0,
         description="Forsinkelse mellom retry i sekunder",
     )
+    
+    retry_budget: float = Field(
+        default=0.1,
+        ge=0.0,
+        le=1.0,
+        description="Maks andel ekstra forespørsler som går til retries",
+    )
+
+    # Fan-out
+    subscriptions_file: Path | None = Field(
+        default=None,
+        description="JSON-fil med abonnementer (by + webhook) for fan-out",
+    )
+    
+    fanout_concurrency: int = Field(
+        default=10,
+        ge=1,
+        le=100,
+        description="Maks antall samtidige Discord-sendinger i fan-out",
+    )
+
+    # Tidsfrister
+    gather_deadline: float | None = Field(
+        default=None,
+        gt=0,
+        le=300,
+        description="Global frist for datainnsamling i sekunder (None = ingen frist)",
+    )
+    
+    service_budgets: dict[str, float] = Field(
+        default_factory=dict,
+        description="Tidsbudsjett per seksjon, f.eks. {\"finance\": 5, \"crypto\": 3}",
+    )
+
+    # Daemon-modus
+    schedule: str = Field(
+        default="0 6 * * *",
+        description="Cron-uttrykk (minutt time dag måned ukedag) i lokal tid",
+    )
+    
+    timezone: str = Field(
+        default="Europe/Oslo",
+        description="Tidssone for schedule",
+    )
+
+    # Forhåndshenting
+    prefetch_minutes: int = Field(
+        default=0,
+        ge=0,
+        le=120,
+        description="Minutter før sendetid innsamlingen starter (0 = av)",
+    )
+    
+    volatile_sections: list[str] = Field(
+        default_factory=lambda: ["crypto", "finance"],
+        description="Seksjoner som sjekkes på nytt ved sendetid",
+    )
+    
+    refresh_budget: float = Field(
+        default=2.0,
+        gt=0,
+        le=30,
+        description="Tidsbudsjett for ferskhetssjekk ved sendetid i sekunder",
+    )
+
+    # HTTP-tilkoblinger
+    http2: bool = Field(
+        default=True,
+        description="Bruk HTTP/2 når h2 er installert",
+    )
+    
+    http_max_connections: int = Field(
+        default=50,
+        ge=1,
+        le=1000,
+        description="Maks antall tilkoblinger i den delte poolen",
+    )
+    
+    http_max_connections_per_host: int = Field(
+        default=6,
+        ge=1,
+        le=100,
+        description="Maks samtidige forespørsler per vert",
+    )
+    
+    http_keepalive_expiry: float = Field(
+        default=60.0,
+        ge=0,
+        le=3600,
+        description="Sekunder ledige tilkoblinger holdes åpne",
+    )
+    
+    preconnect: bool = Field(
+        default=True,
+        description="Forhåndskoble til kjente verter ved oppstart",
+    )
+
+    http_cache: bool = Field(
+        default=True,
+        description="Send betingede forespørsler og respekter Expires",
+    )
+    
+    http_cache_max_entries: int = Field(
+        default=512,
+        ge=1,
+        le=100_000,
+        description="Maks antall lagrede HTTP-responser",
+    )
+    
+    rate_limits: dict[str, float] = Field(
+        default_factory=dict,
+        description="Forespørsler per minutt per vert, f.eks. {\"api.coingecko.com\": 10}",
+    )
+    
+    rate_limit_burst: int = Field(
+        default=10,
+        ge=1,
+        le=1000,
+        description="Antall forespørsler som kan sendes samlet før raten gjelder",
+    )
+    
+    adaptive_concurrency: bool = Field(
+        default=True,
+        description="Senk rate og samtidighet ved 429/5xx og økende svartid",
+    )
+    
+    circuit_failure_threshold: int = Field(
+        default=3,
+        ge=1,
+        le=100,
+        description="Feil på rad før en vert markeres som nede",
+    )
+    
+    circuit_reset_timeout: float = Field(
+        default=60.0,
+        gt=0,
+        description="Sekunder før en vert som er nede prøves igjen",
+    )
+    
+    circuit_state_file: Path | None = Field(
+        default=None,
+        description="Fil der circuit breaker-tilstanden lagres mellom kjøringer",
+    )
 
     # API-konfigurasjoner
     met_api_base_url: HttpUrl = Field(
@@ -145,6 +427,53 @@ class Settings(BaseSettings):
             raise ValueError(f"Datamappe eksisterer ikke: {v}")
         return v
 
+    @field_validator("rate_limits")
+    @classmethod
+    def validate_rate_limits(cls, v: dict[str, float]) -> dict[str, float]:
+        """Validerer at alle rater er positive."""
+        for host, rate in v.items():
+            if rate <= 0:
+                raise ValueError(f"Rate for {host} må være positiv")
+        return v
+
+    @field_validator("cache_ttls")
+    @classmethod
+    def validate_cache_ttls(cls, v: dict[str, float | str]) -> dict[str, float | str]:
+        """Validerer TTL-spesifikasjonene."""
+        return {kind: parse_ttl_spec(spec) for kind, spec in v.items()}
+
+    @field_validator("service_budgets")
+    @classmethod
+    def validate_service_budgets(cls, v: dict[str, float]) -> dict[str, float]:
+        """Validerer at alle budsjetter er positive."""
+        for section, budget in v.items():
+            if budget <= 0:
+                raise ValueError(f"Budsjett for {section} må være positivt")
+        return v
+
+    @field_validator("volatile_sections")
+    @classmethod
+    def validate_volatile_sections(cls, v: list[str]) -> list[str]:
+        """Validerer at bare globale seksjoner regnes som flyktige."""
+        allowed = {"news", "finance", "crypto"}
+        unknown = set(v) - allowed
+        if unknown:
+            raise ValueError(
+                f"Ukjente flyktige seksjoner: {sorted(unknown)}, gyldige er {sorted(allowed)}"
+            )
+        return v
+
+    @model_validator(mode="after")
+    def validate_schedule(self) -> "Settings":
+        """Validerer cron-uttrykk og tidssone."""
+        from morgenbot.runtime.cron import CronSchedule
+        
+        try:
+            CronSchedule(self.schedule, self.timezone)
+        except MorgenbotError as e:
+            raise ValueError(e.message) from e
+        return self
+
     @model_validator(mode="after")
     def validate_settings(self) -> "Settings":
         """Validerer innstillinger etter initialisering."""
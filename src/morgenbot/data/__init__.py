@@ -1,5 +1,24 @@
 """Data loading module for Morgenbot."""
 
+from morgenbot.data.cities import (
+    City,
+    CityRegistry,
+    get_city_registry,
+    normalize_name,
+    parse_coordinates,
+)
+from morgenbot.data.geo import GeoIndex, Place, load_geo_index, snap_to_grid
 from morgenbot.data.loader import DataLoader
 
-__all__ = ["DataLoader"]
+__all__ = [
+    "City",
+    "CityRegistry",
+    "DataLoader",
+    "GeoIndex",
+    "Place",
+    "get_city_registry",
+    "load_geo_index",
+    "normalize_name",
+    "parse_coordinates",
+    "snap_to_grid",
+]
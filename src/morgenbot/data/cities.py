@@ -0,0 +1,299 @@
+"""
+Register over byer med koordinater og strømsone.
+
+Lastes én gang per datamappe og deles av vær-, sol- og strømtjenesten.
+Oppslag går via en normalisert nøkkel (casefold, uten aksenter, æ/ø/å som
+ae/o/a), så «TROMSØ», «tromso» og «Tromsø» finner samme by i O(1).
+
+Navn som ikke finnes i cities.json slås opp blant stedene i geo-indeksen,
+og koordinater («59.91, 10.75») gir nærmeste stedsnavn og strømsonen
+punktet ligger i. Se morgenbot.data.geo.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from morgenbot.data.geo import GeoIndex, load_geo_index
+
+
+logger = structlog.get_logger(__name__)
+
+# Brukes når en by ikke finnes
+FALLBACK_CITY = "Moss"
+FALLBACK_COORDINATES = (59.43, 10.66)
+FALLBACK_ZONE = "NO1"
+
+POWER_ZONES = frozenset({"NO1", "NO2", "NO3", "NO4", "NO5"})
+
+# Koordinater lenger enn dette fra nærmeste sted og utenfor alle soner avvises
+MAX_PLACE_DISTANCE_KM = 100.0
+
+_COORDINATES = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*[,;]\s*(-?\d+(?:\.\d+)?)\s*$")
+
+_NORWEGIAN = str.maketrans({"æ": "ae", "ø": "o", "å": "a"})
+_SEPARATORS = re.compile(r"[\s\-_.]+")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Lager oppslagsnøkkel for et stedsnavn.
+
+    Args:
+        name: Stedsnavn slik brukeren skrev det
+
+    Returns:
+        Nøkkel uten store bokstaver, aksenter og skilletegn
+    """
+    folded = name.casefold().translate(_NORWEGIAN)
+    stripped = "".join(
+        char for char in unicodedata.normalize("NFKD", folded) if not unicodedata.combining(char)
+    )
+    return _SEPARATORS.sub(" ", stripped).strip()
+
+
+def parse_coordinates(text: str) -> tuple[float, float] | None:
+    """
+    Tolker «lat, lon» (komma eller semikolon) som koordinater.
+
+    Args:
+        text: Tekst som kan være koordinater
+
+    Returns:
+        (lat, lon), eller None hvis teksten ikke er gyldige koordinater
+    """
+    match = _COORDINATES.match(text)
+    if match is None:
+        return None
+    lat, lon = float(match.group(1)), float(match.group(2))
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+@dataclass(frozen=True, slots=True)
+class City:
+    """
+    En by i registeret.
+
+    Attributes:
+        name: Visningsnavn
+        lat: Breddegrad
+        lon: Lengdegrad
+        zone: Strømsone (NO1-NO5)
+        aliases: Alternative navn
+    """
+
+    name: str
+    lat: float
+    lon: float
+    zone: str
+    aliases: tuple[str, ...] = ()
+
+    @property
+    def coordinates(self) -> tuple[float, float]:
+        """(lat, lon)."""
+        return self.lat, self.lon
+
+
+class CityRegistry:
+    """
+    Indeksert register over byer.
+
+    Bygges fra cities.json, der hver by har ``lat``, ``lon``,
+    ``strompris_sone`` og eventuelt ``aliases``. Geo-indeksen lastes først
+    når et navn ikke finnes eller koordinater slås opp.
+    """
+
+    def __init__(
+        self, cities: list[City], geo_loader: Callable[[], GeoIndex] | None = None
+    ) -> None:
+        self._geo_loader = geo_loader
+        self._geo: GeoIndex | None = None
+        self._places: dict[str, int] | None = None
+        self._cities = {city.name: city for city in cities}
+        self._index: dict[str, City] = {}
+        for city in cities:
+            for name in (city.name, *city.aliases):
+                key = normalize_name(name)
+                existing = self._index.setdefault(key, city)
+                if existing is not city:
+                    logger.warning("city_alias_conflict", name=name, city=existing.name)
+
+    @classmethod
+    def from_file(
+        cls, path: Path, geo_loader: Callable[[], GeoIndex] | None = None
+    ) -> "CityRegistry":
+        """
+        Laster registeret fra en JSON-fil.
+
+        Byer med manglende koordinater eller ukjent strømsone hoppes over
+        med en advarsel.
+
+        Args:
+            path: Sti til cities.json
+            geo_loader: Laster geo-indeksen ved første behov
+
+        Returns:
+            Ferdig indeksert register
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                raw: dict[str, dict[str, Any]] = json.load(f)
+        except FileNotFoundError:
+            logger.error("file_not_found", filename=path.name)
+            raw = {}
+        except json.JSONDecodeError as e:
+            logger.error("json_decode_error", filename=path.name, error=str(e))
+            raw = {}
+
+        cities = []
+        for name, data in raw.items():
+            zone = data.get("strompris_sone", FALLBACK_ZONE)
+            if zone not in POWER_ZONES or "lat" not in data or "lon" not in data:
+                logger.warning("city_invalid", city=name, zone=zone)
+                continue
+            cities.append(
+                City(
+                    name=name,
+                    lat=float(data["lat"]),
+                    lon=float(data["lon"]),
+                    zone=zone,
+                    aliases=tuple(data.get("aliases", ())),
+                )
+            )
+
+        logger.debug("cities_loaded", cities=len(cities), filename=path.name)
+        return cls(cities, geo_loader)
+
+    def __len__(self) -> int:
+        return len(self._cities)
+
+    def __iter__(self) -> Iterator[City]:
+        return iter(self._cities.values())
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.find(name) is not None
+
+    def find(self, name: str) -> City | None:
+        """
+        Slår opp en by på navn eller alias.
+
+        Args:
+            name: Stedsnavn, uavhengig av store bokstaver og aksenter
+
+        Returns:
+            Byen, eller None hvis den ikke finnes
+        """
+        return self._index.get(normalize_name(name))
+
+    @property
+    def geo(self) -> GeoIndex | None:
+        """Geo-indeksen, lastet ved første bruk, eller None hvis den ikke er satt opp."""
+        if self._geo is None and self._geo_loader is not None:
+            self._geo = self._geo_loader()
+        return self._geo
+
+    def locate(self, lat: float, lon: float) -> City | None:
+        """
+        Lager en by for vilkårlige koordinater.
+
+        Navnet er nærmeste sted, og sonen er den punktet ligger i (eller
+        nærmeste steds sone for punkter utenfor sonene, f.eks. til havs).
+
+        Args:
+            lat: Breddegrad
+            lon: Lengdegrad
+
+        Returns:
+            By med de gitte koordinatene, eller None hvis punktet er utenfor Norge
+        """
+        geo = self.geo
+        nearest = geo.nearest(lat, lon) if geo is not None else None
+        if nearest is None:
+            return None
+        place, distance = nearest
+        zone = geo.zone_at(lat, lon)
+        if zone is None and distance > MAX_PLACE_DISTANCE_KM:
+            return None
+        return City(name=place.name, lat=lat, lon=lon, zone=zone or place.zone or FALLBACK_ZONE)
+
+    def find_place(self, name: str) -> City | None:
+        """
+        Slår opp et navn blant stedene i geo-indeksen.
+
+        Args:
+            name: Stedsnavn
+
+        Returns:
+            Stedet som by, eller None
+        """
+        geo = self.geo
+        if geo is None:
+            return None
+        if self._places is None:
+            self._places = {}
+            for index in range(len(geo)):
+                self._places.setdefault(normalize_name(geo.place(index).name), index)
+        index = self._places.get(normalize_name(name))
+        if index is None:
+            return None
+        place = geo.place(index)
+        return City(name=place.name, lat=place.lat, lon=place.lon, zone=place.zone or FALLBACK_ZONE)
+
+    def resolve(self, name: str) -> City:
+        """
+        Slår opp en by, et sted eller koordinater, med FALLBACK_CITY ellers.
+
+        Args:
+            name: Bynavn, stedsnavn eller «lat, lon»
+
+        Returns:
+            Byen, eller reservebyen
+        """
+        city = self.find(name)
+        if city is not None:
+            return city
+
+        coordinates = parse_coordinates(name)
+        city = self.locate(*coordinates) if coordinates else self.find_place(name)
+        if city is not None:
+            return city
+
+        logger.warning("city_not_found", city=name, fallback=FALLBACK_CITY)
+        fallback = self.find(FALLBACK_CITY)
+        if fallback is not None:
+            return fallback
+        lat, lon = FALLBACK_COORDINATES
+        return City(name=FALLBACK_CITY, lat=lat, lon=lon, zone=FALLBACK_ZONE)
+
+
+_registries: dict[Path, CityRegistry] = {}
+
+
+def get_city_registry(data_dir: Path, geo_index_path: Path | None = None) -> CityRegistry:
+    """
+    Henter det prosessdelte byregisteret for en datamappe.
+
+    Args:
+        data_dir: Mappe med cities.json, places.json og power_zones.json
+        geo_index_path: Hvor geo-indeksen lagres (ved første kall), None for kun i minnet
+
+    Returns:
+        Delt CityRegistry, lastet ved første kall
+    """
+    path = (data_dir / "cities.json").resolve()
+    registry = _registries.get(path)
+    if registry is None:
+        registry = _registries[path] = CityRegistry.from_file(
+            path, geo_loader=lambda: load_geo_index(data_dir, geo_index_path)
+        )
+    return registry
@@ -0,0 +1,357 @@
+"""
+Offline oppslag av nærmeste sted og strømsone fra koordinater.
+
+Stedene i places.json legges i et k-d-tre (implisitt, balansert, over
+enhetsvektorer på kulen), og strømsonene i power_zones.json som polygoner
+med avgrensningsbokser. Alt skrives én gang til en binær indeksfil som
+minnemappes, slik at nye prosesser slipper å bygge indeksen på nytt og
+deler sidene i minnet. Filen bygges på nytt når kildefilene endres.
+
+Filformat (little-endian, hver seksjon justert til 8 bytes)::
+
+    hode | vektorer (n x 3 d) | lat/lon (n x 2 d) | sone per sted (n B)
+    | navneoffset (n+1 I) | navn (UTF-8) | soner (z x ZONE) | hjørner (v x 2 d)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+MAGIC = b"MBGI"
+
+# Økes når filformatet endres
+FORMAT_VERSION = 1
+
+# magic, versjon, signatur, steder, soner, hjørner, bytes med navn
+_HEADER = struct.Struct("<4sIQIIII")
+
+# sonenavn, første hjørne, antall hjørner, min_lon, min_lat, max_lon, max_lat
+_ZONE = struct.Struct("<4sII4x4d")
+
+EARTH_RADIUS_KM = 6371.0
+
+NO_ZONE = 255
+
+
+def snap_to_grid(lat: float, lon: float, cell: float = 0.0001) -> tuple[float, float]:
+    """
+    Runder koordinater til nærmeste punkt i et rutenett.
+
+    Met.no ber om maks fire desimaler, så resultatet rundes alltid dit.
+    Steder i samme rute får like koordinater og deler dermed oppslag.
+
+    Args:
+        lat: Breddegrad
+        lon: Lengdegrad
+        cell: Rutestørrelse i grader
+
+    Returns:
+        (lat, lon) for ruten
+    """
+    return round(round(lat / cell) * cell, 4), round(round(lon / cell) * cell, 4)
+
+
+def _unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lon)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def _chord_to_km(chord_squared: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_squared) / 2))
+
+
+def _pad(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _contains(vertices: Sequence[float], start: int, count: int, lon: float, lat: float) -> bool:
+    """Strålekasting: om (lon, lat) ligger i polygonet vertices[start:start+count]."""
+    inside = False
+    j = start + count - 1
+    for i in range(start, start + count):
+        xi, yi = vertices[2 * i], vertices[2 * i + 1]
+        xj, yj = vertices[2 * j], vertices[2 * j + 1]
+        if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+@dataclass(frozen=True, slots=True)
+class Place:
+    """
+    Et sted i indeksen.
+
+    Attributes:
+        name: Stedsnavn
+        lat: Breddegrad
+        lon: Lengdegrad
+        zone: Strømsone stedet ligger i, eller None
+    """
+
+    name: str
+    lat: float
+    lon: float
+    zone: str | None
+
+
+class GeoIndex:
+    """
+    Minnemappet indeks over steder og strømsoner.
+
+    Attributes:
+        signature: Hash av kildefilene indeksen ble bygget fra
+    """
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        self._buffer = buffer
+        view = memoryview(buffer)
+        magic, version, self.signature, n, zones, vertices, names = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Ukjent format på geo-indeks")
+
+        offset = _pad(_HEADER.size)
+
+        def section(size: int) -> memoryview:
+            nonlocal offset
+            part = view[offset:offset + size]
+            offset += _pad(size)
+            return part
+
+        self._n = n
+        self._vectors = section(n * 24).cast("d")
+        self._coordinates = section(n * 16).cast("d")
+        self._place_zones = section(n)
+        self._name_offsets = section((n + 1) * 4).cast("I")
+        self._names = section(names)
+        zone_table = section(zones * _ZONE.size)
+        self._zones = [_ZONE.unpack_from(zone_table, i * _ZONE.size) for i in range(zones)]
+        self._zone_names = [name.rstrip(b"\0").decode() for name, *_ in self._zones]
+        self._vertices = section(vertices * 16).cast("d")
+
+    def __len__(self) -> int:
+        return self._n
+
+    @classmethod
+    def open(cls, path: Path) -> "GeoIndex":
+        """Minnemapper en indeksfil."""
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def build(
+        cls,
+        places: list[tuple[str, float, float]],
+        zones: dict[str, list[tuple[float, float]]],
+        signature: int = 0,
+    ) -> bytes:
+        """
+        Bygger indeksfilen.
+
+        Args:
+            places: (navn, lat, lon) per sted
+            zones: Strømsone -> polygon som [(lon, lat), ...]
+            signature: Hash av kildefilene
+
+        Returns:
+            Innholdet i indeksfilen
+        """
+        zone_names = sorted(zones)
+        vertices = [value for name in zone_names for point in zones[name] for value in point]
+        zone_table = []
+        start = 0
+        for name in zone_names:
+            lons = [lon for lon, _ in zones[name]]
+            lats = [lat for _, lat in zones[name]]
+            count = len(zones[name])
+            zone_table.append(
+                (name.encode(), start, count, min(lons), min(lats), max(lons), max(lats))
+            )
+            start += count
+
+        def zone_of(lat: float, lon: float) -> int:
+            for i, (_, first, count, *_) in enumerate(zone_table):
+                if _contains(vertices, first, count, lon, lat):
+                    return i
+            return NO_ZONE
+
+        vectors = [_unit_vector(lat, lon) for _, lat, lon in places]
+        order = list(range(len(places)))
+        stack = [(0, len(order), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= 1:
+                continue
+            axis = depth % 3
+            order[lo:hi] = sorted(order[lo:hi], key=lambda i: vectors[i][axis])
+            mid = (lo + hi) // 2
+            stack.append((lo, mid, depth + 1))
+            stack.append((mid + 1, hi, depth + 1))
+
+        encoded = [places[i][0].encode() for i in order]
+        name_offsets = [0]
+        for name in encoded:
+            name_offsets.append(name_offsets[-1] + len(name))
+        names = b"".join(encoded)
+
+        parts = [
+            _HEADER.pack(
+                MAGIC, FORMAT_VERSION, signature, len(places), len(zone_names),
+                len(vertices) // 2, len(names),
+            ),
+            struct.pack(f"<{3 * len(order)}d", *(v for i in order for v in vectors[i])),
+            struct.pack(f"<{2 * len(order)}d", *(v for i in order for v in places[i][1:])),
+            bytes(zone_of(places[i][1], places[i][2]) for i in order),
+            struct.pack(f"<{len(name_offsets)}I", *name_offsets),
+            names,
+            b"".join(_ZONE.pack(*row) for row in zone_table),
+            struct.pack(f"<{len(vertices)}d", *vertices),
+        ]
+        return b"".join(part + bytes(_pad(len(part)) - len(part)) for part in parts)
+
+    def place(self, index: int) -> Place:
+        """Stedet med gitt posisjon i indeksen."""
+        start, end = self._name_offsets[index], self._name_offsets[index + 1]
+        zone = self._place_zones[index]
+        return Place(
+            name=bytes(self._names[start:end]).decode(),
+            lat=self._coordinates[2 * index],
+            lon=self._coordinates[2 * index + 1],
+            zone=None if zone == NO_ZONE else self._zone_names[zone],
+        )
+
+    def nearest(self, lat: float, lon: float) -> tuple[Place, float] | None:
+        """
+        Finner nærmeste sted.
+
+        Args:
+            lat: Breddegrad
+            lon: Lengdegrad
+
+        Returns:
+            (sted, avstand i km), eller None hvis indeksen er tom
+        """
+        if self._n == 0:
+            return None
+        query = _unit_vector(lat, lon)
+        vectors = self._vectors
+        best, best_index = math.inf, -1
+        stack = [(0, self._n, 0, 0.0)]
+        while stack:
+            lo, hi, depth, bound = stack.pop()
+            if bound >= best:
+                continue
+            mid = (lo + hi) // 2
+            base = 3 * mid
+            dx = query[0] - vectors[base]
+            dy = query[1] - vectors[base + 1]
+            dz = query[2] - vectors[base + 2]
+            distance = dx * dx + dy * dy + dz * dz
+            if distance < best:
+                best, best_index = distance, mid
+
+            axis = depth % 3
+            diff = query[axis] - vectors[base + axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            if far[0] < far[1] and diff * diff < best:
+                stack.append((*far, depth + 1, diff * diff))
+            if near[0] < near[1]:
+                stack.append((*near, depth + 1, 0.0))
+
+        return self.place(best_index), _chord_to_km(best)
+
+    def zone_at(self, lat: float, lon: float) -> str | None:
+        """
+        Finner strømsonen et punkt ligger i.
+
+        Args:
+            lat: Breddegrad
+            lon: Lengdegrad
+
+        Returns:
+            Sonenavn, eller None hvis punktet er utenfor alle soner
+        """
+        for name, (_, start, count, min_lon, min_lat, max_lon, max_lat) in zip(
+            self._zone_names, self._zones
+        ):
+            if not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+                continue
+            if _contains(self._vertices, start, count, lon, lat):
+                return name
+        return None
+
+
+def _read_json(path: Path) -> Any:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.error("file_not_found", filename=path.name)
+    except json.JSONDecodeError as e:
+        logger.error("json_decode_error", filename=path.name, error=str(e))
+    return {}
+
+
+def load_geo_index(data_dir: Path, index_path: Path | None = None) -> GeoIndex:
+    """
+    Åpner geo-indeksen, og bygger den hvis den mangler eller er utdatert.
+
+    Args:
+        data_dir: Mappe med places.json og power_zones.json
+        index_path: Hvor indeksen lagres, eller None for å holde den i minnet
+
+    Returns:
+        Ferdig GeoIndex
+    """
+    sources = [data_dir / "places.json", data_dir / "power_zones.json"]
+    digest = hashlib.blake2b(digest_size=8)
+    for source in sources:
+        if source.exists():
+            digest.update(source.read_bytes())
+    signature = int.from_bytes(digest.digest(), "little")
+
+    if index_path is not None and index_path.exists():
+        try:
+            index = GeoIndex.open(index_path)
+            if index.signature == signature:
+                return index
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning("geo_index_invalid", path=str(index_path), error=str(e))
+
+    places = [
+        (name, float(lat), float(lon))
+        for name, lat, lon in _read_json(sources[0]).get("places", [])
+    ]
+    zones = {
+        name: [(float(lon), float(lat)) for lon, lat in polygon]
+        for name, polygon in _read_json(sources[1]).get("zones", {}).items()
+    }
+    data = GeoIndex.build(places, zones, signature)
+    logger.info("geo_index_built", places=len(places), zones=len(zones))
+
+    if index_path is None:
+        return GeoIndex(data)
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        # Skriv til en midlertidig fil og bytt, så andre prosesser aldri ser en halv fil
+        tmp = index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, index_path)
+        return GeoIndex.open(index_path)
+    except OSError as e:
+        logger.warning("geo_index_write_failed", path=str(index_path), error=str(e))
+        return GeoIndex(data)
@@ -2,11 +2,13 @@
 
 from morgenbot.exceptions.errors import (
     APIError,
+    CircuitOpenError,
     ConfigurationError,
     DataLoadError,
     DiscordError,
     FinanceAPIError,
     MorgenbotError,
+    RateLimitError,
     ValidationError,
     WeatherAPIError,
 )
@@ -15,8 +17,10 @@ __all__ = [
     "MorgenbotError",
     "ConfigurationError",
     "APIError",
+    "CircuitOpenError",
     "WeatherAPIError",
     "FinanceAPIError",
+    "RateLimitError",
     "DiscordError",
     "DataLoadError",
     "ValidationError",
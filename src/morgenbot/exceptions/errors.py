@@ -45,6 +45,16 @@ class FinanceAPIError(APIError):
     pass
 
 
+class RateLimitError(APIError):
+    """Ratebegrensning ville holdt kallet forbi tidsfristen."""
+    pass
+
+
+class CircuitOpenError(APIError):
+    """Kilden er markert som nede og kalles ikke."""
+    pass
+
+
 class DiscordError(MorgenbotError):
     """Feil ved Discord-kommunikasjon."""
     pass
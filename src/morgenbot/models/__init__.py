@@ -25,7 +25,9 @@ from morgenbot.models.finance import (
     StockQuote,
     TrendDirection,
 )
+from morgenbot.models.forecast import DayOutlook, Forecast, day_window
 from morgenbot.models.news import NewsData, NewsItem
+from morgenbot.models.subscription import Subscription
 from morgenbot.models.weather import (
     CurrentWeather,
     SunTimes,
@@ -39,6 +41,9 @@ __all__ = [
     "CurrentWeather",
     "SunTimes",
     "WeatherData",
+    "Forecast",
+    "DayOutlook",
+    "day_window",
     # Finance models
     "TrendDirection",
     "StockQuote",
@@ -64,4 +69,6 @@ __all__ = [
     "EmbedImage",
     "Embed",
     "DiscordMessage",
+    # Subscription models
+    "Subscription",
 ]
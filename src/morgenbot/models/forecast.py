@@ -0,0 +1,291 @@
+"""
+Kolonnebasert værprognose for hele locationforecast-serien.
+
+Met.no sender rundt 90 tidssteg per oppslag. I stedet for én modell per
+steg lagres seriene som kompakte arrays (epoch-tid, temperatur, vind,
+fuktighet, nedbør og symbolkode som indeks i en liten tabell), og spørringer over et
+tidsrom («i dag 06–22») gjøres med binærsøk i tidskolonnen.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+# Nedbør under dette (mm) regnes som opphold
+RAIN_THRESHOLD = 0.1
+
+
+def day_window(
+    day: date, timezone: str, start_hour: int = 6, end_hour: int = 22
+) -> tuple[float, float]:
+    """
+    Tidsrom for en dag i lokal tid, som epoch-sekunder.
+
+    Args:
+        day: Dato
+        timezone: IANA-tidssone
+        start_hour: Første time (inkludert)
+        end_hour: Siste time (ikke inkludert)
+
+    Returns:
+        (start, slutt) i epoch-sekunder
+    """
+    tz = ZoneInfo(timezone)
+    start = datetime.combine(day, time(start_hour), tzinfo=tz)
+    end = datetime.combine(day, time(end_hour), tzinfo=tz)
+    return start.timestamp(), end.timestamp()
+
+
+@dataclass(frozen=True, slots=True)
+class DayOutlook:
+    """
+    Oppsummering av et tidsrom.
+
+    Attributes:
+        high: Høyeste temperatur
+        low: Laveste temperatur
+        precipitation: Samlet nedbør i mm
+        max_wind: Sterkeste vind i m/s
+        rain_from: Første tidspunkt (epoch) med nedbør, eller None
+        symbol: Vanligste symbolkode
+    """
+
+    high: float
+    low: float
+    precipitation: float
+    max_wind: float
+    rain_from: float | None
+    symbol: str | None
+
+
+class Forecast:
+    """
+    Prognose lagret som kolonner.
+
+    Nedbør og symbol gjelder perioden etter hvert tidssteg: neste time der
+    met.no har timesverdier, ellers neste seks timer (``period``).
+    """
+
+    __slots__ = (
+        "times",
+        "temperature",
+        "wind_speed",
+        "humidity",
+        "precipitation",
+        "period",
+        "symbols",
+        "symbol_names",
+    )
+
+    def __init__(
+        self,
+        times: array,
+        temperature: array,
+        wind_speed: array,
+        humidity: array,
+        precipitation: array,
+        period: array,
+        symbols: array,
+        symbol_names: tuple[str, ...],
+    ) -> None:
+        self.times = times
+        self.temperature = temperature
+        self.wind_speed = wind_speed
+        self.humidity = humidity
+        self.precipitation = precipitation
+        self.period = period
+        self.symbols = symbols
+        self.symbol_names = symbol_names
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __repr__(self) -> str:
+        if not self.times:
+            return "Forecast(steps=0)"
+        return f"Forecast(steps={len(self)}, from={self.times[0]}, to={self.times[-1]})"
+
+    @classmethod
+    def from_timeseries(cls, timeseries: Iterable[dict[str, Any]]) -> "Forecast":
+        """
+        Bygger prognosen fra locationforecast sin ``properties.timeseries``.
+
+        Args:
+            timeseries: Tidssteg fra met.no
+
+        Returns:
+            Prognose med ett element per tidssteg
+        """
+        times, temperature, wind_speed = array("q"), array("f"), array("f")
+        humidity, precipitation = array("f"), array("f")
+        period, symbols = array("B"), array("B")
+        names: dict[str, int] = {}
+
+        for step in timeseries:
+            data = step["data"]
+            details = data["instant"]["details"]
+            if "next_1_hours" in data:
+                hours, following = 1, data["next_1_hours"]
+            elif "next_6_hours" in data:
+                hours, following = 6, data["next_6_hours"]
+            else:
+                hours, following = 0, {}
+            symbol = following.get("summary", {}).get("symbol_code", "")
+            amount = following.get("details", {}).get("precipitation_amount", 0.0)
+            moment = datetime.fromisoformat(step["time"].replace("Z", "+00:00"))
+
+            times.append(int(moment.timestamp()))
+            temperature.append(details.get("air_temperature", math.nan))
+            wind_speed.append(details.get("wind_speed", math.nan))
+            humidity.append(details.get("relative_humidity", math.nan))
+            precipitation.append(amount)
+            period.append(hours)
+            symbols.append(names.setdefault(symbol, len(names)))
+
+        return cls(
+            times,
+            temperature,
+            wind_speed,
+            humidity,
+            precipitation,
+            period,
+            symbols,
+            tuple(names),
+        )
+
+    def window(self, start: float, end: float) -> range:
+        """
+        Indeksene til tidsstegene som starter i [start, end).
+
+        Args:
+            start: Epoch-sekunder (inkludert)
+            end: Epoch-sekunder (ikke inkludert)
+
+        Returns:
+            Område med indekser
+        """
+        return range(bisect_left(self.times, start), bisect_left(self.times, end))
+
+    def symbol(self, index: int) -> str | None:
+        """Symbolkoden for et tidssteg, eller None hvis den mangler."""
+        return self.symbol_names[self.symbols[index]] or None
+
+    def high(self, start: float, end: float) -> float | None:
+        """Høyeste temperatur i tidsrommet."""
+        steps = self.window(start, end)
+        values = [v for v in self.temperature[steps.start:steps.stop] if not math.isnan(v)]
+        return max(values) if values else None
+
+    def low(self, start: float, end: float) -> float | None:
+        """Laveste temperatur i tidsrommet."""
+        steps = self.window(start, end)
+        values = [v for v in self.temperature[steps.start:steps.stop] if not math.isnan(v)]
+        return min(values) if values else None
+
+    def total_precipitation(self, start: float, end: float) -> float:
+        """Samlet nedbør (mm) for tidsstegene i tidsrommet."""
+        steps = self.window(start, end)
+        return float(sum(self.precipitation[steps.start:steps.stop]))
+
+    def first_precipitation(
+        self, start: float, end: float, threshold: float = RAIN_THRESHOLD
+    ) -> float | None:
+        """Første tidspunkt (epoch) med minst ``threshold`` mm nedbør, eller None."""
+        for index in self.window(start, end):
+            if self.precipitation[index] >= threshold:
+                return float(self.times[index])
+        return None
+
+    def outlook(self, start: float, end: float) -> DayOutlook | None:
+        """
+        Oppsummerer tidsrommet.
+
+        Args:
+            start: Epoch-sekunder (inkludert)
+            end: Epoch-sekunder (ikke inkludert)
+
+        Returns:
+            Oppsummering, eller None hvis prognosen ikke dekker tidsrommet
+        """
+        steps = self.window(start, end)
+        high, low = self.high(start, end), self.low(start, end)
+        if not steps or high is None or low is None:
+            return None
+
+        winds = [v for v in self.wind_speed[steps.start:steps.stop] if not math.isnan(v)]
+        symbols = Counter(self.symbols[steps.start:steps.stop]).most_common()
+        symbol = next((self.symbol_names[s] for s, _ in symbols if self.symbol_names[s]), None)
+        return DayOutlook(
+            high=round(high, 1),
+            low=round(low, 1),
+            precipitation=round(self.total_precipitation(start, end), 1),
+            max_wind=round(max(winds), 1) if winds else 0.0,
+            rain_from=self.first_precipitation(start, end),
+            symbol=symbol,
+        )
+
+    def to_dict(self) -> dict[str, list[Any]]:
+        """Serialiserbar form (brukes av cachen)."""
+
+        def floats(values: array) -> list[float | None]:
+            return [None if math.isnan(v) else round(v, 2) for v in values]
+
+        return {
+            "times": list(self.times),
+            "temperature": floats(self.temperature),
+            "wind_speed": floats(self.wind_speed),
+            "humidity": floats(self.humidity),
+            "precipitation": floats(self.precipitation),
+            "period": list(self.period),
+            "symbols": list(self.symbols),
+            "symbol_names": list(self.symbol_names),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, list[Any]]) -> "Forecast":
+        """Gjenoppretter en prognose fra to_dict()."""
+
+        def floats(values: list[float | None]) -> array:
+            return array("f", (math.nan if v is None else v for v in values))
+
+        return cls(
+            array("q", data["times"]),
+            floats(data["temperature"]),
+            floats(data["wind_speed"]),
+            floats(data.get("humidity") or [None] * len(data["times"])),
+            floats(data["precipitation"]),
+            array("B", data["period"]),
+            array("B", data["symbols"]),
+            tuple(data["symbol_names"]),
+        )
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        """Lar Forecast brukes som felt i pydantic-modeller (JSON via to_dict)."""
+
+        def validate(value: Any) -> "Forecast":
+            if isinstance(value, cls):
+                return value
+            if isinstance(value, dict):
+                return cls.from_dict(value)
+            raise ValueError("Forventet Forecast eller dict")
+
+        return core_schema.no_info_plain_validator_function(
+            validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda value: value.to_dict(), when_used="json"
+            ),
+        )
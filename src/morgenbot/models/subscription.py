@@ -0,0 +1,28 @@
+"""
+Datamodeller for abonnementer (by + webhook).
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from pydantic import BaseModel, Field, HttpUrl, field_validator
+
+
+class Subscription(BaseModel):
+    """Et abonnement: én by som sendes til én Discord-webhook."""
+
+    city: str = Field(..., min_length=2, max_length=50, description="By for vær og strømpriser")
+    discord_webhook: HttpUrl = Field(..., description="Discord webhook URL")
+    name: Optional[str] = Field(None, description="Valgfritt navn på abonnementet")
+
+    @field_validator("city")
+    @classmethod
+    def validate_city(cls, v: str) -> str:
+        """Normaliserer bynavn på samme måte som Settings.city."""
+        return v.strip().title()
+
+    @property
+    def label(self) -> str:
+        """Navn brukt i logging."""
+        return self.name or self.city
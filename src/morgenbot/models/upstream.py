@@ -0,0 +1,111 @@
+"""
+Typede skjemaer for svarene fra eksterne API-er.
+
+Speiler bare feltene tjenestene bruker; ukjente felt ignoreres. Skjemaene
+er TypedDict-er med kildens JSON-nøkler (derfor ``NOK_per_kWh`` og
+``regularMarketPrice``), og felt som kan mangle er NotRequired. Med
+msgspec dekodes svarene rett til dict-er med denne formen, uten å bygge
+feltene som ikke er med; uten msgspec gir json.loads de samme dict-ene
+med alle feltene. Tjenestene gjør dem om til pydantic-modellene i
+morgenbot.models. Se morgenbot.services.typed_json.
+"""
+
+from __future__ import annotations
+
+from typing import NotRequired, TypedDict
+
+
+# Met.no locationforecast 2.0
+
+
+class MetInstantDetails(TypedDict):
+    """Øyeblikksverdier for et tidssteg."""
+
+    air_temperature: float
+    wind_speed: float
+    wind_from_direction: NotRequired[float]
+    relative_humidity: NotRequired[float]
+    air_pressure_at_sea_level: NotRequired[float]
+
+
+class MetInstant(TypedDict):
+    details: MetInstantDetails
+
+
+class MetSummary(TypedDict):
+    symbol_code: str
+
+
+class MetPeriodDetails(TypedDict):
+    precipitation_amount: NotRequired[float]
+
+
+class MetPeriod(TypedDict):
+    """Prognose for perioden etter et tidssteg (neste 1 eller 6 timer)."""
+
+    summary: NotRequired[MetSummary]
+    details: NotRequired[MetPeriodDetails]
+
+
+class MetStepData(TypedDict):
+    instant: MetInstant
+    next_1_hours: NotRequired[MetPeriod]
+    next_6_hours: NotRequired[MetPeriod]
+
+
+class MetStep(TypedDict):
+    time: str
+    data: MetStepData
+
+
+class MetProperties(TypedDict):
+    timeseries: list[MetStep]
+
+
+class MetForecast(TypedDict):
+    """Svar fra /locationforecast/2.0/compact."""
+
+    properties: MetProperties
+
+
+# hvakosterstrommen.no: liste med én pris per time
+
+
+class PowerPrice(TypedDict):
+    """Pris for én time."""
+
+    NOK_per_kWh: float
+    time_start: str
+
+
+# CoinGecko /simple/price: {mynt: CoinQuote}
+
+
+class CoinQuote(TypedDict):
+    """Pris for én mynt."""
+
+    nok: NotRequired[float]
+    usd: NotRequired[float]
+    nok_24h_change: NotRequired[float | None]
+
+
+# Yahoo Finance /v8/finance/chart
+
+
+class ChartMeta(TypedDict):
+    regularMarketPrice: NotRequired[float]
+    previousClose: NotRequired[float]
+
+
+class ChartResult(TypedDict):
+    meta: NotRequired[ChartMeta]
+
+
+class Chart(TypedDict):
+    result: NotRequired[list[ChartResult] | None]
+
+
+class ChartResponse(TypedDict):
+    """Svar fra /v8/finance/chart/{symbol}."""
+
+    chart: Chart
@@ -5,10 +5,12 @@ Datamodeller for værdata.
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field, computed_field
 
+from morgenbot.models.forecast import Forecast
+
 
 class WeatherCondition(BaseModel):
     """Værtilstand."""
@@ -53,10 +55,17 @@ class CurrentWeather(BaseModel):
 class SunTimes(BaseModel):
     """Soloppgang og solnedgang."""
     
-    sunrise: str = Field(..., pattern=r"^\d{2}:\d{2}$", description="Soloppgang (HH:MM)")
-    sunset: str = Field(..., pattern=r"^\d{2}:\d{2}$", description="Solnedgang (HH:MM)")
+    sunrise: Optional[str] = Field(
+        None, pattern=r"^\d{2}:\d{2}$", description="Soloppgang (HH:MM), None ved polar"
+    )
+    sunset: Optional[str] = Field(
+        None, pattern=r"^\d{2}:\d{2}$", description="Solnedgang (HH:MM), None ved polar"
+    )
     daylight_hours: int = Field(..., ge=0, le=24, description="Timer med dagslys")
     daylight_minutes: int = Field(..., ge=0, lt=60, description="Minutter med dagslys")
+    polar: Optional[Literal["day", "night"]] = Field(
+        None, description="Midnattssol (day) eller mørketid (night)"
+    )
     
     @computed_field
     @property
@@ -77,6 +86,7 @@ class WeatherData(BaseModel):
     city: str = Field(..., description="By")
     current: CurrentWeather = Field(..., description="Nåværende vær")
     sun: Optional[SunTimes] = Field(None, description="Sol-tider")
+    forecast: Optional[Forecast] = Field(None, description="Hele prognosen som kolonner")
     
     class Config:
         frozen = True
@@ -0,0 +1,15 @@
+"""Kjøremiljø for Morgenbot: planlegging og utførelse av kjøringer."""
+
+from morgenbot.runtime.dag import DagExecutor, DagResult
+from morgenbot.runtime.deadline import Deadline, current_deadline
+from morgenbot.runtime.fanout import FanoutPlan, load_subscriptions, plan_fanout
+
+__all__ = [
+    "DagExecutor",
+    "DagResult",
+    "Deadline",
+    "current_deadline",
+    "FanoutPlan",
+    "load_subscriptions",
+    "plan_fanout",
+]
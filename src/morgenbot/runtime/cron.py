@@ -0,0 +1,168 @@
+"""
+Cron-uttrykk med tidssone.
+
+Tolker vanlige fem-felts cron-uttrykk (minutt time dag måned ukedag) i
+lokal tid, f.eks. Europe/Oslo, slik at "0 6 * * *" betyr 06:00 norsk tid
+både sommer og vinter.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from morgenbot.exceptions.errors import ConfigurationError
+
+
+# (navn, min, maks) for hvert felt
+_FIELDS: tuple[tuple[str, int, int], ...] = (
+    ("minutt", 0, 59),
+    ("time", 0, 23),
+    ("dag", 1, 31),
+    ("måned", 1, 12),
+    ("ukedag", 0, 7),
+)
+
+# Hvor langt frem vi leter før vi gir opp (f.eks. "0 0 30 2 *")
+_MAX_SEARCH_DAYS = 366 * 5
+
+
+def _parse_field(spec: str, name: str, low: int, high: int) -> frozenset[int]:
+    """
+    Tolker ett cron-felt.
+
+    Støtter ``*``, lister (``1,15``), intervaller (``1-5``) og steg (``*/15``).
+
+    Raises:
+        ConfigurationError: Ved ugyldig felt
+    """
+    values: set[int] = set()
+    for part in spec.split(","):
+        step = 1
+        has_step = "/" in part
+        if has_step:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise ConfigurationError(f"Ugyldig steg i cron-felt {name}: {spec!r}")
+            step = int(step_text)
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            if not (start_text.isdigit() and end_text.isdigit()):
+                raise ConfigurationError(f"Ugyldig intervall i cron-felt {name}: {spec!r}")
+            start, end = int(start_text), int(end_text)
+        elif part.isdigit():
+            start = end = int(part)
+            if has_step:
+                end = high
+        else:
+            raise ConfigurationError(f"Ugyldig cron-felt {name}: {spec!r}")
+
+        if not (low <= start <= end <= high):
+            raise ConfigurationError(f"Cron-felt {name} utenfor {low}-{high}: {spec!r}")
+        values.update(range(start, end + 1, step))
+
+    return frozenset(values)
+
+
+class CronSchedule:
+    """
+    Tidsplan fra et cron-uttrykk i en gitt tidssone.
+
+    Sommertid håndteres slik:
+        - Lokale tider som ikke finnes (hoppet over om våren) utløses ikke.
+        - Lokale tider som finnes to ganger (om høsten) utløses bare første gang.
+
+    Attributes:
+        expression: Opprinnelig cron-uttrykk
+        tz: Tidssone uttrykket tolkes i
+    """
+
+    def __init__(self, expression: str, timezone: str = "Europe/Oslo") -> None:
+        """
+        Initialiserer tidsplanen.
+
+        Args:
+            expression: Cron-uttrykk med fem felt
+            timezone: IANA-tidssone
+
+        Raises:
+            ConfigurationError: Ved ugyldig uttrykk eller tidssone
+        """
+        parts = expression.split()
+        if len(parts) != len(_FIELDS):
+            raise ConfigurationError(f"Cron-uttrykk må ha fem felt: {expression!r}")
+
+        try:
+            self.tz = ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError) as e:
+            raise ConfigurationError(f"Ukjent tidssone: {timezone}") from e
+
+        self.expression = expression
+        minutes, hours, days, months, weekdays = (
+            _parse_field(spec, name, low, high)
+            for spec, (name, low, high) in zip(parts, _FIELDS, strict=True)
+        )
+        self._minutes = sorted(minutes)
+        self._hours = sorted(hours)
+        self._days = days
+        self._months = months
+        # Cron bruker 0 og 7 for søndag, Python bruker 6
+        self._weekdays = frozenset((day - 1) % 7 for day in weekdays)
+        # Som i Vixie cron regnes et dagfelt som starter med * (også */2) som
+        # ubegrenset når det avgjøres om dag og ukedag skal kombineres med eller
+        self._any_day = parts[2].startswith("*")
+        self._any_weekday = parts[4].startswith("*")
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r}, {self.tz.key!r})"
+
+    def _matches_date(self, d: date) -> bool:
+        """Sjekker dag/måned/ukedag med vanlig cron-semantikk."""
+        if d.month not in self._months:
+            return False
+
+        day_match = d.day in self._days
+        weekday_match = d.weekday() in self._weekdays
+        if self._any_day or self._any_weekday:
+            # Stegene i et *-felt gjelder fortsatt, så begge må treffe
+            return day_match and weekday_match
+        # Når begge er begrenset holder det at én av dem treffer
+        return day_match or weekday_match
+
+    def _exists(self, local: datetime) -> bool:
+        """Sjekker at en lokal veggklokketid faktisk finnes i tidssonen."""
+        roundtrip = local.astimezone(UTC).astimezone(self.tz)
+        return roundtrip.replace(tzinfo=None) == local.replace(tzinfo=None)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        Finner neste utløsningstidspunkt etter et gitt tidspunkt.
+
+        Args:
+            moment: Tidspunkt med tidssone
+
+        Returns:
+            Neste utløsning, med tidssonen til tidsplanen
+
+        Raises:
+            ConfigurationError: Hvis uttrykket aldri utløses
+        """
+        # Sammenlignes i UTC: i den gjentatte timen om høsten (fold=1) er
+        # kandidaten med fold=0 allerede passert selv om veggklokken er lik
+        utc_moment = moment.astimezone(UTC)
+        day = moment.astimezone(self.tz).date()
+
+        for _ in range(_MAX_SEARCH_DAYS):
+            if self._matches_date(day):
+                for hour in self._hours:
+                    for minute in self._minutes:
+                        candidate = datetime.combine(day, time(hour, minute), tzinfo=self.tz)
+                        if candidate.astimezone(UTC) <= utc_moment or not self._exists(candidate):
+                            continue
+                        return candidate
+            day += timedelta(days=1)
+
+        raise ConfigurationError(f"Cron-uttrykket utløses aldri: {self.expression!r}")
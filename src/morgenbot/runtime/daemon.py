@@ -0,0 +1,224 @@
+"""
+Langtlevende daemon-modus for Morgenbot.
+
+Holder tjenester, tilkoblinger og cacher varme mellom sendinger, og
+sender etter en innebygd tidsplan i stedet for å startes av cron.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import signal
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import structlog
+
+from morgenbot.exceptions.errors import ConfigurationError
+from morgenbot.runtime.cron import CronSchedule
+from morgenbot.runtime.fanout import load_subscriptions
+from morgenbot.runtime.prefetch import Prefetcher
+
+if TYPE_CHECKING:
+    from morgenbot.app import Morgenbot
+    from morgenbot.models.subscription import Subscription
+
+
+logger = structlog.get_logger(__name__)
+
+# Hvor ofte abonnementsfilen sjekkes for endringer mens vi venter
+RELOAD_CHECK_INTERVAL = 30.0
+
+
+class SubscriptionSource:
+    """
+    Abonnementer fra fil som lastes på nytt når filen endres.
+
+    Attributes:
+        path: Sti til abonnementsfilen
+        subscriptions: Sist gyldige abonnementer
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.subscriptions: list[Subscription] = []
+        self._mtime: float | None = None
+        self.logger = logger.bind(component="SubscriptionSource")
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Laster filen på nytt hvis den er endret.
+
+        En ugyldig fil logges og ignoreres, slik at forrige gyldige liste
+        fortsatt brukes.
+
+        Args:
+            force: Last på nytt selv om filen ikke er endret
+
+        Returns:
+            True hvis listen ble oppdatert
+        """
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            self.logger.error("subscriptions_file_missing", path=str(self.path))
+            return False
+
+        if not force and mtime == self._mtime:
+            return False
+
+        try:
+            subscriptions = load_subscriptions(self.path)
+        except ConfigurationError as e:
+            self.logger.error("subscriptions_reload_failed", error=str(e))
+            return False
+
+        self._mtime = mtime
+        self.subscriptions = subscriptions
+        self.logger.info("subscriptions_loaded", count=len(subscriptions))
+        return True
+
+
+class MorgenbotDaemon:
+    """
+    Kjører Morgenbot etter en tidsplan i én langtlevende prosess.
+
+    Attributes:
+        bot: Morgenbot-instans som gjenbrukes mellom sendinger
+        prefetcher: Forhåndshenter data settings.prefetch_minutes før sendetid
+        schedule: Tidsplan for sendinger
+        subscriptions: Abonnementskilde, eller None for enkeltmodus
+    """
+
+    def __init__(self, bot: Morgenbot) -> None:
+        """
+        Initialiserer daemonen.
+
+        Args:
+            bot: Ferdig initialisert Morgenbot
+        """
+        settings = bot.settings
+        self.bot = bot
+        self.prefetcher = Prefetcher(bot)
+        self.schedule = CronSchedule(settings.schedule, settings.timezone)
+        self.subscriptions = (
+            SubscriptionSource(settings.subscriptions_file)
+            if settings.subscriptions_file
+            else None
+        )
+        self._stop = asyncio.Event()
+        self._reload = asyncio.Event()
+
+    def stop(self) -> None:
+        """Ber daemonen avslutte etter pågående sending."""
+        self._stop.set()
+
+    def request_reload(self) -> None:
+        """Ber daemonen laste abonnementer på nytt (f.eks. ved SIGHUP)."""
+        self._reload.set()
+
+    def _install_signal_handlers(self) -> None:
+        """Kobler SIGTERM/SIGINT til stopp og SIGHUP til reload."""
+        loop = asyncio.get_running_loop()
+        handlers = {
+            signal.SIGTERM: self.stop,
+            signal.SIGINT: self.stop,
+            signal.SIGHUP: self.request_reload,
+        }
+        for sig, handler in handlers.items():
+            # Ikke tilgjengelig på alle plattformer (f.eks. Windows)
+            with contextlib.suppress(NotImplementedError, AttributeError, ValueError):
+                loop.add_signal_handler(sig, handler)
+
+    def _refresh_subscriptions(self) -> None:
+        """Laster abonnementer på nytt ved endring eller eksplisitt reload."""
+        if self.subscriptions is None:
+            return
+        force = self._reload.is_set()
+        self._reload.clear()
+        self.subscriptions.refresh(force=force)
+
+    async def _wait_until(self, fire_at: datetime) -> bool:
+        """
+        Venter til et tidspunkt, og sjekker abonnementer underveis.
+
+        Returns:
+            True hvis tidspunktet ble nådd, False hvis daemonen stoppes
+        """
+        while not self._stop.is_set():
+            self._refresh_subscriptions()
+            remaining = (fire_at - datetime.now(UTC)).total_seconds()
+            if remaining <= 0:
+                return True
+
+            reload_wait = asyncio.ensure_future(self._reload.wait())
+            stop_wait = asyncio.ensure_future(self._stop.wait())
+            try:
+                await asyncio.wait(
+                    {reload_wait, stop_wait},
+                    timeout=min(remaining, RELOAD_CHECK_INTERVAL),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                reload_wait.cancel()
+                stop_wait.cancel()
+
+        return False
+
+    async def _run_scheduled(self, fire_at: datetime) -> bool:
+        """
+        Kjører én planlagt runde, med forhåndshenting hvis det er konfigurert.
+
+        Returns:
+            False hvis daemonen ble stoppet underveis
+        """
+        if not await self._wait_until(fire_at - self.prefetcher.lead_time):
+            return False
+
+        subscriptions = None
+        if self.subscriptions is not None:
+            subscriptions = list(self.subscriptions.subscriptions)
+            if not subscriptions:
+                logger.warning("daemon_no_subscriptions")
+                return await self._wait_until(fire_at)
+
+        prepared = await self.prefetcher.prepare(subscriptions)
+        if not await self._wait_until(fire_at):
+            return False
+
+        exit_code = await self.prefetcher.finish(prepared)
+        logger.info("daemon_run_completed", exit_code=exit_code)
+        return True
+
+    async def serve(self) -> int:
+        """
+        Kjører til daemonen stoppes.
+
+        Returns:
+            Exit-kode
+        """
+        self._install_signal_handlers()
+        self._refresh_subscriptions()
+
+        logger.info(
+            "daemon_started",
+            schedule=self.schedule.expression,
+            timezone=self.schedule.tz.key,
+        )
+
+        while not self._stop.is_set():
+            fire_at = self.schedule.next_after(datetime.now(UTC))
+            logger.info("daemon_next_run", fire_at=fire_at.isoformat())
+
+            try:
+                if not await self._run_scheduled(fire_at):
+                    break
+            except Exception as e:
+                # En feilet runde skal ikke ta ned daemonen
+                logger.exception("daemon_run_failed", error=str(e))
+                await self._wait_until(fire_at)
+
+        logger.info("daemon_stopped")
+        return 0
@@ -0,0 +1,276 @@
+"""
+Avhengighetsgraf for datakilder.
+
+Hver node deklarerer hvilke andre noder den trenger, og startes så snart
+disse er ferdige. Avledede seksjoner (som AI-hilsningen) overlapper dermed
+med uavhengige kall i stedet for å vente på alt.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from morgenbot.cache.stale import stale_reads
+from morgenbot.exceptions.errors import ConfigurationError
+from morgenbot.runtime.deadline import Deadline, current_deadline
+
+
+logger = structlog.get_logger(__name__)
+
+NodeFunc = Callable[[dict[Hashable, Any]], Awaitable[Any]]
+
+
+@dataclass
+class Node:
+    """
+    En node i grafen.
+
+    Attributes:
+        key: Unik nøkkel for noden
+        func: Kalles med dict over resultatene til avhengighetene
+        deps: Nøkler noden avhenger av
+        budget: Valgfritt tidsbudsjett i sekunder
+    """
+
+    key: Hashable
+    func: NodeFunc
+    deps: tuple[Hashable, ...] = ()
+    budget: float | None = None
+
+
+@dataclass
+class NodeTiming:
+    """Start- og sluttid for en node, i sekunder fra kjøringens start."""
+
+    started: float
+    finished: float
+
+    @property
+    def duration(self) -> float:
+        """Varighet i sekunder."""
+        return self.finished - self.started
+
+
+@dataclass
+class DagResult:
+    """
+    Resultat av en kjøring.
+
+    Attributes:
+        results: Nøkkel -> resultat (None for feilede eller droppede noder)
+        dropped: Noder som ble avbrutt av frist eller budsjett
+        failed: Noder som kastet en feil
+        stale: Noder som svarte med utdaterte cache-verdier
+        timings: Tidsbruk for noder som ble startet
+        critical_path: Kjeden av noder som bestemte total kjøretid
+    """
+
+    results: dict[Hashable, Any] = field(default_factory=dict)
+    dropped: set[Hashable] = field(default_factory=set)
+    failed: set[Hashable] = field(default_factory=set)
+    stale: set[Hashable] = field(default_factory=set)
+    timings: dict[Hashable, NodeTiming] = field(default_factory=dict)
+    critical_path: list[Hashable] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        """Total kjøretid i sekunder."""
+        return max((t.finished for t in self.timings.values()), default=0.0)
+
+
+class DagExecutor:
+    """
+    Kjører en graf av asynkrone noder med avhengigheter.
+
+    Eksempel:
+        dag = DagExecutor()
+        dag.add("weather", lambda _: weather_service.get_weather("Oslo"))
+        dag.add("news", lambda _: news_service.get_news())
+        dag.add("ai", lambda inputs: ai.generate_greeting(inputs), deps=("weather", "news"))
+        result = await dag.run(Deadline.after(15))
+    """
+
+    def __init__(self) -> None:
+        self._nodes: dict[Hashable, Node] = {}
+
+    def add(
+        self,
+        key: Hashable,
+        func: NodeFunc,
+        deps: tuple[Hashable, ...] = (),
+        budget: float | None = None,
+    ) -> None:
+        """
+        Legger til en node.
+
+        Args:
+            key: Unik nøkkel for noden
+            func: Kalles med dict over avhengighetenes resultater
+            deps: Nøkler noden avhenger av
+            budget: Valgfritt tidsbudsjett i sekunder
+
+        Raises:
+            ConfigurationError: Hvis nøkkelen allerede finnes
+        """
+        if key in self._nodes:
+            raise ConfigurationError(f"Noden {key!r} finnes allerede i grafen")
+        self._nodes[key] = Node(key=key, func=func, deps=tuple(deps), budget=budget)
+
+    def _validate(self) -> None:
+        """Sjekker at alle avhengigheter finnes og at grafen er asyklisk."""
+        for node in self._nodes.values():
+            for dep in node.deps:
+                if dep not in self._nodes:
+                    raise ConfigurationError(
+                        f"Noden {node.key!r} avhenger av ukjent node {dep!r}"
+                    )
+
+        visiting: set[Hashable] = set()
+        visited: set[Hashable] = set()
+
+        def visit(key: Hashable) -> None:
+            if key in visited:
+                return
+            if key in visiting:
+                raise ConfigurationError(f"Syklisk avhengighet ved node {key!r}")
+            visiting.add(key)
+            for dep in self._nodes[key].deps:
+                visit(dep)
+            visiting.discard(key)
+            visited.add(key)
+
+        for key in self._nodes:
+            visit(key)
+
+    async def _run_node(
+        self, node: Node, inputs: dict[Hashable, Any]
+    ) -> tuple[Any, list[str]]:
+        """Kjører én node innenfor sitt budsjett, og sporer utdaterte cache-verdier."""
+        # Noden kjører i egen task, så listen gjelder bare denne noden
+        reads: list[str] = []
+        stale_reads.set(reads)
+        if node.budget is None:
+            return await node.func(inputs), reads
+        return await asyncio.wait_for(node.func(inputs), node.budget), reads
+
+    async def run(self, deadline: Deadline | None = None) -> DagResult:
+        """
+        Kjører grafen.
+
+        Noder startes så snart alle avhengigheter er ferdige. En feilet
+        eller droppet avhengighet gir None som input. Når fristen går ut
+        avbrytes alle kjørende noder, og de som ikke er startet droppes.
+
+        Args:
+            deadline: Global frist, standard er current_deadline
+
+        Returns:
+            Resultat med verdier, tidsbruk og kritisk sti
+        """
+        self._validate()
+        deadline = deadline or current_deadline.get() or Deadline(None)
+
+        result = DagResult(results=dict.fromkeys(self._nodes))
+        dependents: dict[Hashable, list[Hashable]] = {key: [] for key in self._nodes}
+        waiting: dict[Hashable, int] = {}
+        for node in self._nodes.values():
+            waiting[node.key] = len(node.deps)
+            for dep in node.deps:
+                dependents[dep].append(node.key)
+
+        origin = time.monotonic()
+        running: dict[asyncio.Task[Any], Hashable] = {}
+        started: dict[Hashable, float] = {}
+
+        def start(key: Hashable) -> None:
+            node = self._nodes[key]
+            inputs = {dep: result.results[dep] for dep in node.deps}
+            started[key] = time.monotonic() - origin
+            running[asyncio.ensure_future(self._run_node(node, inputs))] = key
+
+        for key, count in waiting.items():
+            if count == 0:
+                start(key)
+
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=deadline.remaining(),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+
+                for task in done:
+                    key = running.pop(task)
+                    result.timings[key] = NodeTiming(started[key], time.monotonic() - origin)
+                    self._collect(task, self._nodes[key], result)
+
+                    for dependent in dependents[key]:
+                        waiting[dependent] -= 1
+                        if waiting[dependent] == 0:
+                            start(dependent)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                # Vent til avbrutte noder har ryddet opp
+                await asyncio.gather(*running, return_exceptions=True)
+
+        for key in running.values():
+            result.dropped.add(key)
+            result.timings[key] = NodeTiming(started[key], time.monotonic() - origin)
+            logger.warning("node_deadline_exceeded", node=str(key))
+        for key in self._nodes:
+            if key not in started:
+                result.dropped.add(key)
+
+        result.critical_path = self._critical_path(result.timings)
+        logger.info(
+            "dag_completed",
+            duration=round(result.duration, 3),
+            critical_path=[str(key) for key in result.critical_path],
+            dropped=[str(key) for key in result.dropped],
+            stale=[str(key) for key in result.stale],
+        )
+        return result
+
+    def _collect(self, task: asyncio.Task[Any], node: Node, result: DagResult) -> None:
+        """Lagrer resultatet av en ferdig node."""
+        exception = task.exception()
+        if isinstance(exception, TimeoutError):
+            result.dropped.add(node.key)
+            logger.warning("node_budget_exceeded", node=str(node.key), budget=node.budget)
+        elif exception is not None:
+            result.failed.add(node.key)
+            logger.warning("node_failed", node=str(node.key), error=str(exception))
+        else:
+            value, reads = task.result()
+            result.results[node.key] = value
+            if reads:
+                result.stale.add(node.key)
+
+    def _critical_path(self, timings: dict[Hashable, NodeTiming]) -> list[Hashable]:
+        """
+        Finner kritisk sti: fra noden som ble sist ferdig, følg hele veien
+        tilbake via den avhengigheten som ble sist ferdig.
+        """
+        if not timings:
+            return []
+
+        path: list[Hashable] = []
+        key: Hashable | None = max(timings, key=lambda k: timings[k].finished)
+        while key is not None:
+            path.append(key)
+            deps = [dep for dep in self._nodes[key].deps if dep in timings]
+            key = max(deps, key=lambda k: timings[k].finished) if deps else None
+
+        path.reverse()
+        return path
@@ -0,0 +1,48 @@
+"""
+Tidsfrister for datainnsamling.
+
+Lar en kjøring sette en global frist slik at det som har kommet inn når
+fristen går ut blir brukt, mens sene kall avbrytes.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+
+
+class Deadline:
+    """
+    Absolutt tidsfrist basert på monotonic-klokken.
+
+    Attributes:
+        expires_at: Tidspunkt (time.monotonic) da fristen går ut, eller None
+    """
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, expires_at: float | None) -> None:
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float | None) -> Deadline:
+        """Lager en frist om gitt antall sekunder (None = ingen frist)."""
+        if seconds is None:
+            return cls(None)
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float | None:
+        """Sekunder igjen til fristen, eller None hvis ubegrenset."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Om fristen har gått ut."""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+
+# Frist for kjøringen som pågår i nåværende kontekst
+current_deadline: ContextVar[Deadline | None] = ContextVar("current_deadline", default=None)
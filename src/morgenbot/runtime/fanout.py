@@ -0,0 +1,127 @@
+"""
+Fan-out-planlegging for mange abonnementer.
+
+Grupperer abonnementer etter oppstrømsnøkkel slik at hver distinkte
+lokasjon (vær/sol) og strømsone bare hentes én gang per kjøring.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import structlog
+from pydantic import ValidationError as PydanticValidationError
+
+from morgenbot.data.geo import snap_to_grid
+from morgenbot.exceptions.errors import ConfigurationError
+from morgenbot.models.subscription import Subscription
+
+
+logger = structlog.get_logger(__name__)
+
+LocationKey = tuple[float, float]
+
+
+@dataclass
+class FanoutPlan:
+    """
+    Plan for én fan-out-kjøring.
+
+    Attributes:
+        subscriptions: Alle abonnementer i kjøringen
+        locations: Lokasjonsnøkkel -> representativ by som brukes ved henting
+        zones: Strømsoner som skal hentes
+        subscription_locations: Indeks i subscriptions -> lokasjonsnøkkel
+        subscription_zones: Indeks i subscriptions -> strømsone
+    """
+
+    subscriptions: list[Subscription]
+    locations: dict[LocationKey, str] = field(default_factory=dict)
+    zones: set[str] = field(default_factory=set)
+    subscription_locations: dict[int, LocationKey] = field(default_factory=dict)
+    subscription_zones: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def upstream_calls(self) -> int:
+        """Antall planlagte oppstrømshentinger (vær, sol, strøm + globale)."""
+        return 2 * len(self.locations) + len(self.zones) + 3
+
+
+def location_key(lat: float, lon: float, grid: float = 0.0001) -> LocationKey:
+    """Lager lokasjonsnøkkel: koordinatene rundet til rutenettet, som i vær-cachen."""
+    return snap_to_grid(lat, lon, grid)
+
+
+def plan_fanout(
+    subscriptions: Iterable[Subscription],
+    locate: Callable[[str], tuple[float, float]],
+    zone_for: Callable[[str], str],
+    grid: float = 0.0001,
+) -> FanoutPlan:
+    """
+    Lager en fan-out-plan for abonnementene.
+
+    Args:
+        subscriptions: Abonnementer som skal betjenes
+        locate: Slår opp (lat, lon) for en by
+        zone_for: Slår opp strømsone for en by
+        grid: Rutestørrelse i grader; steder i samme rute hentes én gang
+
+    Returns:
+        Plan med én henting per distinkte lokasjon og sone
+    """
+    plan = FanoutPlan(subscriptions=list(subscriptions))
+
+    for index, subscription in enumerate(plan.subscriptions):
+        key = location_key(*locate(subscription.city), grid=grid)
+        plan.locations.setdefault(key, subscription.city)
+        plan.subscription_locations[index] = key
+
+        zone = zone_for(subscription.city)
+        plan.zones.add(zone)
+        plan.subscription_zones[index] = zone
+
+    logger.info(
+        "fanout_planned",
+        subscriptions=len(plan.subscriptions),
+        locations=len(plan.locations),
+        zones=len(plan.zones),
+        upstream_calls=plan.upstream_calls,
+    )
+    return plan
+
+
+def load_subscriptions(path: Path) -> list[Subscription]:
+    """
+    Laster abonnementer fra en JSON-fil.
+
+    Filen skal inneholde en liste med objekter med feltene
+    ``city``, ``discord_webhook`` og eventuelt ``name``.
+
+    Args:
+        path: Sti til abonnementsfilen
+
+    Returns:
+        Liste med abonnementer
+
+    Raises:
+        ConfigurationError: Hvis filen mangler eller er ugyldig
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    except FileNotFoundError as e:
+        raise ConfigurationError(f"Fant ikke abonnementsfil: {path}") from e
+    except json.JSONDecodeError as e:
+        raise ConfigurationError(f"Ugyldig JSON i abonnementsfil {path}: {e}") from e
+
+    if not isinstance(raw, list):
+        raise ConfigurationError(f"Abonnementsfilen må inneholde en liste: {path}")
+
+    try:
+        return [Subscription.model_validate(item) for item in raw]
+    except PydanticValidationError as e:
+        raise ConfigurationError(f"Ugyldig abonnement i {path}: {e}") from e
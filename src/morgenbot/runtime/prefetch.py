@@ -0,0 +1,181 @@
+"""
+Forhåndshenting før planlagt sendetid.
+
+Kjører innsamlingen et konfigurerbart antall minutter før sendetid og
+holder resultatet. Ved sendetid sjekkes bare flyktige kilder (krypto,
+finans) på nytt innenfor et kort budsjett før meldingen sendes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from morgenbot.cache.stale import force_refresh
+from morgenbot.runtime.dag import DagExecutor
+
+if TYPE_CHECKING:
+    from morgenbot.app import Morgenbot
+    from morgenbot.models.subscription import Subscription
+
+
+logger = structlog.get_logger(__name__)
+
+# Data eldre enn dette ved sendetid regnes som forhåndshentet
+HELD_THRESHOLD = 1.0
+
+
+@dataclass
+class PreparedRun:
+    """
+    Ferdig innsamlet data som venter på sendetid.
+
+    Attributes:
+        subscriptions: Abonnementer for fan-out, eller None for enkeltmodus
+        data: Én data-dict per mottaker (én for enkeltmodus)
+        prepared_at: Tidspunkt (time.monotonic) da innsamlingen var ferdig
+    """
+
+    subscriptions: list[Subscription] | None
+    data: list[dict[str, Any]] = field(default_factory=list)
+    prepared_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        """Sekunder siden innsamlingen."""
+        return time.monotonic() - self.prepared_at
+
+
+class Prefetcher:
+    """
+    Deler en kjøring i forhåndshenting, ferskhetssjekk og sending.
+
+    Attributes:
+        bot: Morgenbot-instansen som henter og sender
+        lead_time: Hvor lenge før sendetid innsamlingen starter
+    """
+
+    def __init__(self, bot: Morgenbot) -> None:
+        self.bot = bot
+        self.lead_time = timedelta(minutes=bot.settings.prefetch_minutes)
+
+    async def prepare(self, subscriptions: list[Subscription] | None = None) -> PreparedRun:
+        """
+        Samler inn all data nå og holder den.
+
+        Args:
+            subscriptions: Abonnementer for fan-out, eller None for enkeltmodus
+
+        Returns:
+            Forberedt kjøring
+        """
+        if subscriptions is None:
+            data = [await self.bot.gather_data()]
+        else:
+            data = await self.bot.gather_fanout_data(self.bot.plan(subscriptions))
+
+        logger.info("prefetch_completed", recipients=len(data))
+        return PreparedRun(subscriptions=subscriptions, data=data)
+
+    async def refresh(self, prepared: PreparedRun) -> None:
+        """
+        Henter flyktige seksjoner på nytt innenfor settings.refresh_budget.
+
+        Seksjonene hentes fra kilden selv om cachen har en verdi (se
+        force_refresh). Seksjoner som ikke rekker fram beholder verdien fra
+        forhåndshentingen.
+
+        Args:
+            prepared: Forberedt kjøring som oppdateres på stedet
+        """
+        sources = self.bot.global_sources()
+        sections = [s for s in self.bot.settings.volatile_sections if s in sources]
+        if not sections:
+            return
+
+        dag = DagExecutor()
+        for section in sections:
+            _, call = sources[section]
+            dag.add(section, lambda _, call=call: call())
+
+        token = force_refresh.set(True)
+        try:
+            result = await self.bot.run_graph(dag, self.bot.settings.refresh_budget)
+        finally:
+            force_refresh.reset(token)
+
+        refreshed = [s for s in sections if result.results[s] is not None]
+        for data in prepared.data:
+            for section in refreshed:
+                data[section] = result.results[section]
+                if section in data.get("dropped", []):
+                    data["dropped"].remove(section)
+                stale = data.setdefault("stale", [])
+                if section in result.stale and section not in stale:
+                    stale.append(section)
+                elif section not in result.stale and section in stale:
+                    stale.remove(section)
+
+        logger.info(
+            "prefetch_refreshed",
+            refreshed=refreshed,
+            kept=[s for s in sections if s not in refreshed],
+            age=round(prepared.age, 1),
+        )
+
+    async def finish(self, prepared: PreparedRun) -> int:
+        """
+        Ferskhetssjekk (hvis data har ventet på sendetid) og sending.
+
+        Returns:
+            Exit-kode
+        """
+        if prepared.age >= HELD_THRESHOLD:
+            await self.refresh(prepared)
+        return await self.deliver(prepared)
+
+    async def deliver(self, prepared: PreparedRun) -> int:
+        """
+        Bygger og sender meldinger for en forberedt kjøring.
+
+        Returns:
+            Exit-kode (0 for suksess, 1 for feil)
+        """
+        if prepared.subscriptions is None:
+            return await self.bot.run(data=prepared.data[0])
+        return await self.bot.run_fanout(prepared.subscriptions, tenant_data=prepared.data)
+
+    async def run_at(
+        self,
+        send_at: datetime,
+        subscriptions: list[Subscription] | None = None,
+    ) -> int:
+        """
+        Forhåndshenter før send_at, og sender så nær send_at som mulig.
+
+        Hvis send_at allerede er passert sendes det umiddelbart.
+
+        Args:
+            send_at: Planlagt sendetid (med tidssone)
+            subscriptions: Abonnementer for fan-out, eller None for enkeltmodus
+
+        Returns:
+            Exit-kode
+        """
+        await _sleep_until(send_at - self.lead_time)
+        prepared = await self.prepare(subscriptions)
+
+        await _sleep_until(send_at)
+        return await self.finish(prepared)
+
+
+async def _sleep_until(moment: datetime) -> None:
+    """Sover til et gitt tidspunkt (returnerer med en gang hvis passert)."""
+    remaining = (moment - datetime.now(UTC)).total_seconds()
+    if remaining > 0:
+        await asyncio.sleep(remaining)
@@ -6,6 +6,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
+import httpx
 import structlog
 from groq import AsyncGroq
 
@@ -30,11 +31,22 @@ class AIService(BaseService[str]):
         if not settings.groq_api_key:
             raise ValueError("GROQ_API_KEY er påkrevd for AIService")
         
-        self.client = AsyncGroq(
-            api_key=settings.groq_api_key.get_secret_value()
-        )
+        self._groq: AsyncGroq | None = None
+        self._groq_http: httpx.AsyncClient | None = None
         self.model = "llama-3.1-8b-instant"
 
+    @property
+    def groq(self) -> AsyncGroq:
+        """Groq-klient som bruker den delte HTTP-poolen."""
+        # Bygg på nytt hvis den delte klienten er lukket og gjenopprettet
+        if self._groq is None or self._groq_http is not self.client:
+            self._groq_http = self.client
+            self._groq = AsyncGroq(
+                api_key=self.settings.groq_api_key.get_secret_value(),
+                http_client=self._groq_http,
+            )
+        return self._groq
+
     async def generate_greeting(self, data: dict[str, Any]) -> str | None:
         """
         Genererer personlig morgenmelding.
@@ -48,7 +60,7 @@ class AIService(BaseService[str]):
         try:
             prompt = self._build_greeting_prompt(data)
             
-            response = await self.client.chat.completions.create(
+            response = await self.groq.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=200,
@@ -4,17 +4,39 @@ Base-klasse for alle tjenester.
 
 from __future__ import annotations
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any, Generic, TypeVar
+from collections.abc import Awaitable, Callable, Iterable
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Generic,
+    Literal,
+    TypeVar,
+    get_args,
+    get_origin,
+)
 
 import httpx
 import structlog
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
+
+from morgenbot.cache.backend import MISSING, CacheBackend, Missing, create_backend
+from morgenbot.cache.stale import force_refresh, mark_stale
+from morgenbot.cache.ttl import (
+    TtlSpec,
+    key_kind,
+    record_upstream_expiry,
+    resolve_ttl,
+    upstream_expiry,
 )
+from morgenbot.exceptions.errors import CircuitOpenError, RateLimitError
+from morgenbot.services.http_cache import expires_from_headers
+from morgenbot.services.http_client import get_http_registry
+from morgenbot.services.json_select import select_json
+from morgenbot.services.retry import RetryPolicy
+from morgenbot.services.typed_json import decode
 
 if TYPE_CHECKING:
     from morgenbot.config.settings import Settings
@@ -30,8 +52,15 @@ class BaseService(ABC, Generic[T]):
     Abstrakt base-klasse for tjenester.
     
     Gir felles funksjonalitet som HTTP-klient, retry-logikk og logging.
+    Alle tjenester deler den prosessdelte klienten fra HttpClientRegistry.
+    
+    Attributes:
+        retry_overrides: Felt i RetryPolicy som overstyres for tjenesten
+        retry_policy: Retry-policy bygget fra settings og retry_overrides
     """
 
+    retry_overrides: ClassVar[dict[str, Any]] = {}
+
     def __init__(self, settings: "Settings") -> None:
         """
         Initialiserer tjenesten.
@@ -40,34 +69,21 @@ class BaseService(ABC, Generic[T]):
             settings: Applikasjonsinnstillinger
         """
         self.settings = settings
-        self._client: httpx.AsyncClient | None = None
+        self.http = get_http_registry(settings)
+        self.retry_policy = RetryPolicy.from_settings(settings, **self.retry_overrides)
         self.logger = logger.bind(service=self.__class__.__name__)
 
     @property
     def client(self) -> httpx.AsyncClient:
-        """Lazy-initialisert HTTP-klient."""
-        if self._client is None:
-            self._client = httpx.AsyncClient(
-                timeout=self.settings.request_timeout,
-                headers={"User-Agent": self.settings.user_agent},
-            )
-        return self._client
-
-    async def close(self) -> None:
-        """Lukker HTTP-klienten."""
-        if self._client is not None:
-            await self._client.aclose()
-            self._client = None
-
-    @retry(
-        retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        reraise=True,
-    )
+        """Delt HTTP-klient."""
+        return self.http.client
+
     async def _get(self, url: str, **kwargs: Any) -> httpx.Response:
         """
-        Utfører GET-forespørsel med retry.
+        Utfører GET-forespørsel med retry og HTTP-caching.
+        
+        Retries følger retry_policy, innenfor det prosessdelte
+        retry-budsjettet og gjeldende tidsfrist.
         
         Args:
             url: URL å hente
@@ -76,25 +92,119 @@ class BaseService(ABC, Generic[T]):
         Returns:
             HTTP-respons
         """
-        self.logger.debug("http_get", url=url)
-        response = await self.client.get(url, **kwargs)
+        self.http.retry_budget.deposit()
+        started = time.monotonic()
+        async for attempt in self.retry_policy.retrying(
+            self.http.retry_budget, self.http.retry_stats
+        ):
+            with attempt:
+                response = await self._get_once(url, **kwargs)
+        
+        attempts = attempt.retry_state.attempt_number
+        self.http.retry_stats.record(attempts, time.monotonic() - started)
+        if attempts > 1:
+            self.logger.info("http_get_retried", url=url, attempts=attempts)
+        return response
+
+    async def _get_once(self, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Ett GET-forsøk med HTTP-caching.
+        
+        En fersk lagret respons (Expires/max-age) returneres uten nettverkskall.
+        Ellers sendes If-None-Match/If-Modified-Since, og 304 fornyer den
+        lagrede responsen. Er kretsen for verten åpen, returneres siste gode
+        respons hvis den finnes.
+        
+        Args:
+            url: URL å hente
+            **kwargs: Ekstra argumenter til httpx
+            
+        Returns:
+            HTTP-respons
+        """
+        cache = self.http.http_cache
+        key = cache.key(url, kwargs.get("params"))
+        entry = cache.lookup(key) if self.settings.http_cache else None
+        
+        if entry is not None and entry.is_fresh:
+            cache.stats["hit"] += 1
+            self.logger.debug("http_cache_hit", url=url)
+            record_upstream_expiry(entry.expires_at)
+            return entry.to_response()
+        
+        if entry is not None:
+            kwargs["headers"] = {**kwargs.get("headers", {}), **entry.validators()}
+        
+        self.logger.debug("http_get", url=url, conditional=entry is not None)
+        try:
+            response = await self.http.get(url, **kwargs)
+        except CircuitOpenError:
+            if entry is None:
+                raise
+            # Kilden er nede: bruk siste gode svar i stedet for å feile
+            self.logger.warning("circuit_open_serving_stale", url=url)
+            return entry.to_response()
+        
+        if response.status_code == 304 and entry is not None:
+            cache.stats["not_modified"] += 1
+            cache.revalidate(entry, response)
+            record_upstream_expiry(entry.expires_at)
+            return entry.to_response()
+        
         response.raise_for_status()
+        record_upstream_expiry(expires_from_headers(response.headers))
+        if self.settings.http_cache:
+            cache.stats["miss"] += 1
+            cache.store(key, response)
         return response
 
-    async def _get_json(self, url: str, **kwargs: Any) -> dict[str, Any]:
+    async def _get_json(
+        self, url: str, select: Iterable[str] | None = None, **kwargs: Any
+    ) -> dict[str, Any]:
         """
         Henter JSON fra URL.
         
+        Med select dekodes bare de valgte stiene rett fra bytene, og
+        parseren stopper når alle er funnet (se json_select).
+        
         Args:
             url: URL å hente
+            select: Stier som skal beholdes, f.eks. ["chart.result.0.meta"]
             **kwargs: Ekstra argumenter til httpx
             
         Returns:
             JSON-data som dict
         """
         response = await self._get(url, **kwargs)
+        if select is not None:
+            return select_json(response.content, select)
         return response.json()
 
+    async def _get_upstream(
+        self,
+        url: str,
+        target: Any,
+        select: Iterable[str] | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Henter JSON etter et skjema fra morgenbot.models.upstream.
+        
+        Med msgspec dekodes bare feltene i skjemaet, med typesjekk; ellers
+        som _get_json. Begge gir dict-er med samme form (se typed_json).
+        
+        Args:
+            url: URL å hente
+            target: Skjema (eller list[...]/dict[str, ...] av skjemaer)
+            select: Stier som trengs uten msgspec (se _get_json)
+            **kwargs: Ekstra argumenter til httpx
+            
+        Returns:
+            JSON-data som dict/liste
+        """
+        response = await self._get(url, **kwargs)
+        return decode(response.content, target, select)
+
     @abstractmethod
     async def fetch(self) -> T | None:
         """
@@ -109,27 +219,245 @@ class BaseService(ABC, Generic[T]):
 class CachedService(BaseService[T]):
     """
     Tjeneste med caching.
+    
+    Samtidige kall for samme nøkkel deler ett oppstrømskall (single-flight).
+    Cachen er begrenset i antall oppføringer og omtrentlig størrelse, og
+    lagres i minnet eller i SQLite etter settings.cache_backend.
+    
+    Utløpte verdier gir stale-while-revalidate innenfor
+    settings.cache_stale_grace, og brukes som reserve når kilden feiler så
+    lenge de ikke er eldre enn settings.cache_max_stale. Slike svar
+    registreres via mark_stale.
+    
+    Levetiden settes per nøkkeltype (prefikset før første kolon) fra
+    settings.cache_ttls, deretter ttl_policies, og ellers settings.cache_ttl.
+    Se morgenbot.cache.ttl for END_OF_DAY og UPSTREAM_EXPIRES.
+    
+    Negativ caching: None fra loader lagres i settings.cache_negative_ttl,
+    og en feil huskes i settings.cache_error_ttl, slik at en kilde som er
+    nede eller mangler data ikke spørres på nytt for hvert kall.
     """
 
+    # Standard TTL per nøkkeltype, kan overstyres i settings.cache_ttls
+    ttl_policies: ClassVar[dict[str, TtlSpec]] = {}
+
     def __init__(self, settings: "Settings") -> None:
         super().__init__(settings)
-        self._cache: dict[str, tuple[float, T]] = {}
-
-    def _get_cached(self, key: str) -> T | None:
-        """Henter cached verdi hvis gyldig."""
-        import time
-        
-        if key in self._cache:
-            cached_time, value = self._cache[key]
-            if time.time() - cached_time < self.settings.cache_ttl:
-                self.logger.debug("cache_hit", key=key)
-                return value
-            del self._cache[key]
-        return None
-
-    def _set_cached(self, key: str, value: T) -> None:
-        """Lagrer verdi i cache."""
-        import time
-        
-        self._cache[key] = (time.time(), value)
-        self.logger.debug("cache_set", key=key)
+        self._cache: CacheBackend[T] = create_backend(
+            settings, namespace=type(self).__name__, value_type=self._value_type()
+        )
+        self._inflight: dict[str, asyncio.Task[T | None]] = {}
+        self._coalesced = 0
+        self._stale_served = 0
+        self._revalidations = 0
+        self._negative_hits = 0
+        self._failures: dict[str, tuple[float, Exception]] = {}
+
+    @classmethod
+    def _value_type(cls) -> Any:
+        """Finner T fra klassedefinisjonen, f.eks. WeatherData i CachedService[WeatherData]."""
+        for klass in cls.__mro__:
+            for base in getattr(klass, "__orig_bases__", ()):
+                if get_origin(base) is CachedService:
+                    return get_args(base)[0]
+        return Any
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        """
+        Tellere for cachen.
+        
+        hits, misses, evictions og expired, samt coalesced (kall som ventet
+        på en pågående henting), stale_served, revalidations, negative_hits
+        (cachet tomt svar eller feil), entries og bytes.
+        """
+        return {
+            **self._cache.stats,
+            "coalesced": self._coalesced,
+            "stale_served": self._stale_served,
+            "revalidations": self._revalidations,
+            "negative_hits": self._negative_hits,
+            "entries": len(self._cache),
+            "bytes": self._cache.nbytes,
+        }
+
+    def sweep_cache(self) -> int:
+        """Fjerner utløpte oppføringer og feil. Returnerer antall fjernet."""
+        now = time.time()
+        failed = [key for key, (until, _) in self._failures.items() if until <= now]
+        for key in failed:
+            del self._failures[key]
+        return self._cache.sweep() + len(failed)
+
+    def _get_cached(self, key: str) -> T | None | Literal[Missing.MISSING]:
+        """Henter cached verdi hvis gyldig. None er et cachet tomt svar, MISSING et bom."""
+        value = self._cache.get(key)
+        if value is not MISSING:
+            self.logger.debug("cache_hit", key=key, negative=value is None)
+        return value
+
+    def _cached_failure(self, key: str) -> Exception | None:
+        """Feilen fra siste henting av nøkkelen, hvis den fortsatt huskes."""
+        failure = self._failures.get(key)
+        if failure is None:
+            return None
+        until, error = failure
+        if until <= time.time():
+            del self._failures[key]
+            return None
+        return error
+
+    def invalidate(self) -> None:
+        """
+        Markerer cachen som utløpt slik at neste kall går til kilden.
+        
+        Verdiene beholdes som reserve hvis kilden feiler.
+        """
+        self._cache.expire()
+        self.logger.debug("cache_invalidated")
+
+    def ttl_for(self, key: str, upstream_expires: float | None = None) -> float:
+        """
+        Levetid for en nøkkel etter policy for nøkkeltypen.
+        
+        Args:
+            key: Cache-nøkkel
+            upstream_expires: Kildens utløpstid (Unix-tid), hvis kjent
+            
+        Returns:
+            TTL i sekunder
+        """
+        kind = key_kind(key)
+        spec = self.settings.cache_ttls.get(
+            kind, self.ttl_policies.get(kind, self.settings.cache_ttl)
+        )
+        return resolve_ttl(
+            spec,
+            timezone=self.settings.timezone,
+            fallback=self.settings.cache_ttl,
+            upstream_expires=upstream_expires,
+        )
+
+    def _set_cached(
+        self, key: str, value: T | None, upstream_expires: float | None = None
+    ) -> None:
+        """Lagrer verdi i cache med TTL fra ttl_for. None lagres som negativ oppføring."""
+        if value is None:
+            # Et tomt svar skal ikke brukes som reserve etter utløp
+            ttl, stale_ttl = self.settings.cache_negative_ttl, 0.0
+        else:
+            ttl = self.ttl_for(key, upstream_expires)
+            stale_ttl = max(self.settings.cache_stale_grace, self.settings.cache_max_stale)
+        self._cache.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+        self.logger.debug("cache_set", key=key, ttl=round(ttl))
+
+    async def _cached(self, key: str, loader: Callable[[], Awaitable[T | None]]) -> T | None:
+        """
+        Henter fra cache, eller laster via loader med single-flight.
+        
+        Kommer flere kall for samme nøkkel mens en henting pågår, venter
+        de på samme resultat. Feil fra loader når alle som venter.
+        Hentingen kjøres som egen task, slik at et kall som avbrytes
+        (f.eks. av en tidsfrist) ikke avbryter de andre.
+        
+        En nylig utløpt verdi returneres med en gang mens en ny henting
+        kjøres i bakgrunnen. Feiler hentingen, brukes siste kjente verdi
+        hvis den ikke er for gammel.
+        
+        Tomme svar og feil caches kort, se klassedokumentasjonen.
+        
+        Når force_refresh er satt i konteksten, hentes verdien alltid fra
+        kilden (også om cachen har en gyldig eller nylig utløpt verdi), og
+        den cachede verdien brukes bare som reserve hvis hentingen feiler.
+        
+        Args:
+            key: Cache-nøkkel
+            loader: Henter verdien fra kilden (None betyr ingen data)
+            
+        Returns:
+            Verdien, eller None hvis loader ikke fant noe
+            
+        Raises:
+            Exception: Feilen fra loader, når ingen reserveverdi finnes
+        """
+        force = force_refresh.get()
+        if not force:
+            cached = self._get_cached(key)
+            if cached is not MISSING:
+                if cached is None:
+                    self._negative_hits += 1
+                return cached
+        
+        stale = self._cache.get_stale(key)
+        failure = self._cached_failure(key)
+        if not force and stale is not None and stale[1] <= self.settings.cache_stale_grace:
+            if key not in self._inflight and failure is None:
+                self._revalidations += 1
+                self._start_load(key, loader)
+            return self._serve_stale(key, stale, reason="revalidating")
+        
+        task = self._inflight.get(key)
+        if task is None and failure is not None:
+            self._negative_hits += 1
+            self.logger.debug("cache_failure_hit", key=key, error=str(failure))
+            return self._fallback(key, stale, failure)
+        
+        if task is None:
+            task = self._start_load(key, loader)
+        else:
+            self._coalesced += 1
+            self.logger.debug("cache_coalesced", key=key)
+        
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            return self._fallback(key, stale, e)
+
+    def _start_load(
+        self, key: str, loader: Callable[[], Awaitable[T | None]]
+    ) -> asyncio.Task[T | None]:
+        """Starter en delt henting for nøkkelen."""
+        task = asyncio.ensure_future(self._load(key, loader))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._load_done(key, done))
+        return task
+
+    def _fallback(self, key: str, stale: tuple[T, float] | None, error: Exception) -> T:
+        """Returnerer reserveverdien etter en feil, eller kaster feilen."""
+        if stale is None or stale[1] > self.settings.cache_max_stale:
+            raise error
+        return self._serve_stale(key, stale, reason=str(error))
+
+    def _serve_stale(self, key: str, stale: tuple[T, float], reason: str) -> T:
+        """Returnerer en utdatert verdi og merker den som utdatert."""
+        value, overdue = stale
+        self._stale_served += 1
+        mark_stale(key)
+        self.logger.info("cache_stale_served", key=key, overdue=round(overdue), reason=reason)
+        return value
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[T | None]]) -> T | None:
+        """Kjører loader og lagrer resultatet."""
+        # Kjøres i egen task, så utløpstidene gjelder bare denne hentingen
+        expiries: list[float] = []
+        upstream_expiry.set(expiries)
+        try:
+            value = await loader()
+        except RateLimitError:
+            # Lokal venting som gikk over fristen, ikke et svar fra kilden
+            raise
+        except Exception as e:
+            if self.settings.cache_error_ttl > 0:
+                self._failures[key] = (time.time() + self.settings.cache_error_ttl, e)
+            raise
+        self._failures.pop(key, None)
+        self._set_cached(key, value, upstream_expires=min(expiries, default=None))
+        return value
+
+    def _load_done(self, key: str, task: asyncio.Task[T | None]) -> None:
+        """Rydder opp etter en ferdig henting."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Hent ut feilen så den ikke logges som ubehandlet når ingen venter
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,175 @@
+"""
+Circuit breaker per vert.
+
+Etter et antall feil på rad mot samme vert åpnes kretsen, og videre kall
+avvises umiddelbart i stedet for å gå gjennom retry og tidsavbrudd. Etter
+``reset_timeout`` slippes ett prøvekall gjennom (halvåpen); lykkes det
+lukkes kretsen igjen.
+
+Tilstanden lever i det prosessdelte HTTP-registeret (og overlever dermed
+mellom sendinger i daemon-modus), og kan lagres til fil slik at en
+cron-kjøring vet hvilke kilder som var nede forrige gang.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from enum import Enum
+from pathlib import Path
+
+import structlog
+
+from morgenbot.exceptions.errors import CircuitOpenError
+
+
+logger = structlog.get_logger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Tilstander for en krets."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Krets for én vert.
+
+    Attributes:
+        host: Vertsnavn
+        failure_threshold: Antall feil på rad før kretsen åpnes
+        reset_timeout: Sekunder før en åpen krets prøves igjen
+        state: Gjeldende tilstand
+        failures: Antall feil på rad
+        opened_at: Unix-tid kretsen sist ble åpnet
+    """
+
+    def __init__(self, host: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.logger = logger.bind(component="CircuitBreaker", host=host)
+
+    def check(self) -> None:
+        """
+        Sjekker om et kall kan slippes gjennom.
+
+        Raises:
+            CircuitOpenError: Hvis kretsen er åpen, eller et prøvekall pågår
+        """
+        if self.state is CircuitState.OPEN:
+            if time.time() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"{self.host} er utilgjengelig", service=self.host)
+            self.state = CircuitState.HALF_OPEN
+            self.logger.info("circuit_half_open")
+
+        if self.state is CircuitState.HALF_OPEN:
+            if self._probing:
+                raise CircuitOpenError(f"{self.host} prøves allerede", service=self.host)
+            self._probing = True
+
+    def record_success(self) -> None:
+        """Registrerer et vellykket kall."""
+        if self.state is not CircuitState.CLOSED:
+            self.logger.info("circuit_closed")
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Registrerer et feilet kall og åpner kretsen ved behov."""
+        self.failures += 1
+        self._probing = False
+        if self.state is CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state is not CircuitState.OPEN:
+                self.logger.warning("circuit_opened", failures=self.failures)
+            self.state = CircuitState.OPEN
+            self.opened_at = time.time()
+
+    def release_probe(self) -> None:
+        """
+        Avslutter et prøvekall som endte uten svar fra verten.
+
+        Gjelder kall som ble avbrutt (frist eller budsjett), ratebegrenset
+        eller feilet lokalt. Kretsen forblir halvåpen, så neste kall blir
+        et nytt prøvekall.
+        """
+        self._probing = False
+
+    def to_dict(self) -> dict[str, object]:
+        """Tilstand som kan lagres."""
+        return {"state": self.state.value, "failures": self.failures, "opened_at": self.opened_at}
+
+    def restore(self, data: dict[str, object]) -> None:
+        """Gjenoppretter lagret tilstand (et avbrutt prøvekall regnes som åpen)."""
+        state = CircuitState(data.get("state", CircuitState.CLOSED.value))
+        self.state = CircuitState.OPEN if state is CircuitState.HALF_OPEN else state
+        self.failures = int(data.get("failures", 0))
+        self.opened_at = float(data.get("opened_at", 0.0))
+
+
+class CircuitBreakerRegistry:
+    """
+    Kretser for alle verter, med valgfri lagring til fil.
+
+    Attributes:
+        failure_threshold: Antall feil på rad før en krets åpnes
+        reset_timeout: Sekunder før en åpen krets prøves igjen
+        state_file: Fil tilstanden lagres i, eller None
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        state_file: Path | None = None,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state_file = state_file
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self.logger = logger.bind(component="CircuitBreakerRegistry")
+        self.load()
+
+    def get(self, host: str) -> CircuitBreaker:
+        """Henter (eller oppretter) kretsen for en vert."""
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, self.failure_threshold, self.reset_timeout)
+            self._breakers[host] = breaker
+        return breaker
+
+    def states(self) -> dict[str, str]:
+        """Gjeldende tilstand per vert."""
+        return {host: breaker.state.value for host, breaker in self._breakers.items()}
+
+    def load(self) -> None:
+        """Laster lagret tilstand. Ugyldig eller manglende fil ignoreres."""
+        if self.state_file is None or not self.state_file.exists():
+            return
+        try:
+            data = json.loads(self.state_file.read_text(encoding="utf-8"))
+            for host, saved in data.items():
+                self.get(host).restore(saved)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            self.logger.warning("circuit_state_load_failed", error=str(e))
+            return
+        self.logger.debug("circuit_state_loaded", states=self.states())
+
+    def save(self) -> None:
+        """Lagrer tilstanden til state_file."""
+        if self.state_file is None:
+            return
+        data = {host: breaker.to_dict() for host, breaker in self._breakers.items()}
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            self.state_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        except OSError as e:
+            self.logger.warning("circuit_state_save_failed", error=str(e))
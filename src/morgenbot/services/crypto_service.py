@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING
 
 from morgenbot.config.constants import CRYPTO_SYMBOLS, DEFAULT_CRYPTOS
 from morgenbot.models.finance import CryptoPrice
+from morgenbot.models.upstream import CoinQuote
 from morgenbot.services.base import CachedService
 
 if TYPE_CHECKING:
@@ -20,6 +21,9 @@ class CryptoService(CachedService[list[CryptoPrice]]):
     Henter kryptovaluta-priser fra CoinGecko.
     """
 
+    # Kursene endres hele tiden
+    ttl_policies = {"crypto": 60}
+
     def __init__(self, settings: "Settings") -> None:
         super().__init__(settings)
         self.base_url = str(settings.coingecko_api_base_url)
@@ -33,11 +37,8 @@ class CryptoService(CachedService[list[CryptoPrice]]):
             Liste med krypto-priser, eller None ved feil
         """
         cache_key = "crypto:prices"
-        cached = self._get_cached(cache_key)
-        if cached:
-            return cached
 
-        try:
+        async def load() -> list[CryptoPrice]:
             coins_param = ",".join(self.coins)
             url = f"{self.base_url}/simple/price"
             params = {
@@ -46,11 +47,11 @@ class CryptoService(CachedService[list[CryptoPrice]]):
                 "include_24hr_change": "true",
             }
             
-            data = await self._get_json(url, params=params)
-            prices = self._parse_prices(data)
-            
-            self._set_cached(cache_key, prices)
-            return prices
+            data = await self._get_upstream(url, dict[str, CoinQuote], params=params)
+            return self._parse_prices(data)
+
+        try:
+            return await self._cached(cache_key, load)
 
         except Exception as e:
             self.logger.error("crypto_fetch_failed", error=str(e))
@@ -76,7 +77,7 @@ class CryptoService(CachedService[list[CryptoPrice]]):
                     symbol=coin[:3].upper(),
                     price_nok=Decimal(str(coin_data.get("nok", 0))),
                     price_usd=Decimal(str(coin_data.get("usd", 0))),
-                    change_24h=coin_data.get("nok_24h_change", 0),
+                    change_24h=coin_data.get("nok_24h_change") or 0,
                     emoji=CRYPTO_SYMBOLS.get(coin, "🪙"),
                 )
             )
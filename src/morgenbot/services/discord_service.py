@@ -11,6 +11,7 @@ import structlog
 
 from morgenbot.exceptions.errors import DiscordError
 from morgenbot.models.discord import DiscordMessage
+from morgenbot.services.http_client import get_http_registry
 
 if TYPE_CHECKING:
     from morgenbot.config.settings import Settings
@@ -27,14 +28,16 @@ class DiscordService:
     def __init__(self, settings: "Settings") -> None:
         self.webhook_url = str(settings.discord_webhook)
         self.timeout = settings.request_timeout
+        self.http = get_http_registry(settings)
         self.logger = logger.bind(service="DiscordService")
 
-    async def send(self, message: DiscordMessage) -> bool:
+    async def send(self, message: DiscordMessage, webhook_url: str | None = None) -> bool:
         """
         Sender melding til Discord.
         
         Args:
             message: Melding å sende
+            webhook_url: Webhook å sende til, standard er settings.discord_webhook
             
         Returns:
             True hvis meldingen ble sendt
@@ -43,23 +46,23 @@ class DiscordService:
             DiscordError: Hvis sending feiler
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.webhook_url,
-                    json=message.to_dict(),
-                    headers={"Content-Type": "application/json"},
-                )
-                
-                if response.status_code == 204:
-                    self.logger.info("message_sent")
-                    return True
-                
-                self.logger.error(
-                    "discord_error",
-                    status_code=response.status_code,
-                    response=response.text,
-                )
-                raise DiscordError(f"Discord returnerte {response.status_code}")
+            response = await self.http.post(
+                webhook_url or self.webhook_url,
+                json=message.to_dict(),
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+            )
+            
+            if response.status_code == 204:
+                self.logger.info("message_sent")
+                return True
+            
+            self.logger.error(
+                "discord_error",
+                status_code=response.status_code,
+                response=response.text,
+            )
+            raise DiscordError(f"Discord returnerte {response.status_code}")
 
         except httpx.HTTPError as e:
             self.logger.error("discord_http_error", error=str(e))
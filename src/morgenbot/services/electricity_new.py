@@ -7,7 +7,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
-from morgenbot.data.loader import DataLoader
+from morgenbot.data.cities import get_city_registry
 from morgenbot.models.finance import ElectricityPrice
 from morgenbot.services.base import CachedService
 
@@ -23,8 +23,7 @@ class ElectricityService(CachedService[ElectricityPrice]):
     def __init__(self, settings: "Settings") -> None:
         super().__init__(settings)
         self.base_url = str(settings.electricity_api_base_url)
-        self.data_loader = DataLoader(settings.data_dir)
-        self._cities = self.data_loader.load_cities()
+        self.cities = get_city_registry(settings.data_dir, settings.geo_index_path)
 
     async def get_prices(self, city: str) -> ElectricityPrice | None:
         """
@@ -38,20 +37,18 @@ class ElectricityService(CachedService[ElectricityPrice]):
         """
         today = datetime.now().strftime("%Y-%m-%d")
         cache_key = f"electricity:{city}:{today}"
-        cached = self._get_cached(cache_key)
-        if cached:
-            return cached
 
-        try:
+        async def load() -> ElectricityPrice | None:
             zone = self._get_power_zone(city)
             raw_data = await self._fetch_prices(zone)
             
             if not raw_data:
                 return None
             
-            prices = self._parse_prices(raw_data, zone)
-            self._set_cached(cache_key, prices)
-            return prices
+            return self._parse_prices(raw_data, zone)
+
+        try:
+            return await self._cached(cache_key, load)
 
         except Exception as e:
             self.logger.error("electricity_fetch_failed", city=city, error=str(e))
@@ -63,8 +60,7 @@ class ElectricityService(CachedService[ElectricityPrice]):
 
     def _get_power_zone(self, city: str) -> str:
         """Finner strømsone for en by."""
-        city_data = self._cities.get(city, {})
-        return city_data.get("power_zone", "NO1")
+        return self.cities.resolve(city).zone
 
     async def _fetch_prices(self, zone: str) -> list[dict[str, Any]]:
         """Henter rå prisdata fra API."""
@@ -4,11 +4,14 @@ Tjeneste for henting av strømpriser.
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import TYPE_CHECKING, Any
+from zoneinfo import ZoneInfo
 
-from morgenbot.data.loader import DataLoader
+from morgenbot.cache.ttl import END_OF_DAY
+from morgenbot.data.cities import get_city_registry
 from morgenbot.models.finance import ElectricityPrice
+from morgenbot.models.upstream import PowerPrice
 from morgenbot.services.base import CachedService
 
 if TYPE_CHECKING:
@@ -20,11 +23,13 @@ class ElectricityService(CachedService[ElectricityPrice]):
     Henter strømpriser fra hvakosterstrommen.no.
     """
 
+    # Dagens priser er faste fra dagen før
+    ttl_policies = {"electricity": END_OF_DAY}
+
     def __init__(self, settings: "Settings") -> None:
         super().__init__(settings)
         self.base_url = str(settings.electricity_api_base_url)
-        self.data_loader = DataLoader(settings.data_dir)
-        self._cities = self.data_loader.load_cities()
+        self.cities = get_city_registry(settings.data_dir, settings.geo_index_path)
 
     async def get_prices(self, city: str) -> ElectricityPrice | None:
         """
@@ -36,49 +41,64 @@ class ElectricityService(CachedService[ElectricityPrice]):
         Returns:
             Strømprisdata, eller None ved feil
         """
-        today = datetime.now().strftime("%Y-%m-%d")
-        cache_key = f"electricity:{city}:{today}"
-        cached = self._get_cached(cache_key)
-        if cached:
-            return cached
+        return await self.get_zone_prices(self.get_power_zone(city))
 
-        try:
-            zone = self._get_power_zone(city)
-            raw_data = await self._fetch_prices(zone)
+    async def get_zone_prices(self, zone: str) -> ElectricityPrice | None:
+        """
+        Henter strømpriser for en prissone.
+        
+        Byer i samme sone deler cache og oppstrømskall.
+        
+        Args:
+            zone: Strømsone (NO1-NO5)
+            
+        Returns:
+            Strømprisdata, eller None ved feil
+        """
+        # Samme tidssone som END_OF_DAY, så nøkkelen skifter når TTL-en går ut
+        today = self._now().date()
+        cache_key = f"electricity:{zone}:{today.isoformat()}"
+
+        async def load() -> ElectricityPrice | None:
+            raw_data = await self._fetch_prices(zone, today)
             
             if not raw_data:
                 return None
             
-            prices = self._parse_prices(raw_data, zone)
-            self._set_cached(cache_key, prices)
-            return prices
+            return self._parse_prices(raw_data, zone)
+
+        try:
+            return await self._cached(cache_key, load)
 
         except Exception as e:
-            self.logger.error("electricity_fetch_failed", city=city, error=str(e))
+            self.logger.error("electricity_fetch_failed", zone=zone, error=str(e))
             return None
 
     async def fetch(self) -> ElectricityPrice | None:
         """Henter strømpriser for standard by."""
         return await self.get_prices(self.settings.city)
 
-    def _get_power_zone(self, city: str) -> str:
+    def get_power_zone(self, city: str) -> str:
         """Finner strømsone for en by."""
-        city_data = self._cities.get(city, {})
-        return city_data.get("power_zone", "NO1")
+        return self.cities.resolve(city).zone
+
+    def _now(self) -> datetime:
+        """Nåtid i settings.timezone (prisene gjelder norske døgn)."""
+        return datetime.now(ZoneInfo(self.settings.timezone))
 
-    async def _fetch_prices(self, zone: str) -> list[dict[str, Any]]:
-        """Henter rå prisdata fra API."""
-        date_path = datetime.now().strftime("%Y/%m-%d")
+    async def _fetch_prices(self, zone: str, day: date) -> list[dict[str, Any]]:
+        """Henter rå prisdata for en dag fra API."""
+        date_path = day.strftime("%Y/%m-%d")
         url = f"{self.base_url}/{date_path}_{zone}.json"
         
-        return await self._get_json(url)
+        return await self._get_upstream(url, list[PowerPrice])
 
     def _parse_prices(
         self, data: list[dict[str, Any]], zone: str
     ) -> ElectricityPrice:
         """Parser prisdata fra API."""
         # Finn nåværende pris
-        current_hour = datetime.now().hour
+        current_hour = self._now().hour
         current_price = None
         
         for item in data:
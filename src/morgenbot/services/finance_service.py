@@ -7,8 +7,14 @@ from __future__ import annotations
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from morgenbot.config.constants import CURRENCY_PAIRS, DEFAULT_STOCKS
+from morgenbot.config.constants import (
+    CURRENCY_API_URL,
+    CURRENCY_PAIRS,
+    DEFAULT_STOCKS,
+    FINANCE_CHART_URL,
+)
 from morgenbot.models.finance import CurrencyRate, FinanceData, StockQuote
+from morgenbot.models.upstream import ChartResponse
 from morgenbot.services.base import CachedService
 
 if TYPE_CHECKING:
@@ -20,6 +26,9 @@ class FinanceService(CachedService[FinanceData]):
     Henter aksje- og valutadata.
     """
 
+    # Én forespørsel per ticker: færre retries, så en treg Yahoo ikke spiser fristen
+    retry_overrides = {"attempts": 2}
+
     def __init__(self, settings: "Settings") -> None:
         super().__init__(settings)
         self.stocks = DEFAULT_STOCKS
@@ -33,17 +42,14 @@ class FinanceService(CachedService[FinanceData]):
             Finansdata, eller None ved feil
         """
         cache_key = "finance:all"
-        cached = self._get_cached(cache_key)
-        if cached:
-            return cached
 
-        try:
+        async def load() -> FinanceData:
             stocks = await self._fetch_stocks()
             currencies = await self._fetch_currencies()
-            
-            data = FinanceData(stocks=stocks, currencies=currencies)
-            self._set_cached(cache_key, data)
-            return data
+            return FinanceData(stocks=stocks, currencies=currencies)
+
+        try:
+            return await self._cached(cache_key, load)
 
         except Exception as e:
             self.logger.error("finance_fetch_failed", error=str(e))
@@ -59,8 +65,11 @@ class FinanceService(CachedService[FinanceData]):
         
         for symbol, name in self.stocks:
             try:
-                url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-                data = await self._get_json(url)
+                url = f"{FINANCE_CHART_URL}/{symbol}"
+                # Bare meta brukes; dropper tidsseriene som følger etter
+                data = await self._get_upstream(
+                    url, ChartResponse, select=["chart.result.0.meta"]
+                )
                 
                 result = data.get("chart", {}).get("result", [])
                 if not result:
@@ -96,8 +105,7 @@ class FinanceService(CachedService[FinanceData]):
     async def _fetch_currencies(self) -> list[CurrencyRate]:
         """Henter valutakurser."""
         try:
-            url = "https://api.exchangerate-api.com/v4/latest/NOK"
-            data = await self._get_json(url)
+            data = await self._get_json(CURRENCY_API_URL)
             rates = data.get("rates", {})
             
             currencies = []
@@ -0,0 +1,171 @@
+"""
+HTTP-caching med validatorer og utløpstid.
+
+Lagrer ETag, Last-Modified og Expires/max-age per URL (inkludert
+parametre), slik at tjenestene sender betingede forespørsler og kan
+behandle 304 Not Modified som en billig cache-fornyelse. Met.no krever
+dette i sine bruksvilkår. Siste gode svar brukes også når en kilde er nede.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+
+
+_MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+# Hoder som beskriver overføringen, ikke det lagrede (dekodede) innholdet
+_TRANSFER_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    """
+    En lagret respons.
+
+    Attributes:
+        url: Full URL inkludert parametre
+        headers: Responshoder
+        content: Rå respons-body
+        etag: ETag-validator, hvis oppgitt
+        last_modified: Last-Modified-validator, hvis oppgitt
+        expires_at: Unix-tid responsen er fersk til, eller None
+    """
+
+    url: str
+    headers: dict[str, str]
+    content: bytes
+    etag: str | None
+    last_modified: str | None
+    expires_at: float | None
+
+    @property
+    def is_fresh(self) -> bool:
+        """Om responsen kan brukes uten å spørre kilden."""
+        return self.expires_at is not None and time.time() < self.expires_at
+
+    def validators(self) -> dict[str, str]:
+        """Hoder for en betinget forespørsel."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self) -> httpx.Response:
+        """Gjenskaper en httpx-respons fra lagret innhold."""
+        return httpx.Response(
+            status_code=200,
+            headers=self.headers,
+            content=self.content,
+            request=httpx.Request("GET", self.url),
+        )
+
+
+def expires_from_headers(headers: httpx.Headers) -> float | None:
+    """
+    Finner utløpstid fra Cache-Control max-age eller Expires.
+
+    Args:
+        headers: Responshoder
+
+    Returns:
+        Unix-tid, eller None hvis kilden ikke oppgir noen
+    """
+    cache_control = headers.get("cache-control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return None
+    if match := _MAX_AGE.search(cache_control):
+        return time.time() + int(match.group(1))
+
+    if expires := headers.get("expires"):
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class HttpCache:
+    """
+    LRU-begrenset lager for HTTP-responser med validatorer.
+
+    Attributes:
+        max_entries: Maks antall lagrede responser
+        stats: Tellere for hit (fersk), not_modified (304) og miss
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.stats: dict[str, int] = {"hit": 0, "not_modified": 0, "miss": 0}
+
+    @staticmethod
+    def key(url: str, params: Any = None) -> str:
+        """Kanonisk nøkkel for URL + parametre."""
+        return str(httpx.URL(url, params=params))
+
+    def lookup(self, key: str) -> CachedResponse | None:
+        """Henter lagret respons (fersk eller ikke)."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: str, response: httpx.Response) -> None:
+        """
+        Lagrer en vellykket respons.
+
+        Responser uten validatorer eller utløpstid lagres også, som siste
+        gode svar når kilden er nede. Responser med Cache-Control: no-store
+        lagres aldri, og fjerner en eventuell eldre lagret respons.
+
+        Args:
+            key: Nøkkel fra key()
+            response: Vellykket respons
+        """
+        if "no-store" in response.headers.get("cache-control", "").lower():
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = CachedResponse(
+            url=key,
+            headers={
+                name: value
+                for name, value in response.headers.items()
+                if name not in _TRANSFER_HEADERS
+            },
+            content=response.content,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            expires_at=expires_from_headers(response.headers),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def revalidate(self, entry: CachedResponse, response: httpx.Response) -> None:
+        """
+        Fornyer en lagret respons etter 304 Not Modified.
+
+        Args:
+            entry: Lagret respons
+            response: 304-responsen med eventuelle nye hoder
+        """
+        entry.expires_at = expires_from_headers(response.headers)
+        entry.etag = response.headers.get("etag", entry.etag)
+        entry.last_modified = response.headers.get("last-modified", entry.last_modified)
+        for name in ("expires", "cache-control", "date", "etag", "last-modified"):
+            if name in response.headers:
+                entry.headers[name] = response.headers[name]
+
+    def clear(self) -> None:
+        """Tømmer lageret."""
+        self._entries.clear()
@@ -0,0 +1,217 @@
+"""
+Prosessdelt HTTP-klient for alle tjenester.
+
+Alle tjenester deler én tilkoblingspool (med HTTP/2 når ``h2`` er
+installert), slik at f.eks. vær og sol gjenbruker samme TLS-tilkobling
+til api.met.no. Hver vert har sin egen ratebegrensning og adaptive
+samtidighetsgrense (se rate_limit), og en circuit breaker som stopper
+kall mot kilder som er nede.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import time
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
+import httpx
+import structlog
+
+from morgenbot.config.constants import HOST_RATE_LIMITS
+from morgenbot.services.circuit_breaker import CircuitBreakerRegistry
+from morgenbot.services.http_cache import HttpCache
+from morgenbot.services.rate_limit import HostLimiter
+from morgenbot.services.retry import RetryBudget, RetryStats
+
+if TYPE_CHECKING:
+    from morgenbot.config.settings import Settings
+
+
+logger = structlog.get_logger(__name__)
+
+
+class HttpClientRegistry:
+    """
+    Eier den delte HTTP-klienten og begrensninger per vert.
+
+    Attributes:
+        settings: Applikasjonsinnstillinger
+        http_cache: Delt lager for HTTP-validatorer og responser
+        circuits: Circuit breakers per vert
+        retry_budget: Prosessdelt budsjett for retries
+        retry_stats: Svartider for første forsøk vs. etter retry
+    """
+
+    def __init__(self, settings: "Settings") -> None:
+        """
+        Initialiserer registeret. Klienten opprettes først ved bruk.
+
+        Args:
+            settings: Applikasjonsinnstillinger
+        """
+        self.settings = settings
+        self._client: httpx.AsyncClient | None = None
+        self._limiters: dict[str, HostLimiter] = {}
+        self.http_cache = HttpCache(settings.http_cache_max_entries)
+        self.circuits = CircuitBreakerRegistry(
+            failure_threshold=settings.circuit_failure_threshold,
+            reset_timeout=settings.circuit_reset_timeout,
+            state_file=settings.circuit_state_file,
+        )
+        self.retry_budget = RetryBudget(settings.retry_budget)
+        self.retry_stats = RetryStats()
+        self.logger = logger.bind(component="HttpClientRegistry")
+
+    @property
+    def http2_enabled(self) -> bool:
+        """Om HTTP/2 brukes (krever at h2 er installert)."""
+        return self.settings.http2 and importlib.util.find_spec("h2") is not None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Lazy-initialisert delt HTTP-klient."""
+        if self._client is None or self._client.is_closed:
+            if self.settings.http2 and not self.http2_enabled:
+                self.logger.debug("http2_unavailable", reason="h2 er ikke installert")
+
+            self._client = httpx.AsyncClient(
+                http2=self.http2_enabled,
+                timeout=self.settings.request_timeout,
+                headers={"User-Agent": self.settings.user_agent},
+                limits=httpx.Limits(
+                    max_connections=self.settings.http_max_connections,
+                    max_keepalive_connections=self.settings.http_max_connections,
+                    keepalive_expiry=self.settings.http_keepalive_expiry,
+                ),
+            )
+            self.logger.debug("http_client_created", http2=self.http2_enabled)
+        return self._client
+
+    def limiter(self, host: str) -> HostLimiter:
+        """
+        Ratebegrenser for én vert.
+
+        Rate hentes fra settings.rate_limits, ellers HOST_RATE_LIMITS.
+        Verter uten rate begrenses bare av samtidighetsgrensen.
+        """
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = HostLimiter(
+                host,
+                per_minute=self.settings.rate_limits.get(host, HOST_RATE_LIMITS.get(host)),
+                burst=self.settings.rate_limit_burst,
+                max_concurrency=self.settings.http_max_connections_per_host,
+                adaptive=self.settings.adaptive_concurrency,
+            )
+            self._limiters[host] = limiter
+        return limiter
+
+    def rate_metrics(self) -> dict[str, dict[str, float | None]]:
+        """Gjeldende tillatt rate og samtidighet per vert."""
+        return {host: limiter.snapshot() for host, limiter in self._limiters.items()}
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Utfører en forespørsel via den delte klienten.
+
+        Args:
+            method: HTTP-metode
+            url: URL
+            **kwargs: Ekstra argumenter til httpx
+
+        Returns:
+            HTTP-respons
+
+        Raises:
+            CircuitOpenError: Hvis verten er markert som nede
+        """
+        host = httpx.URL(url).host
+        circuit = self.circuits.get(host)
+        circuit.check()
+
+        limiter = self.limiter(host)
+        try:
+            async with limiter.slot():
+                started = time.monotonic()
+                try:
+                    response = await self.client.request(method, url, **kwargs)
+                except httpx.TransportError:
+                    limiter.record(None, time.monotonic() - started)
+                    circuit.record_failure()
+                    raise
+                limiter.record(response, time.monotonic() - started)
+
+            if response.status_code >= 500:
+                circuit.record_failure()
+            else:
+                circuit.record_success()
+            return response
+        finally:
+            # Avbrutt, ratebegrenset eller annen feil: et prøvekall må ikke bli hengende
+            circuit.release_probe()
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Utfører GET via den delte klienten."""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Utfører POST via den delte klienten."""
+        return await self.request("POST", url, **kwargs)
+
+    async def preconnect(self, urls: Iterable[str]) -> None:
+        """
+        Åpner tilkoblinger til kjente verter på forhånd.
+
+        Sender en HEAD-forespørsel til roten av hver vert slik at DNS,
+        TCP og TLS er unnagjort før første ekte kall. Feil ignoreres, og
+        kallene går utenom ratebegrensning og circuit breakers.
+
+        Args:
+            urls: URL-er hvis verter skal forhåndskobles
+        """
+        origins = {
+            f"{parsed.scheme}://{parsed.netloc.decode('ascii')}/"
+            for parsed in (httpx.URL(url) for url in urls)
+        }
+
+        async def connect(origin: str) -> None:
+            try:
+                await self.client.request("HEAD", origin, timeout=self.settings.request_timeout)
+            except httpx.HTTPError as e:
+                self.logger.debug("preconnect_failed", origin=origin, error=str(e))
+
+        await asyncio.gather(*(connect(origin) for origin in sorted(origins)))
+        self.logger.info("preconnected", hosts=len(origins))
+
+    async def aclose(self) -> None:
+        """Lukker den delte klienten og alle tilkoblinger."""
+        self.logger.info("http_cache_stats", **self.http_cache.stats)
+        for host, metrics in self.rate_metrics().items():
+            self.logger.info("http_rate_limit", host=host, **metrics)
+        self.logger.info("http_retry_stats", **self.retry_stats.summary())
+        self.circuits.save()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self.logger.debug("http_client_closed")
+
+
+_registry: HttpClientRegistry | None = None
+
+
+def get_http_registry(settings: "Settings") -> HttpClientRegistry:
+    """
+    Henter det prosessdelte HTTP-registeret.
+
+    Args:
+        settings: Applikasjonsinnstillinger (brukes ved første kall)
+
+    Returns:
+        Delt HttpClientRegistry
+    """
+    global _registry
+    if _registry is None:
+        _registry = HttpClientRegistry(settings)
+    return _registry
@@ -0,0 +1,253 @@
+"""
+Utvalgt JSON-dekoding direkte fra rå bytes.
+
+response.json() dekoder hele svaret til str og bygger hele treet, selv når
+kalleren bare trenger en liten del (Yahoo-grafen brukes bare for
+``chart.result[0].meta``). select_json() går gjennom dokumentet og bygger
+bare stiene som er valgt, og stopper så snart alle er funnet. Bytene
+dekodes til tekst i biter etter hvert som parseren trenger dem, så resten
+av svaret blir aldri dekodet.
+
+Stier skrives med punktum, med tall for indekser i lister og ``*`` for
+alle elementer::
+
+    select_json(body, ["chart.result.0.meta"])
+    # {"chart": {"result": [{"meta": {...}}]}}
+
+Resultatet har samme form som originalen, så eksisterende oppslag som
+``data["chart"]["result"][0]["meta"]`` virker uendret. Elementer i lister
+foran en valgt indeks fylles med None.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+from json.decoder import scanstring
+from typing import Any
+
+# Første bit som dekodes; dobles for hver ny bit
+INITIAL_CHUNK = 16 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+# Tegn som kan fortsette et tall etter der raw_decode stoppet
+_NUMBER_TAIL = frozenset(".eE+-")
+
+# Utvalg som tre: nøkkel (eller indeks som str, eller "*") -> undertre, True for hele verdien
+Selection = dict[str, Any]
+
+
+@lru_cache(maxsize=64)
+def compile_selection(paths: tuple[str, ...]) -> Selection:
+    """
+    Gjør stier om til et utvalgstre.
+
+    Args:
+        paths: Stier som "chart.result.0.meta"
+
+    Returns:
+        Utvalgstre for select_json
+    """
+    tree: Selection = {}
+    for path in paths:
+        node = tree
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.setdefault(part, {})
+            if child is True:
+                break
+            node = child
+        else:
+            node[parts[-1]] = True
+    return tree
+
+
+class _Done(Exception):
+    """Alle valgte stier er funnet."""
+
+
+class _Reader:
+    """Går gjennom JSON-tekst som dekodes fra bytes ved behov."""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = memoryview(data)
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._consumed = 0
+        self._chunk = INITIAL_CHUNK
+        self.text = ""
+        self.pos = 0
+
+    def more(self, rest: bool = False) -> bool:
+        """Dekoder neste bit (eller resten). False når alle bytene er dekodet."""
+        if self._consumed >= len(self._data):
+            return False
+        end = len(self._data) if rest else self._consumed + self._chunk
+        final = end >= len(self._data)
+        self.text += self._decoder.decode(self._data[self._consumed:end], final)
+        self._consumed = end
+        self._chunk *= 2
+        return True
+
+    def peek(self) -> str:
+        """Neste tegn som ikke er mellomrom."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.more():
+                raise json.JSONDecodeError("Uventet slutt på JSON", self.text, self.pos)
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Forventet {char!r}", self.text, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Dekoder hele verdien ved pos (i C via json.JSONDecoder)."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                # Verdien går forbi det som er dekodet; ta resten med en gang i stedet
+                # for å parse den samme starten om igjen for hver bit
+                if self.more(rest=True):
+                    continue
+                raise
+            # Et tall kan være kuttet midt i: raw_decode gir da bare heltallsdelen
+            # foran "." eller "e", og end havner før kuttet
+            at_cut = end == len(self.text) or self.text[end] in _NUMBER_TAIL
+            if at_cut and self.more(rest=True):
+                continue
+            self.pos = end
+            return value
+
+    def key(self) -> str:
+        """Leser en objektnøkkel og kolonet etter den."""
+        if self.peek() != '"':
+            raise json.JSONDecodeError("Forventet nøkkel", self.text, self.pos)
+        while True:
+            try:
+                key, end = scanstring(self.text, self.pos + 1)
+                break
+            except json.JSONDecodeError:
+                if not self.more():
+                    raise
+        self.pos = end
+        self.expect(":")
+        return key
+
+
+def _attach(parent: dict[str, Any] | list[Any], key: str | None, value: Any) -> None:
+    if key is None:
+        parent.append(value)
+    else:
+        parent[key] = value
+
+
+def _fill(
+    reader: _Reader,
+    selection: Selection,
+    final: bool,
+    parent: dict[str, Any] | list[Any],
+    key: str | None = None,
+) -> None:
+    """
+    Leser verdien ved pos, beholder det som er valgt og legger det i parent.
+
+    Beholdere legges i parent før innholdet leses, så treet er komplett
+    også når parseren stopper tidlig. final betyr at alle forfedre er
+    ferdige når denne verdien er det, så parseren kan stoppe der i stedet
+    for å lese resten av dokumentet.
+    """
+    char = reader.peek()
+    if char == "{":
+        reader.pos += 1
+        out: dict[str, Any] = {}
+        _attach(parent, key, out)
+        pending = set(selection)
+        if reader.peek() == "}":
+            reader.pos += 1
+            return
+        while True:
+            name = reader.key()
+            sub = selection.get(name)
+            if sub is None:
+                reader.value()
+            else:
+                last = final and pending == {name}
+                if sub is True:
+                    out[name] = reader.value()
+                else:
+                    _fill(reader, sub, last, out, name)
+                pending.discard(name)
+                if last:
+                    raise _Done
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("}")
+            return
+
+    if char == "[":
+        reader.pos += 1
+        items: list[Any] = []
+        _attach(parent, key, items)
+        wildcard = selection.get("*")
+        pending = {int(index) for index in selection if index.isdigit()}
+        if reader.peek() == "]":
+            reader.pos += 1
+            return
+        index = 0
+        while True:
+            sub = wildcard or selection.get(str(index))
+            if sub is None:
+                reader.value()
+                if pending:
+                    items.append(None)
+            else:
+                last = final and wildcard is None and pending == {index}
+                if sub is True:
+                    items.append(reader.value())
+                else:
+                    _fill(reader, sub, last, items)
+                pending.discard(index)
+                if last:
+                    raise _Done
+            index += 1
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("]")
+            return
+
+    # Skalar der utvalget forventet objekt eller liste: ta den med som den er
+    _attach(parent, key, reader.value())
+
+
+def select_json(data: bytes, select: Iterable[str]) -> Any:
+    """
+    Dekoder bare valgte stier fra et JSON-dokument.
+
+    Args:
+        data: Rå JSON-bytes (UTF-8)
+        select: Stier som skal beholdes
+
+    Returns:
+        Dokumentet med bare de valgte stiene
+
+    Raises:
+        json.JSONDecodeError: Hvis dokumentet er ugyldig før alle stiene er funnet
+    """
+    selection = compile_selection(tuple(select))
+    root: list[Any] = []
+    try:
+        _fill(_Reader(data), selection, True, root)
+    except _Done:
+        pass
+    return root[0]
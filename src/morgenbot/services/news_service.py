@@ -39,21 +39,18 @@ class NewsService(CachedService[NewsData]):
             Nyhetsdata, eller None ved feil
         """
         cache_key = "news:all"
-        cached = self._get_cached(cache_key)
-        if cached:
-            return cached
 
-        try:
-            news = NewsData(
+        async def load() -> NewsData:
+            return NewsData(
                 top=await self._fetch_category(NewsCategory.TOP),
                 world=await self._fetch_category(NewsCategory.WORLD),
                 sport=await self._fetch_category(NewsCategory.SPORT),
                 culture=await self._fetch_category(NewsCategory.CULTURE),
                 tech=await self._fetch_category(NewsCategory.TECH),
             )
-            
-            self._set_cached(cache_key, news)
-            return news
+
+        try:
+            return await self._cached(cache_key, load)
 
         except Exception as e:
             self.logger.error("news_fetch_failed", error=str(e))
@@ -85,8 +82,10 @@ class NewsService(CachedService[NewsData]):
         self, url: str, category: NewsCategory
     ) -> list[NewsItem]:
         """Parser en RSS-feed."""
-        # feedparser er synkron, men rask nok for vårt formål
-        feed = feedparser.parse(url)
+        # Hent via _get for delt pool og betingede forespørsler;
+        # feedparser parser bare ferdig nedlastet innhold
+        response = await self._get(url)
+        feed = feedparser.parse(response.content)
         source = "NRK" if "nrk.no" in url else "VG"
         
         items = []
@@ -0,0 +1,231 @@
+"""
+Ratebegrensning og adaptiv samtidighet per vert.
+
+Hver vert får en token-bøtte (forespørsler per minutt fra Settings eller
+RATE_LIMITS) og en AIMD-regulert grense for samtidige forespørsler.
+429/5xx og økende svartider halverer grensen og raten, mens vellykkede
+kall øker dem gradvis igjen. ``Retry-After`` stanser nye kall mot verten
+til tidspunktet kilden ber om.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator
+from email.utils import parsedate_to_datetime
+
+import httpx
+import structlog
+
+from morgenbot.exceptions.errors import RateLimitError
+from morgenbot.runtime.deadline import current_deadline
+
+
+logger = structlog.get_logger(__name__)
+
+# Statuskoder som betyr at kilden er overbelastet
+OVERLOAD_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Svartid over LATENCY_FACTOR × glidende snitt regnes som overbelastning
+LATENCY_FACTOR = 2.0
+LATENCY_SMOOTHING = 0.2
+
+# Svartider under dette regnes aldri som trege (jevner ut støy på raske kall)
+LATENCY_FLOOR = 0.25
+
+# Raten halveres aldri under denne andelen av konfigurert rate
+MIN_RATE_FRACTION = 1 / 16
+
+
+def retry_after_seconds(headers: httpx.Headers) -> float | None:
+    """
+    Tolker Retry-After (sekunder eller HTTP-dato).
+
+    Args:
+        headers: Responshoder
+
+    Returns:
+        Sekunder å vente, eller None hvis hodet mangler eller er ugyldig
+    """
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Klassisk token-bøtte med reservasjon.
+
+    Attributes:
+        rate: Gjeldende tillatte rate i forespørsler per sekund
+        burst: Maks antall tokens som kan spares opp
+    """
+
+    __slots__ = ("rate", "burst", "_tokens", "_updated")
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Reserverer ett token.
+
+        Returns:
+            Sekunder til tokenet kan brukes (0 hvis med en gang)
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens -= 1
+        return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def refund(self) -> None:
+        """Gir tilbake et reservert token som ikke ble brukt."""
+        self._tokens = min(self.burst, self._tokens + 1)
+
+
+class HostLimiter:
+    """
+    Token-bøtte og AIMD-regulert samtidighet for én vert.
+
+    Attributes:
+        host: Vertsnavn
+        bucket: Token-bøtte, eller None hvis verten ikke har ratebegrensning
+        max_concurrency: Øvre grense for samtidige forespørsler
+        limit: Gjeldende (adaptive) grense for samtidige forespørsler
+    """
+
+    def __init__(
+        self,
+        host: str,
+        per_minute: float | None,
+        burst: int,
+        max_concurrency: int,
+        adaptive: bool = True,
+    ) -> None:
+        self.host = host
+        self.bucket = TokenBucket(per_minute / 60, burst) if per_minute else None
+        self._configured_rate = per_minute / 60 if per_minute else None
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.adaptive = adaptive
+        self._inflight = 0
+        self._released = asyncio.Condition()
+        self._latency: float | None = None
+        self._blocked_until = 0.0
+        self.logger = logger.bind(component="HostLimiter", host=host)
+
+    @property
+    def permitted_rate(self) -> float | None:
+        """Gjeldende tillatte rate i forespørsler per minutt."""
+        return self.bucket.rate * 60 if self.bucket else None
+
+    def snapshot(self) -> dict[str, float | None]:
+        """Metrikk for gjeldende rate og samtidighet."""
+        rate = self.permitted_rate
+        return {
+            "permitted_rate_per_min": round(rate, 2) if rate is not None else None,
+            "concurrency_limit": round(self.limit, 2),
+            "inflight": self._inflight,
+        }
+
+    async def _wait_for_token(self) -> None:
+        """Venter på et token, men aldri forbi gjeldende tidsfrist."""
+        wait = self.bucket.reserve() if self.bucket is not None else 0.0
+        wait = max(wait, self._blocked_until - time.monotonic())
+        if wait <= 0:
+            return
+
+        deadline = current_deadline.get()
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is not None and wait > remaining:
+            if self.bucket is not None:
+                self.bucket.refund()
+            raise RateLimitError(
+                f"Ratebegrenset mot {self.host} i {wait:.1f}s, etter tidsfristen",
+                service=self.host,
+                status_code=429,
+            )
+        self.logger.debug("rate_limited", wait=round(wait, 2))
+        await asyncio.sleep(wait)
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Holder en plass innenfor rate- og samtidighetsgrensen."""
+        await self._wait_for_token()
+        async with self._released:
+            await self._released.wait_for(lambda: self._inflight < max(1, int(self.limit)))
+            self._inflight += 1
+        try:
+            yield
+        finally:
+            async with self._released:
+                self._inflight -= 1
+                self._released.notify_all()
+
+    def record(self, response: httpx.Response | None, latency: float) -> None:
+        """
+        Justerer grensene etter en fullført forespørsel.
+
+        Args:
+            response: Responsen, eller None ved tidsavbrudd/tilkoblingsfeil
+            latency: Svartid i sekunder
+        """
+        if response is not None and response.status_code in OVERLOAD_STATUSES:
+            retry_after = retry_after_seconds(response.headers)
+            if retry_after is not None:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                self.logger.warning("retry_after", seconds=retry_after)
+
+        if not self.adaptive:
+            return
+
+        overloaded = response is None or response.status_code in OVERLOAD_STATUSES
+        if not overloaded and response.status_code < 400:
+            slow = (
+                self._latency is not None
+                and latency > LATENCY_FLOOR
+                and latency > LATENCY_FACTOR * self._latency
+            )
+            self._latency = (
+                latency
+                if self._latency is None
+                else (1 - LATENCY_SMOOTHING) * self._latency + LATENCY_SMOOTHING * latency
+            )
+            overloaded = slow
+
+        if overloaded:
+            self._decrease()
+        else:
+            self._increase()
+
+    def _decrease(self) -> None:
+        """Multiplikativ nedgang."""
+        self.limit = max(1.0, self.limit / 2)
+        if self.bucket is not None and self._configured_rate is not None:
+            self.bucket.rate = max(
+                self._configured_rate * MIN_RATE_FRACTION, self.bucket.rate / 2
+            )
+        self.logger.info("rate_limit_decreased", **self.snapshot())
+
+    def _increase(self) -> None:
+        """Additiv økning, opp til konfigurerte grenser."""
+        self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+        if self.bucket is not None and self._configured_rate is not None:
+            self.bucket.rate = min(
+                self._configured_rate, self.bucket.rate + self._configured_rate / 10
+            )
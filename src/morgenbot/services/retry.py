@@ -0,0 +1,174 @@
+"""
+Retry-policy for HTTP-kall.
+
+Bygges fra Settings (retry_attempts, retry_delay) og kan overstyres per
+tjeneste. I tillegg til antall forsøk begrenses retries av et prosessdelt
+budsjett (f.eks. maks 10 % ekstra forespørsler) og av gjeldende tidsfrist:
+et nytt forsøk startes ikke hvis det ikke rekker å bli ferdig.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception, wait_exponential
+
+from morgenbot.runtime.deadline import current_deadline
+
+if TYPE_CHECKING:
+    from morgenbot.config.settings import Settings
+
+
+# Statuskoder det gir mening å prøve på nytt
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Budsjettet sparer opp for maks så mange forespørsler, slik at en lang
+# rolig periode ikke gir rom for en retry-storm
+BUDGET_WINDOW = 100
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Tidsavbrudd, tilkoblingsfeil og midlertidige HTTP-feil prøves på nytt."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+
+class RetryBudget:
+    """
+    Prosessdelt budsjett for retries.
+
+    Hver forespørsel setter inn ``ratio`` tokens og hver retry tar ut ett,
+    slik at retries utgjør maks ``ratio`` av trafikken. ``min_retries``
+    gir rom for noen retries før det er bygget opp noe budsjett.
+
+    Attributes:
+        ratio: Andel ekstra forespørsler som tillates
+        min_retries: Retries som alltid er tilgjengelige
+    """
+
+    __slots__ = ("ratio", "min_retries", "_tokens")
+
+    def __init__(self, ratio: float, min_retries: int = 3) -> None:
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self._tokens = float(min_retries)
+
+    def deposit(self) -> None:
+        """Registrerer en ny (første) forespørsel."""
+        self._tokens = min(
+            self._tokens + self.ratio, self.min_retries + BUDGET_WINDOW * self.ratio
+        )
+
+    def withdraw(self) -> bool:
+        """Tar ut ett token for en retry, hvis budsjettet tillater det."""
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+@dataclass
+class RetryStats:
+    """
+    Svartider for kall som lyktes første gang vs. etter retry.
+
+    Attributes:
+        first_try: (antall, total tid) for kall uten retry
+        retried: (antall, total tid) for kall som trengte retry
+        exhausted: Antall ganger budsjett eller tidsfrist stoppet en retry
+    """
+
+    first_try: list[float] = field(default_factory=lambda: [0, 0.0])
+    retried: list[float] = field(default_factory=lambda: [0, 0.0])
+    exhausted: int = 0
+
+    def record(self, attempts: int, latency: float) -> None:
+        """Registrerer et fullført kall."""
+        bucket = self.first_try if attempts == 1 else self.retried
+        bucket[0] += 1
+        bucket[1] += latency
+
+    def summary(self) -> dict[str, float | int]:
+        """Antall og snittid per kategori."""
+        result: dict[str, float | int] = {"budget_exhausted": self.exhausted}
+        for name, (count, total) in (("first_try", self.first_try), ("retried", self.retried)):
+            result[f"{name}_count"] = int(count)
+            result[f"{name}_avg_ms"] = round(1000 * total / count, 1) if count else 0.0
+        return result
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Hvor mange ganger, og hvor lenge, et kall prøves.
+
+    Attributes:
+        attempts: Maks antall forsøk (inkludert det første)
+        delay: Første ventetid i sekunder, dobles per forsøk
+        max_delay: Øvre grense for ventetid i sekunder
+    """
+
+    attempts: int = 3
+    delay: float = 1.0
+    max_delay: float = 10.0
+
+    @classmethod
+    def from_settings(cls, settings: "Settings", **overrides: Any) -> RetryPolicy:
+        """
+        Bygger policy fra innstillinger.
+
+        Args:
+            settings: Applikasjonsinnstillinger
+            **overrides: Felt som overstyres (f.eks. per tjeneste)
+
+        Returns:
+            Ferdig policy
+        """
+        policy = cls(attempts=settings.retry_attempts, delay=settings.retry_delay)
+        return replace(policy, **overrides) if overrides else policy
+
+    def backoff(self, attempt: int) -> float:
+        """Ventetid etter forsøk nummer ``attempt``."""
+        return min(self.max_delay, self.delay * 2 ** (attempt - 1))
+
+    def retrying(self, budget: RetryBudget, stats: RetryStats) -> AsyncRetrying:
+        """
+        Lager en tenacity-løkke for ett kall.
+
+        Args:
+            budget: Prosessdelt retry-budsjett
+            stats: Statistikk som oppdateres når budsjett eller frist stopper
+
+        Returns:
+            AsyncRetrying som brukes med ``async for attempt in ...``
+        """
+
+        def stop(state: RetryCallState) -> bool:
+            if state.attempt_number >= self.attempts:
+                return True
+
+            # Et nytt forsøk må rekke både ventetiden og et kall like langt som snittet
+            deadline = current_deadline.get()
+            remaining = deadline.remaining() if deadline is not None else None
+            if remaining is not None:
+                needed = self.backoff(state.attempt_number) + (
+                    state.seconds_since_start or 0.0
+                ) / state.attempt_number
+                if needed > remaining:
+                    stats.exhausted += 1
+                    return True
+
+            if not budget.withdraw():
+                stats.exhausted += 1
+                return True
+            return False
+
+        return AsyncRetrying(
+            retry=retry_if_exception(is_retryable),
+            stop=stop,
+            wait=wait_exponential(multiplier=self.delay, max=self.max_delay),
+            reraise=True,
+        )
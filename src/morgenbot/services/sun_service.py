@@ -1,99 +1,191 @@
 """
-Tjeneste for henting av sol-data fra Meteorologisk institutt.
+Tjeneste for soloppgang og solnedgang.
 """
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime, time
 from typing import TYPE_CHECKING, Any
+from zoneinfo import ZoneInfo
 
-from morgenbot.data.loader import DataLoader
+from morgenbot.cache.ttl import END_OF_DAY
+from morgenbot.data.cities import get_city_registry
+from morgenbot.data.geo import snap_to_grid
 from morgenbot.models.weather import SunTimes
 from morgenbot.services.base import CachedService
+from morgenbot.utils.solar import SunEvent, SunTable, sun_event
 
 if TYPE_CHECKING:
     from morgenbot.config.settings import Settings
 
+# Avvik fra met.no i minutter som logges som advarsel
+API_TOLERANCE_MINUTES = 2
+
+
+def _clock(minutes: float) -> str:
+    """Minutter etter midnatt som HH:MM, rundet til nærmeste minutt."""
+    rounded = round(minutes) % 1440
+    return f"{rounded // 60:02d}:{rounded % 60:02d}"
+
+
+def _minutes(clock: str) -> int:
+    hours, minutes = clock.split(":")
+    return int(hours) * 60 + int(minutes)
+
 
 class SunService(CachedService[SunTimes]):
     """
-    Henter soloppgang og solnedgang fra Met.no Sunrise API.
+    Beregner soloppgang og solnedgang lokalt (se morgenbot.utils.solar).
+
+    Tidene for alle byene i registeret regnes ut for et helt år om gangen.
+    Met.no Sunrise API brukes bare som kontroll når settings.sun_api_check
+    er slått på.
     """
 
+    # Soltidene endres ikke i løpet av dagen
+    ttl_policies = {"sun": END_OF_DAY}
+
     def __init__(self, settings: "Settings") -> None:
         super().__init__(settings)
         self.base_url = str(settings.met_api_base_url)
-        self.data_loader = DataLoader(settings.data_dir)
-        self._cities = self.data_loader.load_cities()
+        self.cities = get_city_registry(settings.data_dir, settings.geo_index_path)
+        self._table: SunTable | None = None
 
     async def get_sun_times(self, city: str) -> SunTimes | None:
         """
         Henter sol-tider for en by.
         
+        Koordinatene rundes til settings.location_grid, som for været.
+        
         Args:
             city: Navn på byen
-            
+        
         Returns:
             Sol-data, eller None ved feil
         """
-        cache_key = f"sun:{city}:{datetime.now().date()}"
-        cached = self._get_cached(cache_key)
-        if cached:
-            return cached
-
         try:
-            city_data = self._get_city_data(city)
-            raw_data = await self._fetch_sun_times(
-                city_data["lat"], city_data["lon"]
-            )
-            sun_times = self._parse_sun_times(raw_data)
-            
-            self._set_cached(cache_key, sun_times)
-            return sun_times
+            place = self.cities.resolve(city)
+            lat, lon = snap_to_grid(place.lat, place.lon, self.settings.location_grid)
+            today = datetime.now(ZoneInfo(self.settings.timezone)).date()
+            event = self.year_table(today.year).get(lat, lon, today)
+            if event is None:
+                # Sted utenfor registeret
+                event = sun_event(lat, lon, today, self.settings.timezone)
+            sun = self._to_sun_times(event)
 
         except Exception as e:
-            self.logger.error("sun_fetch_failed", city=city, error=str(e))
+            self.logger.error("sun_calculation_failed", city=city, error=str(e))
             return None
 
+        if self.settings.sun_api_check:
+            await self._check_against_api(lat, lon, today, sun)
+        return sun
+
     async def fetch(self) -> SunTimes | None:
         """Henter sol-tider for standard by."""
         return await self.get_sun_times(self.settings.city)
 
-    def _get_city_data(self, city: str) -> dict[str, Any]:
-        """Henter koordinater for en by."""
-        city_lower = city.lower()
-        for city_name, data in self._cities.items():
-            if city_name.lower() == city_lower:
-                return data
-        return self._cities.get("Moss", {"lat": 59.43, "lon": 10.66})
-
-    async def _fetch_sun_times(self, lat: float, lon: float) -> dict[str, Any]:
-        """Henter rå sol-data fra API."""
-        today = datetime.now().strftime("%Y-%m-%d")
+    def year_table(self, year: int) -> SunTable:
+        """
+        Sol-tider for alle byene i registeret for et år.
+        
+        Beregnes første gang et år trengs; bare siste år beholdes.
+        
+        Args:
+            year: År
+        
+        Returns:
+            Tabell med ett oppslag per rute i rutenettet
+        """
+        if self._table is None or self._table.year != year:
+            grid = self.settings.location_grid
+            coordinates = [snap_to_grid(city.lat, city.lon, grid) for city in self.cities]
+            self._table = SunTable.compute(coordinates, year, self.settings.timezone)
+            self.logger.debug("sun_table_computed", year=year, places=len(self._table))
+        return self._table
+
+    def _to_sun_times(self, event: SunEvent) -> SunTimes:
+        """Gjør en beregnet SunEvent om til modellen."""
+        hours, minutes = divmod(round(event.daylight), 60)
+        return SunTimes(
+            sunrise=None if event.sunrise is None else _clock(event.sunrise),
+            sunset=None if event.sunset is None else _clock(event.sunset),
+            daylight_hours=hours,
+            daylight_minutes=minutes,
+            polar=event.polar,
+        )
+
+    async def _check_against_api(self, lat: float, lon: float, day: date, sun: SunTimes) -> None:
+        """Sammenligner med met.no og logger avvik; feil her påvirker ikke resultatet."""
+        cache_key = f"sun:{lat:.4f},{lon:.4f}:{day}"
+
+        async def load() -> SunTimes | None:
+            raw_data = await self._fetch_sun_times(lat, lon, day)
+            return self._parse_sun_times(raw_data)
+
+        try:
+            remote = await self._cached(cache_key, load)
+        except Exception as e:
+            self.logger.warning("sun_api_check_failed", lat=lat, lon=lon, error=str(e))
+            return
+        if remote is None or sun.sunrise is None or sun.sunset is None:
+            # Polar: met.no oppgir ingen tider, og heller ikke vi
+            if (remote is None) != (sun.polar is not None):
+                self.logger.warning(
+                    "sun_api_mismatch",
+                    lat=lat,
+                    lon=lon,
+                    polar=sun.polar,
+                    api_polar=remote is None,
+                )
+            return
+        difference = max(
+            abs(_minutes(sun.sunrise) - _minutes(remote.sunrise)),
+            abs(_minutes(sun.sunset) - _minutes(remote.sunset)),
+        )
+        if difference > API_TOLERANCE_MINUTES:
+            self.logger.warning(
+                "sun_api_mismatch",
+                lat=lat,
+                lon=lon,
+                sunrise=sun.sunrise,
+                sunset=sun.sunset,
+                api_sunrise=remote.sunrise,
+                api_sunset=remote.sunset,
+            )
+        else:
+            self.logger.debug("sun_api_match", lat=lat, lon=lon, difference=difference)
+
+    async def _fetch_sun_times(self, lat: float, lon: float, day: date) -> dict[str, Any]:
+        """Henter rå sol-data fra API, med dagens UTC-forskyvning (sommertid)."""
+        noon = datetime.combine(day, time(12), tzinfo=ZoneInfo(self.settings.timezone))
+        offset = noon.strftime("%z")
         url = f"{self.base_url}/sunrise/3.0/sun"
         params = {
             "lat": lat,
             "lon": lon,
-            "date": today,
-            "offset": "+01:00",
+            "date": day.isoformat(),
+            "offset": f"{offset[:3]}:{offset[3:]}",
         }
         return await self._get_json(url, params=params)
 
-    def _parse_sun_times(self, data: dict[str, Any]) -> SunTimes:
-        """Parser sol-data fra API-respons."""
+    def _parse_sun_times(self, data: dict[str, Any]) -> SunTimes | None:
+        """Parser sol-data fra API-respons, None hvis solen ikke står opp eller ned."""
         props = data["properties"]
-        
-        sunrise_str = props["sunrise"]["time"]
-        sunset_str = props["sunset"]["time"]
-        
+
+        sunrise_str = (props.get("sunrise") or {}).get("time")
+        sunset_str = (props.get("sunset") or {}).get("time")
+        if not sunrise_str or not sunset_str:
+            return None
+
         sunrise_dt = datetime.fromisoformat(sunrise_str.replace("Z", "+00:00"))
         sunset_dt = datetime.fromisoformat(sunset_str.replace("Z", "+00:00"))
-        
+
         # Beregn dagslys
         daylight = sunset_dt - sunrise_dt
         hours = daylight.seconds // 3600
         minutes = (daylight.seconds % 3600) // 60
-        
+
         return SunTimes(
             sunrise=sunrise_dt.strftime("%H:%M"),
             sunset=sunset_dt.strftime("%H:%M"),
@@ -0,0 +1,68 @@
+"""
+Dekoding av JSON-svar etter typede skjemaer.
+
+Med msgspec installert (``pip install morgenbot[fast]``) dekodes bytene
+rett til dict-er etter skjemaene i morgenbot.models.upstream: felt
+skjemaet ikke har hoppes over uten å bygges, og typene sjekkes. Uten
+msgspec brukes json.loads (eller select_json der bare noen stier trengs),
+som gir dict-er med samme form pluss feltene skjemaet ikke har. Tjenestene
+parser derfor én form uansett motor.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+
+from morgenbot.exceptions.errors import ValidationError
+from morgenbot.services.json_select import select_json
+
+try:
+    import msgspec
+except ImportError:  # msgspec er valgfritt
+    msgspec = None
+
+HAS_MSGSPEC = msgspec is not None
+
+
+@lru_cache(maxsize=None)
+def _decoder(target: Any) -> Any:
+    return msgspec.json.Decoder(target)
+
+
+def decode(
+    data: bytes,
+    target: Any,
+    select: Iterable[str] | None = None,
+    use_msgspec: bool | None = None,
+) -> Any:
+    """
+    Dekoder JSON-bytes til dict-er og lister.
+
+    Args:
+        data: Rå JSON-bytes
+        target: Skjema fra morgenbot.models.upstream, eller list[...]/dict[str, ...] av dem
+        select: Stier som trengs, brukes av json-motoren (se json_select)
+        use_msgspec: Tving valg av motor, standard er msgspec hvis installert
+
+    Returns:
+        JSON-data som dict/liste; med msgspec bare feltene i target
+
+    Raises:
+        ValidationError: Hvis JSON-en er ugyldig, eller ikke passer med target (msgspec)
+    """
+    if use_msgspec is None:
+        use_msgspec = HAS_MSGSPEC
+    if use_msgspec:
+        if msgspec is None:
+            raise RuntimeError("msgspec er ikke installert")
+        try:
+            return _decoder(target).decode(data)
+        except msgspec.MsgspecError as e:
+            raise ValidationError(str(e)) from e
+    try:
+        return select_json(data, select) if select is not None else json.loads(data)
+    except ValueError as e:
+        raise ValidationError(str(e)) from e
@@ -6,7 +6,12 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
+from morgenbot.cache.ttl import UPSTREAM_EXPIRES
+from morgenbot.data.cities import get_city_registry
+from morgenbot.data.geo import snap_to_grid
 from morgenbot.data.loader import DataLoader
+from morgenbot.models.forecast import Forecast
+from morgenbot.models.upstream import MetForecast
 from morgenbot.models.weather import CurrentWeather, WeatherCondition, WeatherData
 from morgenbot.services.base import CachedService
 from morgenbot.utils.calculations import get_clothing_advice
@@ -22,34 +27,42 @@ class WeatherService(CachedService[WeatherData]):
     Implementerer LocationForecast 2.0 API.
     """
 
+    # Met.no oppgir selv når prognosen er utløpt
+    ttl_policies = {"weather": UPSTREAM_EXPIRES}
+
     def __init__(self, settings: "Settings") -> None:
         super().__init__(settings)
         self.base_url = str(settings.met_api_base_url)
         self.data_loader = DataLoader(settings.data_dir)
         self._weather_symbols = self.data_loader.load_weather_symbols()
-        self._cities = self.data_loader.load_cities()
+        self.cities = get_city_registry(settings.data_dir, settings.geo_index_path)
 
     async def get_weather(self, city: str) -> WeatherData | None:
         """
         Henter værdata for en by.
         
+        Koordinatene rundes til settings.location_grid, så byer og steder i
+        samme rute deler ett oppslag.
+        
         Args:
             city: Navn på byen
             
         Returns:
             Værdata, eller None ved feil
         """
-        cache_key = f"weather:{city}"
-        cached = self._get_cached(cache_key)
-        if cached:
-            return cached
+        place = self.cities.resolve(city)
+        lat, lon = snap_to_grid(place.lat, place.lon, self.settings.location_grid)
+        cache_key = f"weather:{lat:.4f},{lon:.4f}"
+
+        async def load() -> WeatherData:
+            raw_data = await self._fetch_weather(lat, lon)
+            return self._parse_weather(raw_data, place.name)
 
         try:
-            city_data = self._get_city_data(city)
-            raw_data = await self._fetch_weather(city_data["lat"], city_data["lon"])
-            weather = self._parse_weather(raw_data, city)
-            
-            self._set_cached(cache_key, weather)
+            weather = await self._cached(cache_key, load)
+            if weather is not None and weather.city != place.name:
+                # Hentet for et annet sted i samme rute
+                weather = weather.model_copy(update={"city": place.name})
             return weather
 
         except Exception as e:
@@ -60,25 +73,30 @@ class WeatherService(CachedService[WeatherData]):
         """Henter vær for standard by."""
         return await self.get_weather(self.settings.city)
 
-    def _get_city_data(self, city: str) -> dict[str, Any]:
-        """Henter koordinater for en by."""
-        city_lower = city.lower()
-        for city_name, data in self._cities.items():
-            if city_name.lower() == city_lower:
-                return data
+    def get_coordinates(self, city: str) -> tuple[float, float]:
+        """
+        Slår opp koordinater for en by.
         
-        self.logger.warning("city_not_found", city=city, fallback="Moss")
-        return self._cities.get("Moss", {"lat": 59.43, "lon": 10.66})
+        Args:
+            city: Navn på byen
+            
+        Returns:
+            Tuple med (lat, lon)
+        """
+        return self.cities.resolve(city).coordinates
 
     async def _fetch_weather(self, lat: float, lon: float) -> dict[str, Any]:
         """Henter rå værdata fra API."""
         url = f"{self.base_url}/locationforecast/2.0/compact"
         params = {"lat": lat, "lon": lon}
-        return await self._get_json(url, params=params)
+        return await self._get_upstream(url, MetForecast, params=params)
 
     def _parse_weather(self, data: dict[str, Any], city: str) -> WeatherData:
         """Parser værdata fra API-respons."""
-        timeseries = data["properties"]["timeseries"][0]
+        steps = data["properties"]["timeseries"]
+        if not steps:
+            raise ValueError("Tom tidsserie fra met.no")
+        timeseries = steps[0]
         instant = timeseries["data"]["instant"]["details"]
         
         # Hent værsymbol
@@ -90,16 +108,17 @@ class WeatherService(CachedService[WeatherData]):
         else:
             symbol_code = "cloudy"
 
+        # weather_symbols.json har emoji per kode, med eller uten _day/_night
         symbol_base = symbol_code.split("_")[0]
-        symbol_info = self._weather_symbols.get(symbol_base, {})
+        icon = self._weather_symbols.get(symbol_code) or self._weather_symbols.get(symbol_base)
         
         temperature = instant["air_temperature"]
         wind_speed = instant["wind_speed"]
         
         condition = WeatherCondition(
             symbol_code=symbol_code,
-            symbol_text=symbol_info.get("text", symbol_code),
-            icon=symbol_info.get("icon", "❓"),
+            symbol_text=symbol_code,
+            icon=icon if isinstance(icon, str) else "❓",
         )
         
         current = CurrentWeather(
@@ -112,4 +131,4 @@ class WeatherService(CachedService[WeatherData]):
             clothing_advice=get_clothing_advice(temperature, symbol_code),
         )
         
-        return WeatherData(city=city, current=current)
+        return WeatherData(city=city, current=current, forecast=Forecast.from_timeseries(steps))
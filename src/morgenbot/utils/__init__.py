@@ -16,6 +16,14 @@ from morgenbot.utils.date_utils import (
     is_weekend,
 )
 from morgenbot.utils.formatting import bold, code_block, italic, inline_code
+from morgenbot.utils.solar import SunEvent, SunTable, sun_event
+from morgenbot.utils.weather_metrics import (
+    DaySummary,
+    WeatherMetrics,
+    compute_metrics,
+    daylight_window,
+    summarize_days,
+)
 
 __all__ = [
     # Calculations
@@ -23,6 +31,16 @@ __all__ = [
     "get_clothing_advice",
     "calculate_daylight",
     "format_large_number",
+    # Weather metrics
+    "WeatherMetrics",
+    "DaySummary",
+    "compute_metrics",
+    "summarize_days",
+    "daylight_window",
+    # Solar
+    "SunEvent",
+    "SunTable",
+    "sun_event",
     # Date utils
     "format_norwegian_date",
     "format_norwegian_date_with_week",
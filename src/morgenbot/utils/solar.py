@@ -0,0 +1,312 @@
+"""
+Soloppgang og solnedgang beregnet lokalt.
+
+Bruker NOAA sine formler for solens posisjon (deklinasjon og tidsjevning,
+forenklet etter Meeus), som gir tider innen omtrent ett minutt fra
+kilder som met.no. Solen regnes som oppe når øvre kant er over horisonten
+med vanlig lysbrytning, det vil si senitvinkel 90,833°. Tidene regnes i
+UTC og gjøres om til lokal tid med zoneinfo, så sommertid blir riktig.
+
+Nord for polarsirkelen kan solen være oppe hele døgnet (midnattssol,
+POLAR_DAY) eller under horisonten hele døgnet (mørketid, POLAR_NIGHT).
+Da finnes ingen soloppgang eller solnedgang, og dagslyset er 24 eller 0
+timer.
+
+SunTable regner ut et helt år for mange steder i én operasjon. Med NumPy
+installert (``pip install morgenbot[fast]``) gjøres det som
+array-operasjoner; ellers brukes ren Python med samme resultat.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+from typing import Any
+from zoneinfo import ZoneInfo
+
+try:
+    import numpy as np
+except ImportError:  # NumPy er valgfritt
+    np = None
+
+HAS_NUMPY = np is not None
+
+# Senitvinkel ved soloppgang og solnedgang: 90° + refraksjon + solradius
+ZENITH = 90.833
+
+POLAR_DAY = "day"
+POLAR_NIGHT = "night"
+
+_COS_ZENITH = math.cos(math.radians(ZENITH))
+# Juliansk dag for midnatt UTC er date.toordinal() + _JD_ORDINAL
+_JD_ORDINAL = 1721424.5
+_J2000 = 2451545.0
+_MINUTES_PER_DAY = 1440.0
+
+# Samme formler for skalarer (math) og arrayer (NumPy)
+_MATH = SimpleNamespace(
+    sin=math.sin,
+    cos=math.cos,
+    tan=math.tan,
+    asin=math.asin,
+    radians=math.radians,
+    degrees=math.degrees,
+)
+_NUMPY = None if np is None else SimpleNamespace(
+    sin=np.sin,
+    cos=np.cos,
+    tan=np.tan,
+    asin=np.arcsin,
+    radians=np.radians,
+    degrees=np.degrees,
+)
+
+
+def _position(jd: Any, xp: SimpleNamespace) -> tuple[Any, Any]:
+    """Solens deklinasjon (radianer) og tidsjevning (minutter) ved juliansk dag jd."""
+    t = (jd - _J2000) / 36525.0
+    mean_longitude = (280.46646 + t * (36000.76983 + t * 0.0003032)) % 360.0
+    anomaly = xp.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    eccentricity = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+    center = (
+        xp.sin(anomaly) * (1.914602 - t * (0.004817 + 0.000014 * t))
+        + xp.sin(2 * anomaly) * (0.019993 - 0.000101 * t)
+        + xp.sin(3 * anomaly) * 0.000289
+    )
+    omega = xp.radians(125.04 - 1934.136 * t)
+    apparent = xp.radians(mean_longitude + center - 0.00569 - 0.00478 * xp.sin(omega))
+    obliquity = xp.radians(
+        23.0
+        + (26.0 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60.0) / 60.0
+        + 0.00256 * xp.cos(omega)
+    )
+    declination = xp.asin(xp.sin(obliquity) * xp.sin(apparent))
+
+    y = xp.tan(obliquity / 2) ** 2
+    l0 = xp.radians(mean_longitude)
+    equation_of_time = 4.0 * xp.degrees(
+        y * xp.sin(2 * l0)
+        - 2 * eccentricity * xp.sin(anomaly)
+        + 4 * eccentricity * y * xp.sin(anomaly) * xp.cos(2 * l0)
+        - 0.5 * y * y * xp.sin(4 * l0)
+        - 1.25 * eccentricity * eccentricity * xp.sin(2 * anomaly)
+    )
+    return declination, equation_of_time
+
+
+def _cos_hour_angle(lat: Any, declination: Any, xp: SimpleNamespace) -> Any:
+    """cos til timevinkelen ved soloppgang; over 1 er mørketid, under -1 midnattssol."""
+    return (_COS_ZENITH - xp.sin(lat) * xp.sin(declination)) / (
+        xp.cos(lat) * xp.cos(declination)
+    )
+
+
+def _local_midnight(day: date, tz: ZoneInfo) -> tuple[float, float]:
+    """
+    Juliansk dag for lokal midnatt og UTC-forskyvningen i minutter.
+
+    Forskyvningen tas ved lokal middag, så dagene med skifte til og fra
+    sommertid (klokken 02-03 om natten) får forskyvningen som gjelder når
+    solen er oppe.
+    """
+    offset = datetime.combine(day, time(12), tzinfo=tz).utcoffset() or timedelta()
+    minutes = offset.total_seconds() / 60.0
+    return day.toordinal() + _JD_ORDINAL - minutes / _MINUTES_PER_DAY, minutes
+
+
+@dataclass(frozen=True, slots=True)
+class SunEvent:
+    """
+    Sol-tider for ett sted én dag.
+
+    Attributes:
+        sunrise: Soloppgang i minutter etter lokal midnatt, None ved polar
+        sunset: Solnedgang i minutter etter lokal midnatt, None ved polar
+        daylight: Minutter med sol over horisonten
+        polar: POLAR_DAY, POLAR_NIGHT eller None
+    """
+
+    sunrise: float | None
+    sunset: float | None
+    daylight: float
+    polar: str | None = None
+
+
+def _event_python(lat: float, lon: float, midnight: float, offset: float) -> SunEvent:
+    phi = math.radians(lat)
+    # Første anslag fra solens posisjon ved middag
+    noon = _MINUTES_PER_DAY / 2 - 4.0 * lon + offset
+    declination, eot = _position(midnight + noon / _MINUTES_PER_DAY, _MATH)
+    cos_h = _cos_hour_angle(phi, declination, _MATH)
+    if cos_h > 1.0:
+        return SunEvent(None, None, 0.0, POLAR_NIGHT)
+    if cos_h < -1.0:
+        return SunEvent(None, None, _MINUTES_PER_DAY, POLAR_DAY)
+
+    # Én forbedring med solens posisjon ved selve hendelsen
+    events = []
+    for sign in (-1.0, 1.0):
+        estimate = noon - eot + sign * 4.0 * math.degrees(math.acos(cos_h))
+        declination, eot_at = _position(midnight + estimate / _MINUTES_PER_DAY, _MATH)
+        cos_at = min(1.0, max(-1.0, _cos_hour_angle(phi, declination, _MATH)))
+        events.append(noon - eot_at + sign * 4.0 * math.degrees(math.acos(cos_at)))
+    sunrise, sunset = events
+    return SunEvent(sunrise, sunset, sunset - sunrise)
+
+
+def sun_event(lat: float, lon: float, day: date, timezone: str) -> SunEvent:
+    """
+    Beregner sol-tider for ett sted én dag.
+
+    Args:
+        lat: Breddegrad
+        lon: Lengdegrad
+        day: Lokal dato
+        timezone: IANA-tidssone tidene oppgis i
+
+    Returns:
+        Sol-tider i lokal tid
+    """
+    midnight, offset = _local_midnight(day, ZoneInfo(timezone))
+    return _event_python(lat, lon, midnight, offset)
+
+
+def _table_python(
+    coordinates: Sequence[tuple[float, float]], midnights: list[float], offsets: list[float]
+) -> tuple[list[array], list[array], list[array]]:
+    sunrise, sunset, daylight = [], [], []
+    for lat, lon in coordinates:
+        rise, set_, light = array("d"), array("d"), array("d")
+        for midnight, offset in zip(midnights, offsets):
+            event = _event_python(lat, lon, midnight, offset)
+            rise.append(math.nan if event.sunrise is None else event.sunrise)
+            set_.append(math.nan if event.sunset is None else event.sunset)
+            light.append(event.daylight)
+        sunrise.append(rise)
+        sunset.append(set_)
+        daylight.append(light)
+    return sunrise, sunset, daylight
+
+
+def _table_numpy(
+    coordinates: Sequence[tuple[float, float]], midnights: list[float], offsets: list[float]
+) -> tuple[Any, Any, Any]:
+    # Steder langs første akse, dager langs andre
+    places = np.array(coordinates, dtype=np.float64).reshape(-1, 2)
+    phi = np.radians(places[:, :1])
+    lon = places[:, 1:]
+    midnight = np.array(midnights)[None, :]
+    noon = _MINUTES_PER_DAY / 2 - 4.0 * lon + np.array(offsets)[None, :]
+
+    declination, eot = _position(midnight + noon / _MINUTES_PER_DAY, _NUMPY)
+    cos_h = _cos_hour_angle(phi, declination, _NUMPY)
+    night = cos_h > 1.0
+    day = cos_h < -1.0
+    hour_angle = np.degrees(np.arccos(np.clip(cos_h, -1.0, 1.0)))
+
+    events = []
+    for sign in (-1.0, 1.0):
+        estimate = noon - eot + sign * 4.0 * hour_angle
+        declination, eot_at = _position(midnight + estimate / _MINUTES_PER_DAY, _NUMPY)
+        cos_at = np.clip(_cos_hour_angle(phi, declination, _NUMPY), -1.0, 1.0)
+        events.append(noon - eot_at + sign * 4.0 * np.degrees(np.arccos(cos_at)))
+    sunrise, sunset = events
+
+    polar = night | day
+    daylight = np.where(night, 0.0, np.where(day, _MINUTES_PER_DAY, sunset - sunrise))
+    sunrise[polar] = np.nan
+    sunset[polar] = np.nan
+    return sunrise, sunset, daylight
+
+
+class SunTable:
+    """
+    Sol-tider for et helt år for mange steder.
+
+    Regnes ut én gang per år; oppslag etterpå er bare indeksering.
+    """
+
+    __slots__ = ("year", "timezone", "_index", "_sunrise", "_sunset", "_daylight")
+
+    def __init__(
+        self,
+        year: int,
+        timezone: str,
+        coordinates: Sequence[tuple[float, float]],
+        sunrise: Any,
+        sunset: Any,
+        daylight: Any,
+    ) -> None:
+        self.year = year
+        self.timezone = timezone
+        self._index = {coordinate: row for row, coordinate in enumerate(coordinates)}
+        self._sunrise = sunrise
+        self._sunset = sunset
+        self._daylight = daylight
+
+    @classmethod
+    def compute(
+        cls,
+        coordinates: Sequence[tuple[float, float]],
+        year: int,
+        timezone: str,
+        use_numpy: bool | None = None,
+    ) -> "SunTable":
+        """
+        Beregner sol-tider for alle dagene i et år for alle stedene.
+
+        Args:
+            coordinates: (lat, lon) per sted; oppslag må bruke de samme verdiene
+            year: År
+            timezone: IANA-tidssone tidene oppgis i
+            use_numpy: Tving valg av motor, standard er NumPy hvis installert
+
+        Returns:
+            Ferdig tabell
+        """
+        if use_numpy is None:
+            use_numpy = HAS_NUMPY
+        if use_numpy and np is None:
+            raise RuntimeError("NumPy er ikke installert")
+        coordinates = list(dict.fromkeys(coordinates))
+        tz = ZoneInfo(timezone)
+        days = date(year + 1, 1, 1).toordinal() - date(year, 1, 1).toordinal()
+        first = date(year, 1, 1)
+        midnights, offsets = zip(
+            *(_local_midnight(first + timedelta(days=i), tz) for i in range(days))
+        )
+        engine = _table_numpy if use_numpy else _table_python
+        columns = engine(coordinates, list(midnights), list(offsets))
+        return cls(year, timezone, coordinates, *columns)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, coordinate: object) -> bool:
+        return coordinate in self._index
+
+    def get(self, lat: float, lon: float, day: date) -> SunEvent | None:
+        """
+        Slår opp sol-tider for et sted og en dag.
+
+        Args:
+            lat: Breddegrad, som gitt til compute()
+            lon: Lengdegrad, som gitt til compute()
+            day: Lokal dato
+
+        Returns:
+            Sol-tider, eller None hvis stedet eller året ikke er i tabellen
+        """
+        row = self._index.get((lat, lon))
+        if row is None or day.year != self.year:
+            return None
+        i = day.toordinal() - date(self.year, 1, 1).toordinal()
+        daylight = float(self._daylight[row][i])
+        sunrise = float(self._sunrise[row][i])
+        if math.isnan(sunrise):
+            return SunEvent(None, None, daylight, POLAR_DAY if daylight > 0 else POLAR_NIGHT)
+        return SunEvent(sunrise, float(self._sunset[row][i]), daylight)
@@ -0,0 +1,391 @@
+"""
+Avledede værmål for hele prognoser og mange steder samtidig.
+
+calculations.py regner på ett tidspunkt om gangen. Her beregnes følt
+temperatur (vindkjøling og varmeindeks), klesråd-nivå og flagg for paraply
+og glatt føre for alle tidsstegene i én eller flere Forecast i én operasjon,
+og oppsummeres vektet etter hvor mye av hvert tidssteg som er dagslys.
+
+Med NumPy installert (``pip install morgenbot[fast]``) kjøres alt som
+array-operasjoner over alle stedene samlet; ellers brukes ren Python med
+samme resultat.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+from zoneinfo import ZoneInfo
+
+from morgenbot.config.constants import CLOTHING_THRESHOLDS, DEFAULT_CLOTHING_ADVICE
+from morgenbot.models.forecast import RAIN_THRESHOLD, Forecast, day_window
+
+try:
+    import numpy as np
+except ImportError:  # NumPy er valgfritt
+    np = None
+
+if TYPE_CHECKING:
+    from morgenbot.models.weather import SunTimes
+
+HAS_NUMPY = np is not None
+
+# Vindkjøling gjelder under denne temperaturen, varmeindeks fra og med denne
+WIND_CHILL_BELOW = 10.0
+HEAT_INDEX_FROM = 27.0
+
+# Nedbør i dette temperaturområdet gir glatte veier
+SLIPPERY_RANGE = (-3.0, 1.0)
+
+_THRESHOLDS = [threshold for threshold, _ in CLOTHING_THRESHOLDS]
+_WET_WORDS = ("rain", "sleet")
+_ICY_WORDS = ("snow", "sleet")
+
+
+def clothing_text(level: int) -> str:
+    """
+    Klesråd for et nivå fra compute_metrics.
+
+    Args:
+        level: Indeks i CLOTHING_THRESHOLDS, eller len(CLOTHING_THRESHOLDS) for varmest
+
+    Returns:
+        Klesanbefaling
+    """
+    if 0 <= level < len(CLOTHING_THRESHOLDS):
+        return CLOTHING_THRESHOLDS[level][1]
+    return DEFAULT_CLOTHING_ADVICE
+
+
+def _wind_chill(t: Any, v: Any) -> Any:
+    """Kanadisk vindkjøling (samme formel som calculate_wind_chill)."""
+    factor = (v * 3.6) ** 0.16
+    return 13.12 + 0.6215 * t - 11.37 * factor + 0.3965 * t * factor
+
+
+def _heat_index(t: Any, rh: Any) -> Any:
+    """Varmeindeks etter Rothfusz, regnet i Fahrenheit og gjort om til Celsius."""
+    f = t * 1.8 + 32
+    hi = (
+        -42.379
+        + 2.04901523 * f
+        + 10.14333127 * rh
+        - 0.22475541 * f * rh
+        - 0.00683783 * f * f
+        - 0.05481717 * rh * rh
+        + 0.00122874 * f * f * rh
+        + 0.00085282 * f * rh * rh
+        - 0.00000199 * f * f * rh * rh
+    )
+    return (hi - 32) / 1.8
+
+
+@lru_cache(maxsize=256)
+def _symbol_flags(name: str) -> tuple[bool, bool]:
+    """(regn eller sludd, snø eller sludd) for en symbolkode."""
+    return any(word in name for word in _WET_WORDS), any(word in name for word in _ICY_WORDS)
+
+
+@lru_cache(maxsize=1024)
+def _symbol_table(names: tuple[str, ...]) -> bytes:
+    """Flaggene for en symboltabell som én byte per kode (bit 0 våt, bit 1 glatt)."""
+    return bytes(wet | icy << 1 for wet, icy in map(_symbol_flags, names))
+
+
+class WeatherMetrics:
+    """
+    Avledede mål per tidssteg i en Forecast.
+
+    Kolonnene er NumPy-arrays når NumPy brukes, ellers lister.
+
+    Attributes:
+        feels_like: Følt temperatur
+        clothing: Klesråd-nivå (se clothing_text)
+        umbrella: Regn eller sludd
+        slippery: Fare for glatte veier
+    """
+
+    __slots__ = ("feels_like", "clothing", "umbrella", "slippery")
+
+    def __init__(
+        self,
+        feels_like: Sequence[float],
+        clothing: Sequence[int],
+        umbrella: Sequence[bool],
+        slippery: Sequence[bool],
+    ) -> None:
+        self.feels_like = feels_like
+        self.clothing = clothing
+        self.umbrella = umbrella
+        self.slippery = slippery
+
+    def __len__(self) -> int:
+        return len(self.feels_like)
+
+
+def _metrics_python(forecast: Forecast) -> WeatherMetrics:
+    flags = [_symbol_flags(name) for name in forecast.symbol_names]
+    low, high = SLIPPERY_RANGE
+
+    feels_like, clothing, umbrella, slippery = [], [], [], []
+    for t, v, rh, p, s in zip(
+        forecast.temperature,
+        forecast.wind_speed,
+        forecast.humidity,
+        forecast.precipitation,
+        forecast.symbols,
+    ):
+        if t < WIND_CHILL_BELOW and v > 0:
+            felt = _wind_chill(t, v)
+        elif t >= HEAT_INDEX_FROM and not math.isnan(rh):
+            felt = max(t, _heat_index(t, rh))
+        else:
+            felt = t
+        felt = round(felt, 1)
+        feels_like.append(felt)
+        clothing.append(bisect_right(_THRESHOLDS, felt))
+        raining = p >= RAIN_THRESHOLD
+        wet, icy = flags[s]
+        umbrella.append(wet or (raining and t > high))
+        slippery.append(icy or (raining and low <= t <= high))
+
+    return WeatherMetrics(feels_like, clothing, umbrella, slippery)
+
+
+def _numpy_columns(forecasts: Sequence[Forecast]) -> dict[str, Any]:
+    """Slår sammen kolonnene til alle prognosene og beregner målene i én operasjon."""
+
+    def column(name: str, dtype: Any) -> Any:
+        # Én frombuffer over de sammenføyde bytene er mye billigere enn én per prognose
+        return np.frombuffer(b"".join(getattr(f, name) for f in forecasts), dtype=dtype)
+
+    t = column("temperature", np.float32).astype(np.float64)
+    v = column("wind_speed", np.float32).astype(np.float64)
+    rh = column("humidity", np.float32).astype(np.float64)
+    p = column("precipitation", np.float32).astype(np.float64)
+
+    # Symbol-id er lokale per prognose; forskyv dem inn i én felles tabell
+    lengths = [len(f) for f in forecasts]
+    tables = [_symbol_table(f.symbol_names) for f in forecasts]
+    offsets = np.cumsum([0] + [len(table) for table in tables[:-1]])
+    symbols = column("symbols", np.uint8).astype(np.intp) + np.repeat(offsets, lengths)
+    flags = np.frombuffer(b"".join(tables), dtype=np.uint8)[symbols]
+    wet, icy = (flags & 1).astype(bool), (flags & 2).astype(bool)
+
+    # Formlene regnes bare ut for radene de gjelder
+    felt = t.copy()
+    with np.errstate(invalid="ignore"):
+        cold = (t < WIND_CHILL_BELOW) & (v > 0)
+        hot = (t >= HEAT_INDEX_FROM) & ~np.isnan(rh)
+    felt[cold] = _wind_chill(t[cold], v[cold])
+    felt[hot] = np.maximum(t[hot], _heat_index(t[hot], rh[hot]))
+    felt = np.round(felt, 1)
+    low, high = SLIPPERY_RANGE
+    raining = p >= RAIN_THRESHOLD
+
+    return {
+        "lengths": lengths,
+        "times": column("times", np.int64).astype(np.float64),
+        "period": column("period", np.uint8),
+        "precipitation": p,
+        "feels_like": felt,
+        "clothing": np.searchsorted(_THRESHOLDS, felt, side="right"),
+        "umbrella": wet | (raining & (t > high)),
+        "slippery": icy | (raining & (t >= low) & (t <= high)),
+    }
+
+
+def _metrics_numpy(forecasts: Sequence[Forecast]) -> list[WeatherMetrics]:
+    columns = _numpy_columns(forecasts)
+    bounds = np.cumsum(columns["lengths"])[:-1]
+    names = ("feels_like", "clothing", "umbrella", "slippery")
+    return [
+        WeatherMetrics(*parts)
+        for parts in zip(*(np.split(columns[name], bounds) for name in names))
+    ]
+
+
+def compute_metrics(
+    forecasts: Sequence[Forecast], use_numpy: bool | None = None
+) -> list[WeatherMetrics]:
+    """
+    Beregner avledede mål for alle tidsstegene i mange prognoser.
+
+    Args:
+        forecasts: Én prognose per sted
+        use_numpy: Tving valg av motor, standard er NumPy hvis installert
+
+    Returns:
+        WeatherMetrics per prognose, i samme rekkefølge
+    """
+    if use_numpy is None:
+        use_numpy = HAS_NUMPY
+    if use_numpy and forecasts:
+        if np is None:
+            raise RuntimeError("NumPy er ikke installert")
+        return _metrics_numpy(forecasts)
+    return [_metrics_python(forecast) for forecast in forecasts]
+
+
+@dataclass(frozen=True, slots=True)
+class DaySummary:
+    """
+    Dagslysvektet oppsummering av et tidsrom.
+
+    Attributes:
+        feels_like: Gjennomsnittlig følt temperatur i dagslys
+        coldest: Laveste følte temperatur i dagslys
+        precipitation: Nedbør i dagslys (mm)
+        umbrella: Paraply trengs
+        slippery: Fare for glatte veier
+    """
+
+    feels_like: float
+    coldest: float
+    precipitation: float
+    umbrella: bool
+    slippery: bool
+
+    @property
+    def advice(self) -> str:
+        """Klesråd for den kaldeste delen av dagen, med tillegg for regn og glatt føre."""
+        advice = clothing_text(bisect_right(_THRESHOLDS, self.coldest))
+        if self.umbrella:
+            advice += " 🌂 Ta med paraply!"
+        if self.slippery:
+            advice += " ❄️ Vær obs på glatte veier!"
+        return advice
+
+
+def daylight_window(
+    day: date, timezone: str, sun: "SunTimes | None" = None
+) -> tuple[float, float]:
+    """
+    Dagslyset for en dag som epoch-sekunder.
+
+    Args:
+        day: Dato
+        timezone: IANA-tidssone
+        sun: Sol-tider, eller None for 06-22
+
+    Returns:
+        (soloppgang, solnedgang), hele døgnet ved midnattssol, eller
+        day_window() uten sol-tider og ved mørketid
+    """
+    if sun is None or sun.total_daylight_minutes == 0:
+        return day_window(day, timezone)
+    tz = ZoneInfo(timezone)
+    if sun.sunrise is None:
+        start = datetime.combine(day, time(), tzinfo=tz).timestamp()
+        return start, datetime.combine(day + timedelta(days=1), time(), tzinfo=tz).timestamp()
+    start = datetime.combine(day, time.fromisoformat(sun.sunrise), tzinfo=tz).timestamp()
+    return start, start + sun.total_daylight_minutes * 60
+
+
+def _summarize_python(
+    forecast: Forecast, metrics: WeatherMetrics, start: float, end: float
+) -> DaySummary | None:
+    # Tidssteg kan vare opptil seks timer, så de som starter før vinduet tas med
+    first = bisect_left(forecast.times, start - 6 * 3600)
+    last = bisect_left(forecast.times, end)
+    weights = felt = 0.0
+    coldest = math.inf
+    precipitation = 0.0
+    umbrella = slippery = False
+    for i in range(first, last):
+        length = (forecast.period[i] or 1) * 3600
+        t0 = forecast.times[i]
+        weight = max(0.0, min(t0 + length, end) - max(t0, start)) / length
+        if weight <= 0 or math.isnan(metrics.feels_like[i]):
+            continue
+        weights += weight
+        felt += metrics.feels_like[i] * weight
+        coldest = min(coldest, metrics.feels_like[i])
+        precipitation += forecast.precipitation[i] * weight
+        umbrella = umbrella or bool(metrics.umbrella[i])
+        slippery = slippery or bool(metrics.slippery[i])
+    if weights == 0:
+        return None
+    return DaySummary(
+        round(felt / weights, 1), coldest, round(precipitation, 1), umbrella, slippery
+    )
+
+
+def _summarize_numpy(
+    forecasts: Sequence[Forecast], windows: Sequence[tuple[float, float]]
+) -> list[DaySummary | None]:
+    columns = _numpy_columns(forecasts)
+    lengths = columns["lengths"]
+    starts = np.repeat([start for start, _ in windows], lengths)
+    ends = np.repeat([end for _, end in windows], lengths)
+
+    times, felt = columns["times"], columns["feels_like"]
+    length = np.maximum(columns["period"], 1) * 3600.0
+    weight = np.clip(np.minimum(times + length, ends) - np.maximum(times, starts), 0, None)
+    used = (weight > 0) & ~np.isnan(felt)
+    weight = np.where(used, weight / length, 0.0)
+
+    # Én reduksjon per kolonne over alle stedene; segmentene starter ved hver prognose
+    segments = np.cumsum([0] + lengths[:-1])
+    weights = np.add.reduceat(weight, segments)
+    felt_sum = np.add.reduceat(np.where(used, felt, 0.0) * weight, segments)
+    coldest = np.minimum.reduceat(np.where(used, felt, np.inf), segments)
+    precipitation = np.add.reduceat(columns["precipitation"] * weight, segments)
+    umbrella = np.logical_or.reduceat(columns["umbrella"] & used, segments)
+    slippery = np.logical_or.reduceat(columns["slippery"] & used, segments)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.round(felt_sum / weights, 1)
+    rows = zip(
+        weights.tolist(),
+        mean.tolist(),
+        coldest.tolist(),
+        np.round(precipitation, 1).tolist(),
+        umbrella.tolist(),
+        slippery.tolist(),
+    )
+    return [DaySummary(*row[1:]) if row[0] > 0 else None for row in rows]
+
+
+def summarize_days(
+    forecasts: Sequence[Forecast | None],
+    windows: Sequence[tuple[float, float]],
+    use_numpy: bool | None = None,
+) -> list[DaySummary | None]:
+    """
+    Oppsummerer et tidsrom for mange steder.
+
+    Args:
+        forecasts: Prognose per sted (None hoppes over)
+        windows: (start, slutt) i epoch-sekunder per sted, typisk fra daylight_window()
+        use_numpy: Tving valg av motor, standard er NumPy hvis installert
+
+    Returns:
+        DaySummary per sted, eller None der prognosen mangler eller ikke dekker tidsrommet
+    """
+    if use_numpy is None:
+        use_numpy = HAS_NUMPY
+    # Tomme prognoser har ingen segment å redusere over
+    present = [i for i, f in enumerate(forecasts) if f is not None and len(f)]
+    selected = [forecasts[i] for i in present]
+    chosen = [windows[i] for i in present]
+    if use_numpy and selected:
+        if np is None:
+            raise RuntimeError("NumPy er ikke installert")
+        results = _summarize_numpy(selected, chosen)
+    else:
+        metrics = compute_metrics(selected, use_numpy=False)
+        results = [
+            _summarize_python(forecast, m, start, end)
+            for forecast, m, (start, end) in zip(selected, metrics, chosen)
+        ]
+
+    summaries: list[DaySummary | None] = [None] * len(forecasts)
+    for index, summary in zip(present, results):
+        summaries[index] = summary
+    return summaries
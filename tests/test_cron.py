@@ -0,0 +1,36 @@
+"""Tester for cron-uttrykk med tidssone."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from morgenbot.runtime.cron import CronSchedule
+
+
+# Sommertiden slutter 27. oktober 2024 kl. 03:00, og 02:00-03:00 gjentas
+AUTUMN_FOLD = datetime(2024, 10, 27, 1, 10, tzinfo=UTC)  # 02:10+01:00 (fold=1)
+
+
+def test_next_after_is_never_in_the_past_during_repeated_hour() -> None:
+    fire_at = CronSchedule("30 2 * * *").next_after(AUTUMN_FOLD)
+
+    assert fire_at.astimezone(UTC) > AUTUMN_FOLD
+    assert fire_at.astimezone(UTC) == datetime(2024, 10, 28, 1, 30, tzinfo=UTC)
+
+
+def test_next_after_advances_during_repeated_hour() -> None:
+    schedule = CronSchedule("*/15 * * * *")
+
+    moment = AUTUMN_FOLD
+    for _ in range(8):
+        fire_at = schedule.next_after(moment)
+        assert fire_at.astimezone(UTC) > moment
+        assert fire_at.astimezone(UTC) - moment <= timedelta(hours=1)
+        moment = fire_at.astimezone(UTC)
+
+
+def test_next_after_skips_missing_spring_hour() -> None:
+    # 31. mars 2024 hopper klokken fra 02:00 til 03:00
+    fire_at = CronSchedule("30 2 * * *").next_after(datetime(2024, 3, 30, 23, 0, tzinfo=UTC))
+
+    assert fire_at.date().isoformat() == "2024-04-01"
@@ -0,0 +1,64 @@
+"""Tester for utvalgt JSON-dekoding."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from morgenbot.services import json_select
+from morgenbot.services.json_select import select_json
+
+
+DOCUMENTS = [
+    {"a": 12.5, "b": 1},
+    {"a": 1e5},
+    {"a": -0.25e-3, "b": [1.5, 2e10, -3], "c": "12.5e"},
+    {"chart": {"result": [{"meta": {"regularMarketPrice": 123.456, "previousClose": 1.0e2}}]}},
+    {"skip": [0.125] * 40, "x": {"y": 3.14159, "z": "æøå"}},
+]
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 5, 8, 13])
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_whole_document_matches_json_loads(
+    monkeypatch: pytest.MonkeyPatch, chunk: int, document: dict
+) -> None:
+    monkeypatch.setattr(json_select, "INITIAL_CHUNK", chunk)
+    body = json.dumps(document).encode()
+
+    selected = select_json(body, list(document))
+
+    assert selected == json.loads(body)
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 5, 8, 13])
+def test_selected_path_matches_json_loads(monkeypatch: pytest.MonkeyPatch, chunk: int) -> None:
+    monkeypatch.setattr(json_select, "INITIAL_CHUNK", chunk)
+    body = json.dumps(DOCUMENTS[3]).encode()
+
+    selected = select_json(body, ["chart.result.0.meta"])
+
+    assert selected == json.loads(body)
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 5, 8, 13])
+def test_skipped_numbers_do_not_shift_the_parser(
+    monkeypatch: pytest.MonkeyPatch, chunk: int
+) -> None:
+    monkeypatch.setattr(json_select, "INITIAL_CHUNK", chunk)
+    body = json.dumps(DOCUMENTS[4]).encode()
+
+    assert select_json(body, ["x.y"]) == {"x": {"y": 3.14159}}
+
+
+@pytest.mark.parametrize(
+    ("chunk", "body"),
+    [(3, b'{"a": 12.5, "b": 1}'), (8, b'{"a": 1e5}'), (7, b'{"a": 1.5e-7}')],
+)
+def test_number_cut_at_chunk_boundary(
+    monkeypatch: pytest.MonkeyPatch, chunk: int, body: bytes
+) -> None:
+    monkeypatch.setattr(json_select, "INITIAL_CHUNK", chunk)
+
+    assert select_json(body, ["a"]) == {"a": json.loads(body)["a"]}